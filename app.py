@@ -1,23 +1,19 @@
 from __future__ import annotations
-import importlib
 import pandas as pd
 import streamlit as st
-from core.io import get_orders
+from core import cube, dataset, expr, filters, periods, result_cache
+from core.io import get_orders, get_orders_range, get_sql_orders
 from core.registry import list_metrics
 from core.types import MetricParams
 import config
 
 st.set_page_config(page_title="B-Flow Metrics Dashboard — Auto 82", layout="wide")
 
-def _import_callable(fqn: str):
-    """함수 동적 임포트"""
-    mod_name, func_name = fqn.rsplit('.', 1)
-    mod = importlib.import_module(mod_name)
-    return getattr(mod, func_name)
-
 # 데이터 로드
 try:
     df = get_orders()
+    dataset.register_dataset(df)
+    cube.get_cube(df)  # 일 단위 큐브는 로드 시 미리 구축
     data_loaded = True
     st.sidebar.success(f"✅ 데이터 로드 완료: {len(df):,}건")
 except Exception as e:
@@ -60,12 +56,24 @@ if data_loaded and not df.empty:
     # 기타 옵션
     top_n = st.sidebar.number_input("Top N", min_value=5, max_value=200, value=50, step=5)
     include_canceled = st.sidebar.checkbox("결제취소 포함", value=False)
+    compare_mode = st.sidebar.selectbox("성장률 비교 기준", options=list(periods.COMPARE_MODES), format_func=periods.COMPARE_MODES.get)
+    
+    # 추가 필터식 (공백이 있는 컬럼명은 백틱으로 감쌈)
+    extra_filter_expr = st.sidebar.text_input("추가 필터식", placeholder="예: 수량 >= 2 and `상품별 총 주문금액` > 10000")
+    if extra_filter_expr.strip():
+        try:
+            expr.compile_expr(extra_filter_expr.strip()).mask(df.head(1))
+        except (ValueError, KeyError, TypeError) as e:
+            st.sidebar.error(f"필터식 오류: {e}")
+            extra_filter_expr = ""
 else:
     # 기본값 설정
     date_from = date_to = None
     channels = sellers = cats = []
     top_n = 50
     include_canceled = False
+    compare_mode = 'period'
+    extra_filter_expr = ""
 
 # 파라미터 구성
 params: MetricParams = {
@@ -76,6 +84,8 @@ params: MetricParams = {
     'categories': cats,
     'top_n': int(top_n),
     'include_canceled': bool(include_canceled),
+    'compare_mode': compare_mode,
+    'extra_filter_expr': extra_filter_expr,
 }
 
 # 메인 컨텐츠
@@ -105,11 +115,22 @@ if any([date_from, date_to, channels, sellers, cats]):
     st.info(" | ".join(filter_info))
 
 try:
-    # 함수 실행
-    func = _import_callable(spec['func_fqn'])
+    # SQL 백엔드면 필터/집계를 내장 DB에서 처리
+    if config.QUERY_BACKEND == 'sqlite':
+        source = get_sql_orders()
+    elif config.STORE_ENABLED and params['date_from'] is not None and spec['id'] not in config.FULL_HISTORY_METRICS:
+        # 파티션 저장소에서 비교 기간까지 덮는 파티션만 읽음 (기간별 버전으로 등록해 전체 프레임과 파생 구조를 나눔)
+        window_from = min(params['date_from'], periods.previous_params(params)['date_from'])
+        source = get_orders_range(window_from, params['date_to'])
+        version = dataset.dataset_version(df)
+        if version:
+            dataset.register_dataset(source, f"{version}@{window_from}~{params['date_to']}")
+    else:
+        source = df
     
     with st.spinner("📊 지표 계산 중..."):
-        result = func(df, params)
+        # 같은 지표 코드/파라미터/데이터셋 버전의 결과는 캐시(메모리 → 디스크)에서 재사용
+        result = result_cache.metric_result(spec['id'], source, params)
     
     if isinstance(result, pd.DataFrame) and not result.empty:
         # 데이터 표시
@@ -172,4 +193,12 @@ if data_loaded and not df.empty:
     st.sidebar.write(f"**기간:** {df['주문일시'].min().date()} ~ {df['주문일시'].max().date()}")
     st.sidebar.write(f"**채널 수:** {df['채널명'].nunique()}개")
     st.sidebar.write(f"**업체 수:** {df['업체명'].nunique()}개")
-    st.sidebar.write(f"**상품 수:** {df['상품명'].nunique()}개")
\ No newline at end of file
+    st.sidebar.write(f"**상품 수:** {df['상품명'].nunique()}개")
+    
+    fc = filters.cache_stats()
+    st.sidebar.caption(f"필터 캐시: 적중 {fc['hits']} / 미적중 {fc['misses']} ({fc['hit_rate']}%), {fc['entries']}건 {fc['mb']}MB")
+    rc = result_cache.cache_stats()
+    st.sidebar.caption(
+        f"결과 캐시: 메모리 {rc['memory_hits']} / 디스크 {rc['disk_hits']} / 미적중 {rc['misses']} ({rc['hit_rate']}%), "
+        f"조회 {rc['hit_ms']}ms · 계산 {rc['compute_ms']}ms"
+    )
@@ -0,0 +1,41 @@
+from __future__ import annotations
+import argparse
+import time
+import tracemalloc
+import pandas as pd
+import config
+
+def measure(fn, *args, **kwargs) -> tuple[object, float, float]:
+    """함수 실행 결과, 소요시간(초), 최대 메모리(MB)"""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+        elapsed = time.perf_counter() - t0
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak / 1024 ** 2
+
+def timed(fn, *args, **kwargs) -> tuple[object, float]:
+    """함수 실행 결과, 소요시간(초) (tracemalloc 부하 없이 시간만 측정)"""
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - t0
+
+def parse_args(description: str) -> argparse.Namespace:
+    """공통 인자: 엑셀 경로, 행 부풀리기 배수"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('path', nargs='?', default=config.DATA_XLSX_PATH, help='주문 엑셀 경로')
+    parser.add_argument('--scale', type=int, default=1, help='원본 행을 N배로 복제하여 측정')
+    return parser.parse_args()
+
+def scale_frame(df: pd.DataFrame, scale: int) -> pd.DataFrame:
+    """대용량 재현용 행 복제"""
+    if scale <= 1:
+        return df
+    return pd.concat([df] * scale, ignore_index=True)
+
+def report(rows: list[dict]) -> None:
+    """측정 결과 표 출력"""
+    print(pd.DataFrame(rows).to_string(index=False))
@@ -0,0 +1,33 @@
+"""영역별 전체 지표 실행 비교: 지표별 개별 호출 vs 배치 실행 (공유 필터/집계/하위 지표)
+
+    python -m benchmarks.bench_batch [엑셀경로] [--scale N]
+"""
+from __future__ import annotations
+import pandas as pd
+from benchmarks._util import measure, parse_args, report, scale_frame
+from core import batch, io, registry
+
+def run_each(df: pd.DataFrame, params: dict, metric_ids: list[str]) -> dict:
+    return {mid: registry.load_metric(mid)(df, params) for mid in metric_ids}
+
+def main():
+    args = parse_args(__doc__)
+    # 미등록 프레임: 데이터셋 캐시 없이 배치 공유 효과만 측정
+    df = scale_frame(io.build_orders(args.path), args.scale)
+    lo, hi = df['주문일시'].min(), df['주문일시'].max()
+    params = {'date_from': lo + (hi - lo) / 2, 'date_to': hi, 'top_n': 30}
+    
+    rows = []
+    for area in sorted({m['area'] for m in registry.list_metrics()}):
+        ids = [m['id'] for m in registry.list_metrics(area)]
+        each, each_sec, _ = measure(run_each, df, params, ids)
+        (shared, errors), batch_sec, _ = measure(batch.run_batch, df, params, ids)
+        assert not errors, errors
+        for mid in ids:
+            if isinstance(each[mid], pd.DataFrame):
+                pd.testing.assert_frame_equal(each[mid], shared[mid])
+        rows.append({'영역': area, '지표수': len(ids), '개별(초)': round(each_sec, 4), '배치(초)': round(batch_sec, 4)})
+    report(rows)
+
+if __name__ == '__main__':
+    main()
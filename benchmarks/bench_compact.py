@@ -0,0 +1,63 @@
+"""압축 스키마(범주형 차원 컬럼) 메모리/groupby 비교 및 전체 지표 실행 확인 (시간과 최대 메모리는 따로 측정)
+
+    python -m benchmarks.bench_compact [엑셀경로] [--scale N]
+"""
+from __future__ import annotations
+import importlib
+import pandas as pd
+from benchmarks._util import measure, parse_args, report, scale_frame, timed
+from core import io, preprocess
+from core.registry import list_metrics
+import config
+
+GROUPBY_CASES = [
+    ('채널×업체 매출합', lambda d: d.groupby(['채널명', '업체명'], observed=True)['상품별 총 주문금액'].sum()),
+    ('상품별 주문수', lambda d: d.groupby('상품명', observed=True).size()),
+    ('중분류×일자 매출합', lambda d: d.groupby(['중분류코드', '주문일'], observed=True)['상품별 총 주문금액'].sum()),
+    ('취소 제외 필터', lambda d: d[d['주문상태'] != '결제취소']),
+]
+
+def run_registry(df: pd.DataFrame) -> list[str]:
+    """전체 지표 실행, 실패한 지표 ID 목록"""
+    failed = []
+    params = {**config.DEFAULT_PARAMS}
+    for spec in list_metrics():
+        mod_name, func_name = spec['func_fqn'].rsplit('.', 1)
+        func = getattr(importlib.import_module(mod_name), func_name)
+        try:
+            func(df, params)
+        except Exception:
+            failed.append(spec['id'])
+    return failed
+
+def main():
+    args = parse_args(__doc__)
+    base = scale_frame(io.build_orders(args.path), args.scale)
+    compact = preprocess.compact_dtypes(base.copy())
+    
+    print(preprocess.memory_report(base).to_string(index=False))
+    print()
+    
+    # 시간은 tracemalloc 없이 재고, 최대 메모리는 별도 실행으로 잰다 (추적 부하가 시간 비교를 뒤집지 않도록)
+    rows = []
+    for name, fn in GROUPBY_CASES:
+        _, sec_base = timed(fn, base)
+        _, sec_compact = timed(fn, compact)
+        _, _, peak_base = measure(fn, base)
+        _, _, peak_compact = measure(fn, compact)
+        rows.append({'연산': name, '기본(초)': round(sec_base, 4), '압축(초)': round(sec_compact, 4),
+                     '기본(MB)': round(peak_base, 1), '압축(MB)': round(peak_compact, 1), '실패': '-'})
+    failed_base, sec_base = timed(run_registry, base)
+    failed_compact, sec_compact = timed(run_registry, compact)
+    _, _, peak_base = measure(run_registry, base)
+    _, _, peak_compact = measure(run_registry, compact)
+    rows.append({
+        '연산': f'전체 지표 {len(list_metrics())}개',
+        '기본(초)': round(sec_base, 2), '압축(초)': round(sec_compact, 2),
+        '기본(MB)': round(peak_base, 1), '압축(MB)': round(peak_compact, 1),
+        '실패': ', '.join(sorted(set(failed_base) | set(failed_compact))) or '-',
+    })
+    report(rows)
+
+if __name__ == '__main__':
+    main()
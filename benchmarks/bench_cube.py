@@ -0,0 +1,43 @@
+"""합계/건수 지표 비교: 필터된 원본 행 집계 vs 일 단위 큐브 셀 집계
+
+    python -m benchmarks.bench_cube [엑셀경로] [--scale N]
+"""
+from __future__ import annotations
+import pandas as pd
+from benchmarks._util import measure, parse_args, report, scale_frame
+from core import cube, dataset, io
+from metrics import area1_channel, area4_order_status, area5_category, area6_trend
+import config
+
+METRICS = {
+    'A1_004 채널별업체점유율': area1_channel.mA1_004,
+    'A4_003 업체별평균주문금액': area4_order_status.mA4_003,
+    'A5_013 소분류별업체매출순위': area5_category.mA5_013,
+    'A6_010 채널별매출추이': area6_trend.mA6_010,
+}
+
+def main():
+    args = parse_args(__doc__)
+    df = scale_frame(io.build_orders(args.path), args.scale)
+    dataset.register_dataset(df, 'bench')
+    built, build_sec, _ = measure(cube.get_cube, df)
+    
+    # 앱 사이드바와 같은 일 단위 기간 (시작일 00:00:00 ~ 종료일 23:59:59)
+    lo, hi = df['주문일시'].min(), df['주문일시'].max()
+    params = {
+        'date_from': (lo + (hi - lo) / 2).normalize(),
+        'date_to': hi.normalize() + pd.Timedelta(days=1) - pd.Timedelta(seconds=1),
+    }
+    
+    rows = [{'지표': '(큐브 구축)', '원본 행': len(df), '큐브 셀': len(built.cells), '원본(초)': None, '큐브(초)': round(build_sec, 4)}]
+    for name, fn in METRICS.items():
+        config.CUBE_ENABLED = False
+        old, old_sec, _ = measure(fn, df, params)
+        config.CUBE_ENABLED = True
+        new, new_sec, _ = measure(fn, df, params)
+        pd.testing.assert_frame_equal(old, new)
+        rows.append({'지표': name, '원본 행': None, '큐브 셀': None, '원본(초)': round(old_sec, 4), '큐브(초)': round(new_sec, 4)})
+    report(rows)
+
+if __name__ == '__main__':
+    main()
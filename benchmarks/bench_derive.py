@@ -0,0 +1,49 @@
+"""고유구매자/중분류코드 파생 비교: 행 단위 apply vs 벡터화
+
+    python -m benchmarks.bench_derive [엑셀경로] [--scale N]
+"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from benchmarks._util import measure, parse_args, report, scale_frame
+from core import io, preprocess
+import config
+
+# 기존 함수가 처리하던 경계값
+EDGE_PHONES = [np.nan, None, pd.NA, '', 'abc', '12', '123', '1234', '010-1234-5678', '+82 10 9876 5432', 1012345678.0, 1234]
+EDGE_CATEGORIES = [np.nan, None, pd.NA, '', 'abc', '12', '1234567', '0001000100060001', 1000100060001.0, 'A-10 23']
+
+def check_edges() -> None:
+    phones = pd.Series(EDGE_PHONES, dtype=object)
+    expected = phones.apply(preprocess._last4)
+    assert preprocess.phone_last4(phones).tolist() == expected.tolist()
+    
+    for dtype in (object, 'string'):
+        cats = pd.Series(EDGE_CATEGORIES, dtype=object).astype(dtype)
+        expected = cats.astype(str).map(preprocess._midcode)
+        assert preprocess.mid_code(cats).tolist() == expected.tolist()
+
+def main():
+    args = parse_args(__doc__)
+    check_edges()
+    raw = scale_frame(io.load_orders_raw(args.path), args.scale)
+    df = preprocess.standardize(raw, config.COLMAP)
+    
+    cases = [
+        ('고유구매자', 'apply', lambda: df['구매자명'].fillna('미상').astype(str) + '_' + df['구매자연락처'].apply(preprocess._last4)),
+        ('고유구매자', '벡터화', lambda: preprocess.unique_buyer_key(df['구매자명'], df['구매자연락처'])),
+        ('중분류코드', 'apply', lambda: df['카테고리'].astype(str).map(preprocess._midcode)),
+        ('중분류코드', '벡터화', lambda: preprocess.mid_code(df['카테고리'])),
+    ]
+    rows, results = [], {}
+    for col, mode, fn in cases:
+        out, sec, _ = measure(fn)
+        results.setdefault(col, []).append(out)
+        rows.append({'컬럼': col, '방식': mode, '행수': len(out), '소요시간(초)': round(sec, 4)})
+    for col, (old, new) in results.items():
+        assert old.tolist() == new.tolist(), f"{col} 결과 불일치"
+    
+    report(rows)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""추가 필터식 비교: df.query (매번 파싱) vs 컴파일된 마스크 평가 (식 단위 캐시)
+
+    python -m benchmarks.bench_expr [엑셀경로] [--scale N]
+"""
+from __future__ import annotations
+import pandas as pd
+from benchmarks._util import measure, parse_args, report, scale_frame
+from core import expr, io
+
+def cases(df: pd.DataFrame) -> list[str]:
+    channels = df['채널명'].dropna().value_counts().index[:2].tolist()
+    return [
+        "수량 >= 2",
+        f"채널명 in {channels!r}",
+        f"채널명 not in {channels!r} and 수량 > 1",
+        "`상품별 총 주문금액` > 50000 or 수량 == 3",
+        "1 < 수량 <= 3",
+        "`상품별 총 주문금액` / 수량 > 20000",
+    ]
+
+def main():
+    args = parse_args(__doc__)
+    df = scale_frame(io.build_orders(args.path), args.scale)
+    
+    rows = []
+    for text in cases(df):
+        expected, query_sec, _ = measure(df.query, text)
+        got, compiled_sec, _ = measure(lambda: df[expr.expr_mask(df, text)])
+        pd.testing.assert_frame_equal(expected, got)
+        rows.append({'필터식': text, '행수': len(got), 'query(초)': round(query_sec, 4), '컴파일(초)': round(compiled_sec, 4)})
+    report(rows)
+
+if __name__ == '__main__':
+    main()
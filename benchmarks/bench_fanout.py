@@ -0,0 +1,73 @@
+"""업체별 보고서 처리량 비교: 업체마다 sellers=[업체]로 지표 호출 vs 업체명을 바깥 키로 붙인 일괄 계산
+
+    python -m benchmarks.bench_fanout [엑셀경로] [--scale N]
+
+개별 호출은 상위 업체 SAMPLE개로 측정해 업체/초로 환산하고, 그 결과와 일괄 계산의 업체 분량이 같은지 확인한다.
+"""
+from __future__ import annotations
+import tempfile
+import pandas as pd
+from benchmarks._util import measure, parse_args, report, scale_frame
+from core import batch, dataset, fanout, io
+
+SAMPLE = 20
+
+def run_each(df, params: dict, sellers: list[str], metric_ids: list[str]) -> dict:
+    out = {}
+    for seller in sellers:
+        results, errors = batch.run_batch(df, {**params, 'sellers': [seller]}, metric_ids)
+        assert not errors, errors
+        out[seller] = results
+    return out
+
+def _canonical(frame: pd.DataFrame) -> pd.DataFrame:
+    """행 순서를 무시하고 비교하도록 전체 컬럼 기준 정렬"""
+    return frame.sort_values(list(frame.columns), kind='stable').reset_index(drop=True)
+
+def _align_numbers(expected: pd.DataFrame, got: pd.DataFrame) -> pd.DataFrame:
+    """지표는 데이터에 따라 0을 정수로, 이슈건수를 실수로 돌려주므로 값이 같은 정수/실수 차이만 섹션 타입에 맞춤"""
+    expected = expected.copy()
+    for col in expected.columns:
+        want, have = got[col].dtype, expected[col].dtype
+        if want != have and pd.api.types.is_numeric_dtype(want) and pd.api.types.is_numeric_dtype(have):
+            values = expected[col]
+            if want.kind == 'f' or (values.notna().all() and (values % 1 == 0).all()):
+                expected[col] = values.astype(want)
+    return expected
+
+def check_views(views: dict, each: dict):
+    """섹션의 업체 분량을 대응 지표 컬럼으로 잘라 업체별 호출 결과와 비교"""
+    for name, g in views.items():
+        for mid in fanout.SECTIONS[name][0]:
+            for seller, results in each.items():
+                expected = results[mid].reset_index(drop=True)
+                got = g.loc[g[fanout.SELLER] == seller, list(expected.columns)]
+                if expected.empty and got.empty:
+                    continue
+                expected = _align_numbers(expected, got)
+                try:
+                    pd.testing.assert_frame_equal(_canonical(got), _canonical(expected))
+                except AssertionError as e:
+                    raise AssertionError(f"{name}/{mid} 업체 {seller}: {e}") from None
+
+def main():
+    args = parse_args(__doc__)
+    df = scale_frame(io.build_orders(args.path), args.scale)
+    dataset.register_dataset(df, 'bench')
+    params = {'top_n': 30}
+    metric_ids = [mid for ids, _ in fanout.SECTIONS.values() for mid in ids]
+    sellers = df['업체명'].value_counts().index[:SAMPLE].tolist()
+
+    each, each_sec, _ = measure(run_each, df, params, sellers, metric_ids)
+    check_views(fanout.seller_views(df, params), each)
+    with tempfile.TemporaryDirectory() as root:
+        stats, fan_sec, peak = measure(fanout.export_sellers, df, params, root)
+    report([
+        {'방식': '업체별 호출', '업체수': len(sellers), '소요(초)': round(each_sec, 4),
+         '업체/초': round(len(sellers) / each_sec, 1)},
+        {'방식': '일괄 계산+저장', '업체수': stats['sellers'], '소요(초)': round(fan_sec, 4),
+         '업체/초': round(stats['sellers'] / fan_sec, 1), '최대메모리(MB)': round(peak, 1)},
+    ])
+
+if __name__ == '__main__':
+    main()
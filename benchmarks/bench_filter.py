@@ -0,0 +1,38 @@
+"""apply_params_filter 비교: 단계별 마스킹(미등록 프레임) vs 필터 인덱스(등록된 데이터셋)
+
+    python -m benchmarks.bench_filter [엑셀경로] [--scale N]
+"""
+from __future__ import annotations
+import pandas as pd
+from benchmarks._util import measure, parse_args, report, scale_frame
+from core import base_metrics, dataset, filters, io
+
+def param_cases(df: pd.DataFrame) -> dict[str, dict]:
+    lo, hi = df['주문일시'].min(), df['주문일시'].max()
+    week = hi - pd.Timedelta(days=7)
+    channels = df['채널명'].dropna().value_counts().index[:2].tolist()
+    sellers = df['업체명'].dropna().value_counts().index[:3].tolist()
+    return {
+        '전체(취소 제외)': {},
+        '최근 7일': {'date_from': week, 'date_to': hi},
+        '최근 7일 + 채널': {'date_from': week, 'date_to': hi, 'channels': channels},
+        '업체 3곳 (취소 포함)': {'sellers': sellers, 'include_canceled': True},
+    }
+
+def main():
+    args = parse_args(__doc__)
+    base = scale_frame(io.build_orders(args.path), args.scale)
+    indexed = base.copy()
+    dataset.register_dataset(indexed, 'bench')
+    _, build_sec, _ = measure(filters.get_index, indexed)
+    
+    rows = [{'조건': '(인덱스 구축)', '행수': len(base), '기존(초)': None, '인덱스(초)': round(build_sec, 4)}]
+    for name, params in param_cases(base).items():
+        old, old_sec, _ = measure(base_metrics.apply_params_filter, base, params)
+        new, new_sec, _ = measure(base_metrics.apply_params_filter, indexed, params)
+        pd.testing.assert_frame_equal(old, new)
+        rows.append({'조건': name, '행수': len(new), '기존(초)': round(old_sec, 4), '인덱스(초)': round(new_sec, 4)})
+    report(rows)
+
+if __name__ == '__main__':
+    main()
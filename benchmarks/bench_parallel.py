@@ -0,0 +1,28 @@
+"""전체 지표 실행 비교: 단일 프로세스 배치 실행 vs 공유 메모리 워커 병렬 실행
+
+    python -m benchmarks.bench_parallel [엑셀경로] [--scale N]
+"""
+from __future__ import annotations
+import os
+import pandas as pd
+from benchmarks._util import measure, parse_args, report, scale_frame
+from core import batch, dataset, io, parallel
+
+def main():
+    args = parse_args(__doc__)
+    df = scale_frame(io.build_orders(args.path), args.scale)
+    dataset.register_dataset(df, 'bench')
+    params = {'top_n': 30}
+    
+    (serial, _), serial_sec, _ = measure(batch.run_batch, df, params)
+    rows = [{'실행': '배치(단일 프로세스)', '워커': 1, '지표수': len(serial), '오류': 0, '소요(초)': round(serial_sec, 4)}]
+    for workers in sorted({2, os.cpu_count() or 1}):
+        (results, errors), sec, _ = measure(parallel.run_parallel, df, params, workers=workers)
+        for mid, result in results.items():
+            if isinstance(result, pd.DataFrame):
+                pd.testing.assert_frame_equal(serial[mid], result)
+        rows.append({'실행': '병렬(공유 메모리)', '워커': workers, '지표수': len(results), '오류': len(errors), '소요(초)': round(sec, 4)})
+    report(rows)
+
+if __name__ == '__main__':
+    main()
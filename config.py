@@ -4,6 +4,18 @@ from __future__ import annotations
 DATA_XLSX_PATH = "/Users/brich/Downloads/bflow_metrics_dashboard_impl/order_list_20250818120157_497.xlsx"
 SHEET_NAME = "b-flow 주문 내역"
 
+# 폴더 적재 모드: 지정하면 DATA_XLSX_PATH 대신 폴더의 주문 파일을 증분 적재
+DATA_DIR = None
+DATA_FILE_GLOB = "order_list_*.xlsx"
+DATASET_DIR = ".cache/dataset"
+
+# 엑셀 로드 방식: "pandas" (read_excel 일괄 로드) | "stream" (read_only 청크 스트리밍, 대용량용)
+INGEST_MODE = "pandas"
+STREAM_CHUNK_ROWS = 50_000
+
+# 압축 스키마: 차원 컬럼을 범주형(정수 코드)으로 적재하여 메모리 절감/groupby 가속
+COMPACT_SCHEMA = False
+
 # 실제 Excel 컬럼명 → 표준화된 컬럼명 매핑
 COLMAP = {
     "주문일시": "결제일",
@@ -33,11 +45,51 @@ DEFAULT_PARAMS = {
     "top_n": 50,
     "min_orders": 0,
     "include_canceled": False,
+    "compare_mode": "period",
     "extra_filter_expr": "",
 }
 
 # 캐시 설정
 CACHE_TTL_SEC = 600
 
+# 필터 결과(행 선택) 캐시 용량 (같은 필터로 여러 지표를 볼 때 재사용)
+FILTER_CACHE_MAX_MB = 64
+
+# 고객 요약 테이블 캐시 개수 (데이터셋 버전 + 필터 조건 단위)
+CUSTOMER_CACHE_ENTRIES = 8
+
+# 전처리 결과 스냅샷 (원본 경로/크기/수정시각이 같으면 엑셀 재파싱 생략)
+SNAPSHOT_ENABLED = True
+SNAPSHOT_DIR = ".cache/snapshots"
+
+# 주문일 기준 파티션 저장소 (기간 조회 시 해당 파티션/컬럼만 읽음, 'M': 월 단위, 'D': 일 단위)
+STORE_ENABLED = False
+STORE_DIR = ".cache/store"
+STORE_PARTITION = "M"
+# 전체 기간 데이터를 읽는 지표 (신규/이탈 고객 판정, 저장소의 기간 한정 로딩 대신 전체 프레임 사용)
+FULL_HISTORY_METRICS = ('A3_006', 'A3_007')
+
+# 지표 계산 백엔드 ('pandas': 메모리 DataFrame, 'sqlite': 내장 DB에서 필터/집계 처리)
+QUERY_BACKEND = "pandas"
+SQL_DB_PATH = ":memory:"
+
+# 일 단위 사전 집계 큐브 (합계/건수 지표를 원본 행 대신 큐브 셀로 계산)
+CUBE_ENABLED = True
+
+# 병렬 지표 실행 (워커 수 None이면 CPU 코어 수, 지표별 제한 시간(초) None이면 무제한)
+PARALLEL_WORKERS = None
+PARALLEL_METRIC_TIMEOUT = 300
+# 워커 프로세스 시작 방식 ('spawn': 부모 프로세스의 스레드/락 상태를 물려받지 않음)
+PARALLEL_START_METHOD = "spawn"
+
+# 지표 결과 캐시 (지표 코드 + 파라미터 + 데이터셋 버전 단위, 메모리 LRU + 디스크 parquet)
+RESULT_CACHE_ENABLED = True
+RESULT_CACHE_ENTRIES = 256
+RESULT_CACHE_DIR = ".cache/results"
+RESULT_CACHE_DISK_ENTRIES = 2000
+
+# 업체별 보고서 일괄 생성 결과 (섹션별 parquet, 행은 업체 순)
+FANOUT_DIR = ".cache/fanout"
+
 # 카테고리 파일 경로 (필요시)
 CATEGORY_FILE_PATH = 'brich_category_2504071.csv'
\ No newline at end of file
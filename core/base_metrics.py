@@ -1,9 +1,9 @@
 from __future__ import annotations
 import pandas as pd
 import numpy as np
-import re
 from datetime import datetime, timedelta
 import warnings
+from . import batch, category, cube, expr, filters, preprocess, sql_backend, surrogate
 warnings.filterwarnings('ignore')
 
 # 전역 상수
@@ -13,7 +13,7 @@ DEFAULT_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
 NUMERIC_PRECISION = 2
 CATEGORY_FILE_PATH = 'brich_category_2504071.csv'
 
-# 전역 변수
+# 전역 변수 (하위 호환용, 조회는 category.get_index 사용)
 CATEGORY_DF = None
 
 # ===== [0] 기본 - 설정 =====
@@ -34,15 +34,13 @@ def basic_constants_setup():
 def load_category_data(file_path=CATEGORY_FILE_PATH):
     """카테고리데이터로드"""
     global CATEGORY_DF
-    if CATEGORY_DF is None:
-        try:
-            CATEGORY_DF = pd.read_csv(file_path)
-            CATEGORY_DF = CATEGORY_DF[['Depth', 'Code', 'Name']].copy()
-            CATEGORY_DF['Code'] = CATEGORY_DF['Code'].astype(str)
-            return {'status': 'loaded', 'rows': len(CATEGORY_DF)}
-        except Exception as e:
-            return {'status': 'error', 'message': str(e)}
-    return {'status': 'already_loaded', 'rows': len(CATEGORY_DF)}
+    try:
+        index = category.get_index(file_path)
+    except Exception as e:
+        return {'status': 'error', 'message': str(e)}
+    status = 'already_loaded' if CATEGORY_DF is index.frame else 'loaded'
+    CATEGORY_DF = index.frame
+    return {'status': status, 'rows': index.rows}
 
 def basic_filtering(df, company_name=None, exclude_cancelled=DEFAULT_EXCLUDE_CANCELLED):
     """기본필터링"""
@@ -61,7 +59,12 @@ def apply_additional_filter(df, filter_condition=None):
     if filter_condition is None:
         return df
     if isinstance(filter_condition, str):
-        return df.query(filter_condition)
+        try:
+            mask = expr.expr_mask(df, filter_condition)
+        except (ValueError, TypeError):
+            # 컴파일러가 지원하지 않는 구문은 기존처럼 df.query로 처리
+            return df.query(filter_condition)
+        return df[mask]
     elif isinstance(filter_condition, dict):
         filtered_df = df.copy()
         for column, condition in filter_condition.items():
@@ -102,99 +105,36 @@ def get_settings_info():
 # ===== [0] 기본 - 데이터변환 =====
 def create_unique_buyer(df):
     """고유구매자생성"""
-    def extract_phone_last4(phone_str):
-        if pd.isna(phone_str):
-            return ''
-        phone_digits = re.sub(r'[^0-9]', '', str(phone_str))
-        return phone_digits[-4:] if len(phone_digits) >= 4 else phone_digits
-    
     df = df.copy()
-    phone_last4 = df['구매자연락처'].apply(extract_phone_last4)
+    phone_last4 = preprocess.phone_last4(df['구매자연락처'], missing='')
     df['고유구매자'] = df['구매자명'] + '_' + phone_last4
     return df
 
+def _category_index(category_file_path):
+    try:
+        return category.get_index(category_file_path)
+    except Exception as e:
+        raise Exception(f"카테고리 데이터 로드 실패: {e}")
+
 def map_middle_category_name(df, category_file_path=CATEGORY_FILE_PATH):
     """중분류명매핑"""
-    load_result = load_category_data(category_file_path)
-    if load_result['status'] == 'error':
-        raise Exception(f"카테고리 데이터 로드 실패: {load_result['message']}")
+    index = _category_index(category_file_path)
     
     df = df.copy()
-    df['정규카테고리코드'] = (df['카테고리'].astype(str)
-                        .str.replace(r'\.0$', '', regex=True)
-                        .str.replace(r'\D', '', regex=True))
-    
-    df['중분류코드'] = df['정규카테고리코드'].apply(lambda x: str(x)[:5] if len(str(x)) >= 5 else str(x))
-    
-    if CATEGORY_DF is not None:
-        middle_categories = CATEGORY_DF[CATEGORY_DF['Depth'] == 2].copy()
-        middle_mapping = dict(zip(middle_categories['Code'], middle_categories['Name']))
-        
-        def map_to_middle_name(code):
-            if pd.isna(code) or code == '':
-                return '기타'
-            code_str = str(code)
-            if code_str in middle_mapping:
-                return middle_mapping[code_str]
-            for cat_code, cat_name in middle_mapping.items():
-                if code_str.zfill(5) == cat_code.zfill(5):
-                    return cat_name
-            return f'미분류_{code_str}'
-        
-        df['중분류명'] = df['중분류코드'].apply(map_to_middle_name)
-    else:
-        df['중분류명'] = '기타'
-    
+    df['정규카테고리코드'] = category.normalize_codes(df['카테고리'])
+    df['중분류코드'] = category.middle_codes(df['정규카테고리코드'])
+    df['중분류명'] = index.middle_names(df['중분류코드'])
     return df
 
 def map_sub_category_name(df, category_file_path=CATEGORY_FILE_PATH):
     """소분류명매핑"""
-    load_result = load_category_data(category_file_path)
-    if load_result['status'] == 'error':
-        raise Exception(f"카테고리 데이터 로드 실패: {load_result['message']}")
+    index = _category_index(category_file_path)
     
     df = df.copy()
     if '정규카테고리코드' not in df.columns:
-        df['정규카테고리코드'] = (df['카테고리'].astype(str)
-                            .str.replace(r'\.0$', '', regex=True)
-                            .str.replace(r'\D', '', regex=True))
-    
-    def extract_sub_code(code_str):
-        code_str = str(code_str)
-        if len(code_str) >= 9:
-            return code_str[:9]
-        elif len(code_str) >= 5:
-            return code_str[:5]
-        return code_str
-    
-    df['소분류코드'] = df['정규카테고리코드'].apply(extract_sub_code)
-    
-    if CATEGORY_DF is not None:
-        sub_categories = CATEGORY_DF[CATEGORY_DF['Depth'] == 3].copy()
-        sub_mapping = dict(zip(sub_categories['Code'], sub_categories['Name']))
-        
-        def map_to_sub_name(code):
-            if pd.isna(code) or code == '':
-                return '기타'
-            code_str = str(code)
-            if code_str in sub_mapping:
-                return sub_mapping[code_str]
-            for cat_code, cat_name in sub_mapping.items():
-                if code_str.zfill(9) == cat_code.zfill(9):
-                    return cat_name
-            
-            middle_code = code_str[:5] if len(code_str) >= 5 else code_str
-            middle_categories = CATEGORY_DF[CATEGORY_DF['Depth'] == 2]
-            middle_mapping = dict(zip(middle_categories['Code'], middle_categories['Name']))
-            
-            if middle_code in middle_mapping:
-                return f"{middle_mapping[middle_code]} (세부미분류)"
-            return f'미분류_{code_str}'
-        
-        df['소분류명'] = df['소분류코드'].apply(map_to_sub_name)
-    else:
-        df['소분류명'] = '기타'
-    
+        df['정규카테고리코드'] = category.normalize_codes(df['카테고리'])
+    df['소분류코드'] = category.sub_codes(df['정규카테고리코드'].astype(str))
+    df['소분류명'] = index.sub_names(df['소분류코드'])
     return df
 
 def category_classifier(df, category_type='중분류', filter_condition=None):
@@ -202,9 +142,6 @@ def category_classifier(df, category_type='중분류', filter_condition=None):
     if filter_condition:
         df = apply_additional_filter(df, filter_condition)
     
-    if CATEGORY_DF is None:
-        load_category_data()
-    
     df_with_category = df.copy()
     
     if category_type == '중분류':
@@ -221,14 +158,14 @@ def total_revenue(df, group_by=None, filter_condition=None):
     """총매출액"""
     filtered_df = apply_additional_filter(df, filter_condition)
     if group_by:
-        return filtered_df.groupby(group_by)['상품별 총 주문금액'].sum()
+        return filtered_df.groupby(group_by, observed=True)['상품별 총 주문금액'].sum()
     return filtered_df['상품별 총 주문금액'].sum()
 
 def total_orders(df, group_by=None, filter_condition=None):
     """총주문건수"""
     filtered_df = apply_additional_filter(df, filter_condition)
     if group_by:
-        return filtered_df.groupby(group_by).size()
+        return filtered_df.groupby(group_by, observed=True).size()
     return len(filtered_df)
 
 def successful_orders(df, group_by=None, filter_condition=None):
@@ -236,7 +173,7 @@ def successful_orders(df, group_by=None, filter_condition=None):
     filtered_df = apply_additional_filter(df, filter_condition)
     success_df = filtered_df[filtered_df['주문상태'] != '결제취소']
     if group_by:
-        return success_df.groupby(group_by).size()
+        return success_df.groupby(group_by, observed=True).size()
     return len(success_df)
 
 def cancelled_orders(df, group_by=None, filter_condition=None):
@@ -244,7 +181,7 @@ def cancelled_orders(df, group_by=None, filter_condition=None):
     filtered_df = apply_additional_filter(df, filter_condition)
     cancel_df = filtered_df[filtered_df['주문상태'] == '결제취소']
     if group_by:
-        return cancel_df.groupby(group_by).size()
+        return cancel_df.groupby(group_by, observed=True).size()
     return len(cancel_df)
 
 def return_orders(df, group_by=None, filter_condition=None):
@@ -252,7 +189,7 @@ def return_orders(df, group_by=None, filter_condition=None):
     filtered_df = apply_additional_filter(df, filter_condition)
     return_df = filtered_df[filtered_df['주문상태'] == '반품']
     if group_by:
-        return return_df.groupby(group_by).size()
+        return return_df.groupby(group_by, observed=True).size()
     return len(return_df)
 
 def claim_orders(df, group_by=None, filter_condition=None):
@@ -260,7 +197,7 @@ def claim_orders(df, group_by=None, filter_condition=None):
     filtered_df = apply_additional_filter(df, filter_condition)
     claim_df = filtered_df[filtered_df['클레임'].notna()]
     if group_by:
-        return claim_df.groupby(group_by).size()
+        return claim_df.groupby(group_by, observed=True).size()
     return len(claim_df)
 
 def total_customers(df, group_by=None, filter_condition=None):
@@ -268,52 +205,125 @@ def total_customers(df, group_by=None, filter_condition=None):
     filtered_df = apply_additional_filter(df, filter_condition)
     if '고유구매자' not in filtered_df.columns:
         filtered_df = create_unique_buyer(filtered_df)
+    # 고유값 계산은 정수 ID로 (결측 라벨이 있으면 라벨 그대로)
+    col = surrogate.id_key(filtered_df, '고유구매자')
     if group_by:
-        return filtered_df.groupby(group_by)['고유구매자'].nunique()
-    return filtered_df['고유구매자'].nunique()
+        return filtered_df.groupby(group_by, observed=True)[col].nunique().rename('고유구매자')
+    return filtered_df[col].nunique()
 
 def total_products(df, group_by=None, filter_condition=None):
     """총상품수"""
     filtered_df = apply_additional_filter(df, filter_condition)
+    col = surrogate.id_key(filtered_df, '상품명')
     if group_by:
-        return filtered_df.groupby(group_by)['상품명'].nunique()
-    return filtered_df['상품명'].nunique()
+        return filtered_df.groupby(group_by, observed=True)[col].nunique().rename('상품명')
+    return filtered_df[col].nunique()
 
 def total_profit(df, group_by=None, filter_condition=None):
     """총수익액"""
     filtered_df = apply_additional_filter(df, filter_condition)
     if group_by:
-        return filtered_df.groupby(group_by)['정산금액'].sum()
+        return filtered_df.groupby(group_by, observed=True)['정산금액'].sum()
     return filtered_df['정산금액'].sum()
 
 def total_quantity(df, group_by=None, filter_condition=None):
     """총수량"""
     filtered_df = apply_additional_filter(df, filter_condition)
     if group_by:
-        return filtered_df.groupby(group_by)['수량'].sum()
+        return filtered_df.groupby(group_by, observed=True)['수량'].sum()
     return filtered_df['수량'].sum()
 
+# ===== [0] 기본 - 다중 집계 =====
+# grouped_measures 합계 측정값 → 원본 컬럼
+SUM_MEASURES = {'총매출액': '상품별 총 주문금액', '총수익액': '정산금액', '총수량': '수량'}
+# 건수 측정값 (총건수 = 행 수, 성공건수 = 총건수 - 취소건수)
+COUNT_MEASURES = ['총건수', '취소건수', '반품건수', '교환건수', '클레임건수', '성공건수']
+
+def _measure_columns(d, measures):
+    """행별 측정값 컬럼 (합계 대상 값 또는 0/1 지시값)"""
+    cols = {name: d[src] for name, src in SUM_MEASURES.items() if name in measures and src in d.columns}
+    cols['총건수'] = np.ones(len(d), dtype=np.int64)
+    # 주문상태 결측 행은 취소/반품이 아닌 것으로 집계
+    if {'취소건수', '성공건수'} & set(measures):
+        cols['취소건수'] = (d['주문상태'] == '결제취소').to_numpy(dtype=bool, na_value=False).astype(np.int64)
+    if '반품건수' in measures:
+        cols['반품건수'] = (d['주문상태'] == '반품').to_numpy(dtype=bool, na_value=False).astype(np.int64)
+    if '교환건수' in measures:
+        if preprocess.ISSUE_FLAG_COL in d.columns:
+            bits = _issue_bits('교환', columns='claim')
+            cols['교환건수'] = ((d[preprocess.ISSUE_FLAG_COL].to_numpy() & bits) != 0).astype(np.int64)
+        else:
+            cols['교환건수'] = d['클레임'].str.contains('교환', na=False).to_numpy(dtype=np.int64)
+    if '클레임건수' in measures:
+        cols['클레임건수'] = d['클레임'].notna().to_numpy(dtype=np.int64)
+    return pd.DataFrame(cols, index=d.index)
+
+def _filter_columns(filter_condition):
+    """필터 조건에 쓰이는 컬럼 (알 수 없으면 None)"""
+    if filter_condition is None:
+        return []
+    if isinstance(filter_condition, dict):
+        return list(filter_condition)
+    if isinstance(filter_condition, str):
+        try:
+            return expr.compile_expr(filter_condition).columns
+        except ValueError:
+            return None
+    return None
+
+def grouped_measures(df, group_by=None, filter_condition=None, measures=None):
+    """그룹별 기본 측정값을 한 번의 groupby로 집계
+
+    매출/수익/수량 합계와 총건수, 취소/반품/교환/클레임/성공 건수를 컬럼으로 반환한다.
+    group_by가 없으면 전체 합계 Series. measures로 필요한 측정값만 계산할 수 있다.
+    """
+    measures = list(measures or [*SUM_MEASURES, *COUNT_MEASURES])
+    keys = [] if not group_by else [group_by] if isinstance(group_by, str) else list(group_by)
+    if isinstance(df, sql_backend.SqlView):
+        df = df.frame
+    # 집계/필터에 필요한 컬럼만 남긴 뒤 필터 (필터 결과 복사 비용 절감)
+    filter_cols = _filter_columns(filter_condition)
+    if filter_cols is not None:
+        used = [*keys, *SUM_MEASURES.values(), '주문상태', '클레임', preprocess.ISSUE_FLAG_COL, *filter_cols]
+        df = df[[c for c in dict.fromkeys(used) if c in df.columns]]
+    filtered_df = apply_additional_filter(df, filter_condition)
+    values = _measure_columns(filtered_df, measures)
+    if keys:
+        result = values.groupby([filtered_df[k] for k in keys], observed=True).sum()
+    else:
+        result = values.sum()
+    if '성공건수' in measures:
+        result['성공건수'] = result['총건수'] - result['취소건수']
+    return result[[m for m in measures if m in result]]
+
+def _ratio(measures, numerator, denominator, grouped):
+    """측정값 비율(%) (그룹별: 결측 0, 전체: 분모 0이면 0)"""
+    num, den = measures[numerator], measures[denominator]
+    if grouped:
+        return (num / den * 100).fillna(0).round(2).rename(None)
+    return round(num / den * 100, 2) if den > 0 else 0
+
 # ===== [0] 기본 - 평균 =====
 def avg_order_value(df, group_by=None, filter_condition=None):
     """평균주문금액"""
-    revenue = total_revenue(df, group_by=group_by, filter_condition=filter_condition)
-    orders = total_orders(df, group_by=group_by, filter_condition=filter_condition)
+    m = grouped_measures(df, group_by, filter_condition, measures=['총매출액', '총건수'])
+    revenue, orders = m['총매출액'], m['총건수']
     if group_by:
-        return (revenue / orders.replace(0, np.nan)).fillna(0)
+        return (revenue / orders.replace(0, np.nan)).fillna(0).rename(None)
     return revenue / orders if orders > 0 else 0
 
 def avg_product_price(df, group_by=None, filter_condition=None):
     """평균상품가격"""
     filtered_df = apply_additional_filter(df, filter_condition)
     if group_by:
-        return filtered_df.groupby(group_by)['상품가격'].mean()
+        return filtered_df.groupby(group_by, observed=True)['상품가격'].mean()
     return filtered_df['상품가격'].mean()
 
 def avg_quantity(df, group_by=None, filter_condition=None):
     """평균수량"""
     filtered_df = apply_additional_filter(df, filter_condition)
     if group_by:
-        return filtered_df.groupby(group_by)['수량'].mean()
+        return filtered_df.groupby(group_by, observed=True)['수량'].mean()
     return filtered_df['수량'].mean()
 
 def avg_shipping_time(df, group_by=None, filter_condition=None):
@@ -326,7 +336,7 @@ def avg_shipping_time(df, group_by=None, filter_condition=None):
     valid_df['출고예정일'] = pd.to_datetime(valid_df['출고예정일'])
     valid_df['출고시간'] = (valid_df['출고예정일'] - valid_df['주문일시']).dt.days
     if group_by:
-        return valid_df.groupby(group_by)['출고시간'].mean()
+        return valid_df.groupby(group_by, observed=True)['출고시간'].mean()
     return valid_df['출고시간'].mean()
 
 def unique_avg_value(df, numerator_col, denominator_col, group_by=None, filter_condition=None):
@@ -337,66 +347,67 @@ def unique_avg_value(df, numerator_col, denominator_col, group_by=None, filter_c
         return 0 if not group_by else pd.Series(dtype=float)
     valid_df['비율'] = valid_df[numerator_col] / valid_df[denominator_col]
     if group_by:
-        return valid_df.groupby(group_by)['비율'].mean()
+        return valid_df.groupby(group_by, observed=True)['비율'].mean()
     return valid_df['비율'].mean()
 
 # ===== [0] 기본 - 비율 =====
 def cancellation_rate(df, group_by=None, filter_condition=None):
     """취소율"""
-    cancelled = cancelled_orders(df, group_by=group_by, filter_condition=filter_condition)
-    total = total_orders(df, group_by=group_by, filter_condition=filter_condition)
-    
-    if group_by:
-        return (cancelled / total * 100).fillna(0).round(2)
-    return round(cancelled / total * 100, 2) if total > 0 else 0
+    m = grouped_measures(df, group_by, filter_condition, measures=['취소건수', '총건수'])
+    return _ratio(m, '취소건수', '총건수', bool(group_by))
 
 def return_rate(df, group_by=None, filter_condition=None):
     """반품률"""
-    returned = return_orders(df, group_by=group_by, filter_condition=filter_condition)
-    total = total_orders(df, group_by=group_by, filter_condition=filter_condition)
-    
-    if group_by:
-        return (returned / total * 100).fillna(0).round(2)
-    return round(returned / total * 100, 2) if total > 0 else 0
+    m = grouped_measures(df, group_by, filter_condition, measures=['반품건수', '총건수'])
+    return _ratio(m, '반품건수', '총건수', bool(group_by))
 
 def exchange_rate(df, group_by=None, filter_condition=None):
     """교환율"""
-    filtered_df = apply_additional_filter(df, filter_condition)
-    exchange_df = filtered_df[filtered_df['클레임'].str.contains('교환', na=False)]
-    
-    exchanged = total_orders(exchange_df, group_by=group_by)
-    total = total_orders(filtered_df, group_by=group_by)
-    
-    if group_by:
-        return (exchanged / total * 100).fillna(0).round(2)
-    return round(exchanged / total * 100, 2) if total > 0 else 0
+    m = grouped_measures(df, group_by, filter_condition, measures=['교환건수', '총건수'])
+    return _ratio(m, '교환건수', '총건수', bool(group_by))
 
 def delivery_success_rate(df, group_by=None, filter_condition=None):
     """배송성공률"""
-    success = successful_orders(df, group_by=group_by, filter_condition=filter_condition)
-    total = total_orders(df, group_by=group_by, filter_condition=filter_condition)
-    
-    if group_by:
-        return (success / total * 100).fillna(0).round(2)
-    return round(success / total * 100, 2) if total > 0 else 0
+    m = grouped_measures(df, group_by, filter_condition, measures=['성공건수', '총건수'])
+    return _ratio(m, '성공건수', '총건수', bool(group_by))
 
 def claim_rate(df, group_by=None, filter_condition=None):
     """클레임률"""
-    claims = claim_orders(df, group_by=group_by, filter_condition=filter_condition)
-    total = total_orders(df, group_by=group_by, filter_condition=filter_condition)
-    
-    if group_by:
-        return (claims / total * 100).fillna(0).round(2)
-    return round(claims / total * 100, 2) if total > 0 else 0
+    m = grouped_measures(df, group_by, filter_condition, measures=['클레임건수', '총건수'])
+    return _ratio(m, '클레임건수', '총건수', bool(group_by))
 
 def profit_rate(df, group_by=None, filter_condition=None):
     """수익률"""
-    profit = total_profit(df, group_by=group_by, filter_condition=filter_condition)
-    revenue = total_revenue(df, group_by=group_by, filter_condition=filter_condition)
-    
-    if group_by:
-        return (profit / revenue * 100).fillna(0).round(2)
-    return round(profit / revenue * 100, 2) if revenue > 0 else 0
+    m = grouped_measures(df, group_by, filter_condition, measures=['총수익액', '총매출액'])
+    return _ratio(m, '총수익액', '총매출액', bool(group_by))
+
+def repurchase_table(d: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    """그룹별 고객수/재구매고객수/재구매율 (그룹×고객 구매횟수를 한 번에 집계)"""
+    if isinstance(d, sql_backend.SqlView):
+        d = d.frame
+    if '고유구매자' not in d.columns:
+        d = create_unique_buyer(d)
+    grouped = d.groupby(keys, observed=True)
+    group = grouped.ngroup().fillna(-1).to_numpy().astype(np.int64)
+    col = surrogate.id_key(d, '고유구매자')
+    if col == '고유구매자':
+        buyer = pd.factorize(d[col])[0]
+    else:
+        buyer = d[col].to_numpy().astype(np.int64)
+    # 결측 그룹/고객 행 제외 후 (그룹, 고객) 쌍별 구매횟수
+    valid = (group >= 0) & (buyer >= 0)
+    n_buyers = int(buyer.max()) + 1 if valid.any() else 1
+    pairs, counts = np.unique(group[valid] * n_buyers + buyer[valid], return_counts=True)
+    pair_group = pairs // n_buyers
+    n_groups = grouped.ngroups
+    total = np.bincount(pair_group, minlength=n_groups)
+    repeat = np.bincount(pair_group, weights=counts >= 2, minlength=n_groups).astype(np.int64)
+    out = grouped.size().index.to_frame(index=False)
+    out['고객수'] = total
+    out['재구매고객수'] = repeat
+    rate = np.divide(repeat * 100, total, out=np.zeros(n_groups), where=total > 0)
+    out['재구매율(%)'] = np.round(rate, 2)
+    return out
 
 def repurchase_rate(df, group_by=None, filter_condition=None):
     """재구매율"""
@@ -405,16 +416,10 @@ def repurchase_rate(df, group_by=None, filter_condition=None):
         filtered_df = create_unique_buyer(filtered_df)
     
     if group_by:
-        grouped = filtered_df.groupby(group_by)
-        results = {}
-        for name, group in grouped:
-            customer_orders = group.groupby('고유구매자').size()
-            repeat_customers = len(customer_orders[customer_orders >= 2])
-            total_customers = len(customer_orders)
-            results[name] = round(repeat_customers / total_customers * 100, 2) if total_customers > 0 else 0
-        return pd.Series(results)
+        keys = [group_by] if isinstance(group_by, str) else list(group_by)
+        return repurchase_table(filtered_df, keys).set_index(keys)['재구매율(%)']
     
-    customer_orders = filtered_df.groupby('고유구매자').size()
+    customer_orders = filtered_df.groupby(surrogate.id_key(filtered_df, '고유구매자'), observed=True).size()
     repeat_customers = len(customer_orders[customer_orders >= 2])
     total_customers = len(customer_orders)
     
@@ -427,7 +432,11 @@ def contribution_calculator(df, metric_column, group_by=None, filter_condition=N
         df = apply_additional_filter(df, filter_condition)
     
     if group_by:
-        group_sum = df.groupby(group_by)[metric_column].sum().reset_index()
+        keys = [group_by] if isinstance(group_by, str) else list(group_by)
+        ids = surrogate.id_keys(df, keys)
+        group_sum = df.groupby(ids or keys, observed=True)[metric_column].sum().reset_index()
+        if ids:
+            group_sum = surrogate.decode(df, group_sum, keys, ids)
         total_sum = df[metric_column].sum()
         group_sum['기여도(%)'] = (group_sum[metric_column] / total_sum * 100).round(2)
         group_sum['누적기여도(%)'] = group_sum['기여도(%)'].cumsum().round(2)
@@ -440,12 +449,24 @@ def market_share_calculator(df, metric_column, group_by, filter_condition=None):
     if filter_condition:
         df = apply_additional_filter(df, filter_condition)
     
-    group_sum = df.groupby(group_by)[metric_column].sum().reset_index()
+    if isinstance(df, sql_backend.SqlView) and metric_column in df.columns:
+        keys = [group_by] if isinstance(group_by, str) else list(group_by)
+        group_sum = df.group_sum(keys, metric_column, metric_column, dropna=True)
+    else:
+        group_sum = df.groupby(group_by, observed=True)[metric_column].sum().reset_index()
     total_sum = group_sum[metric_column].sum()
     group_sum['점유율(%)'] = (group_sum[metric_column] / total_sum * 100).round(2)
     
     return group_sum.sort_values('점유율(%)', ascending=False)
 
+def growth_rate(current, previous) -> pd.Series:
+    """변동률(%) (이전 값이 0이면 현재 값이 양수일 때 100, 아니면 0)"""
+    current = pd.Series(current).astype(float)
+    previous = pd.Series(previous).astype(float)
+    rate = (current - previous) / previous.where(previous != 0) * 100
+    rate = rate.where(previous != 0, np.where(current > 0, 100.0, 0.0))
+    return rate.round(2)
+
 def change_analyzer(current_df, previous_df, metric_column, group_by=None, filter_condition=None):
     """변동분석"""
     if filter_condition:
@@ -453,17 +474,13 @@ def change_analyzer(current_df, previous_df, metric_column, group_by=None, filte
         previous_df = apply_additional_filter(previous_df, filter_condition)
     
     if group_by:
-        current = current_df.groupby(group_by)[metric_column].sum().reset_index()
-        previous = previous_df.groupby(group_by)[metric_column].sum().reset_index()
+        current = current_df.groupby(group_by, observed=True)[metric_column].sum().reset_index()
+        previous = previous_df.groupby(group_by, observed=True)[metric_column].sum().reset_index()
         
-        comparison = pd.merge(current, previous, on=group_by, suffixes=['_현재', '_이전'], how='outer').fillna(0)
+        comparison = pd.merge(current, previous, on=group_by, suffixes=['_현재', '_이전'], how='outer')
+        comparison = comparison.fillna({f'{metric_column}_현재': 0, f'{metric_column}_이전': 0})
         
-        comparison['변동률(%)'] = comparison.apply(
-            lambda row: 100.0 if row[f'{metric_column}_이전'] == 0 and row[f'{metric_column}_현재'] > 0
-            else 0.0 if row[f'{metric_column}_이전'] == 0
-            else ((row[f'{metric_column}_현재'] - row[f'{metric_column}_이전']) / row[f'{metric_column}_이전'] * 100),
-            axis=1
-        ).round(2)
+        comparison['변동률(%)'] = growth_rate(comparison[f'{metric_column}_현재'], comparison[f'{metric_column}_이전'])
         
         comparison['변동량'] = (comparison[f'{metric_column}_현재'] - comparison[f'{metric_column}_이전']).round(2)
         
@@ -483,7 +500,7 @@ def ranking_calculator(df, rank_column, group_by=None, ascending=False, filter_c
         df = apply_additional_filter(df, filter_condition)
     
     if group_by:
-        result = df.groupby(group_by)[rank_column].sum().reset_index()
+        result = df.groupby(group_by, observed=True)[rank_column].sum().reset_index()
         result = result.sort_values(rank_column, ascending=ascending)
         result['순위'] = result[rank_column].rank(ascending=ascending, method='dense').astype(int)
         return result
@@ -497,8 +514,27 @@ def top_n_extractor(df, n=30):
     return df.head(n)
 
 # ===== 파라미터 기반 필터링 =====
+def _shared(df: pd.DataFrame, params: dict, key: tuple, build):
+    """배치 실행 중 같은 데이터/필터 조건의 중간 결과 공유"""
+    return batch.memo((*key, id(df), filters.params_key(params)), build)
+
 def apply_params_filter(df: pd.DataFrame, params: dict) -> pd.DataFrame:
-    """파라미터 기반 데이터 필터링"""
+    """파라미터 기반 데이터 필터링 (배치 실행 중에는 조건별로 한 번만 필터링)"""
+    return _shared(df, params, ('filter',), lambda: _filter_rows(df, params))
+
+def _filter_rows(df: pd.DataFrame, params: dict) -> pd.DataFrame:
+    text = (params.get('extra_filter_expr') or '').strip()
+    if isinstance(df, sql_backend.SqlOrders):
+        # SQL 백엔드: 조건을 WHERE 절로 내려 보내고 집계 시점까지 읽기를 미룸
+        view = df.filter(params)
+        if text:
+            # 추가 필터식은 SQL로 옮기지 않고 조건에 맞는 행에 pandas로 적용
+            return view.frame[expr.expr_mask(view.frame, text)]
+        return view
+    # 등록된 데이터셋은 필터 인덱스로 한 번에 행 선택 (전체 복사/단계별 마스킹 없음)
+    selected = filters.select(df, params)
+    if selected is not None:
+        return selected
     out = df.copy()
     
     # 날짜 필터링
@@ -518,11 +554,19 @@ def apply_params_filter(df: pd.DataFrame, params: dict) -> pd.DataFrame:
         if vals and col in out.columns:
             out = out[out[col].isin(vals)]
     
+    # 추가 필터식 (컴파일 결과는 식 문자열 단위로 캐시)
+    if text:
+        out = out[expr.expr_mask(out, text)]
+    
     return out
 
-def safe_group_sum(d: pd.DataFrame, by: list[str], val: str, out_col: str) -> pd.DataFrame:
+def safe_group_sum(d: pd.DataFrame, by: list[str], val: str, out_col: str, dropna: bool = False) -> pd.DataFrame:
     """안전한 그룹별 합계 (하위 호환성을 위해 유지)"""
     keys = [k for k in by if k in d.columns]
+    if isinstance(d, sql_backend.SqlView):
+        if keys and val in d.columns:
+            return d.group_sum(keys, val, out_col, dropna=dropna)
+        d = d.frame
     if not keys:
         d = d.copy()
         d['_전체'] = '전체'
@@ -531,19 +575,72 @@ def safe_group_sum(d: pd.DataFrame, by: list[str], val: str, out_col: str) -> pd
         d = d.copy()
         d[val] = 0
     
-    g = d.groupby(keys, dropna=False)[val].sum().reset_index(name=out_col)
-    return g
+    # 상품명/고유구매자 키는 정수 ID로 묶은 뒤 라벨로 복원
+    ids = surrogate.id_keys(d, keys)
+    g = d.groupby(ids or keys, dropna=dropna, observed=True)[val].sum().reset_index(name=out_col)
+    return surrogate.decode(d, g, keys, ids) if ids else g
 
-def safe_group_size(d: pd.DataFrame, by: list[str], out_col: str) -> pd.DataFrame:
+def safe_group_size(d: pd.DataFrame, by: list[str], out_col: str, dropna: bool = False) -> pd.DataFrame:
     """안전한 그룹별 개수 (하위 호환성을 위해 유지)"""
     keys = [k for k in by if k in d.columns]
+    if isinstance(d, sql_backend.SqlView):
+        if keys:
+            return d.group_size(keys, out_col, dropna=dropna)
+        d = d.frame
     if not keys:
         d = d.copy()
         d['_전체'] = '전체'
         keys = ['_전체']
     
-    g = d.groupby(keys, dropna=False).size().reset_index(name=out_col)
-    return g
+    ids = surrogate.id_keys(d, keys)
+    g = d.groupby(ids or keys, dropna=dropna, observed=True).size().reset_index(name=out_col)
+    return surrogate.decode(d, g, keys, ids) if ids else g
+
+def params_sum_frame(df: pd.DataFrame, params: dict, keys: list[str], values: list[str]) -> pd.DataFrame:
+    """합계로만 쓰는 컬럼용 데이터 (가능하면 일 단위 큐브 셀, 아니면 필터된 원본 행)"""
+    cells = cube.select(df, params, keys, values)
+    return cells if cells is not None else apply_params_filter(df, params)
+
+def params_group_sum(df: pd.DataFrame, params: dict, by: list[str], val: str, out_col: str,
+                     dropna: bool = False) -> pd.DataFrame:
+    """필터 + 그룹별 합계 (큐브로 답할 수 있으면 원본 행을 읽지 않음)"""
+    def build():
+        cells = cube.select(df, params, by, [val])
+        if cells is None:
+            return safe_group_sum(apply_params_filter(df, params), by, val, out_col, dropna=dropna)
+        return cells.groupby(by, dropna=dropna, observed=True)[val].sum().reset_index(name=out_col)
+    return _shared(df, params, ('group_sum', tuple(by), val, out_col, dropna), build)
+
+def params_group_size(df: pd.DataFrame, params: dict, by: list[str], out_col: str,
+                      dropna: bool = False) -> pd.DataFrame:
+    """필터 + 그룹별 건수 (큐브 셀의 행 수 합계로 계산)"""
+    def build():
+        cells = cube.select(df, params, by, [])
+        if cells is None:
+            return safe_group_size(apply_params_filter(df, params), by, out_col, dropna=dropna)
+        return cells.groupby(by, dropna=dropna, observed=True)[cube.COUNT_COL].sum().reset_index(name=out_col)
+    return _shared(df, params, ('group_size', tuple(by), out_col, dropna), build)
+
+def params_grouped_measures(df: pd.DataFrame, params: dict, by: list[str], measures: list[str]) -> pd.DataFrame:
+    """필터 + 그룹별 여러 측정값을 한 번에 집계 (grouped_measures 컬럼, 결측 그룹 제외)"""
+    def build():
+        sums = {m: SUM_MEASURES[m] for m in measures if m in SUM_MEASURES}
+        if set(measures) <= {*sums, '총건수'}:
+            cells = cube.select(df, params, by, list(sums.values()))
+            if cells is not None:
+                # 큐브 셀: 합계는 셀 합계, 총건수는 셀 행 수 합계
+                src = {**sums, '총건수': cube.COUNT_COL}
+                g = cells.groupby(by, observed=True)[[src[m] for m in measures]].sum()
+                g.columns = measures
+                return g.reset_index()
+            d = apply_params_filter(df, params)
+            if isinstance(d, sql_backend.SqlView):
+                count_col = '총건수' if '총건수' in measures else None
+                return d.group_measures(by, sums, count_col, dropna=True)[[*by, *measures]]
+        else:
+            d = apply_params_filter(df, params)
+        return grouped_measures(d, by, measures=measures).reset_index()
+    return _shared(df, params, ('measures', tuple(by), tuple(measures)), build)
 
 def add_rank(df: pd.DataFrame, sort_col: str, asc: bool=False, rank_col: str='순위') -> pd.DataFrame:
     """순위 추가 (하위 호환성을 위해 유지)"""
@@ -553,20 +650,96 @@ def add_rank(df: pd.DataFrame, sort_col: str, asc: bool=False, rank_col: str='
     out[rank_col] = out[sort_col].rank(method='dense', ascending=asc).astype(int)
     return out
 
+def top_k(df: pd.DataFrame, sort_col: str, k: int, by: list[str] | None = None,
+          asc: bool = False, rank_col: str = '순위') -> pd.DataFrame:
+    """그룹별 상위 k개 행과 그룹 내 순위 (전체 정렬 없이 부분 선택)
+
+    by가 없으면 전체에서 상위 k개. 결과는 그룹 순 → 순위 순으로 정렬되고,
+    순위는 그룹 내 dense 순위 (상위 k개 안에서 매겨도 전체 기준과 같음).
+    경계 동점은 앞선 행을 우선한다.
+    """
+    n = len(df)
+    if by:
+        group = df.groupby(by, dropna=False, observed=True, sort=True).ngroup().to_numpy()
+    else:
+        group = np.zeros(n, dtype=np.int64)
+    # 작을수록 상위가 되도록 변환 (결측은 최하위)
+    values = df[sort_col].to_numpy(dtype=float)
+    score = np.where(np.isnan(values), np.inf, values if asc else -values)
+
+    keep = np.ones(n, dtype=bool)
+    sizes = np.bincount(group) if n else np.zeros(0, dtype=np.int64)
+    large = np.flatnonzero(sizes > k)
+    if len(large):
+        order = np.argsort(group, kind='stable')
+        starts = np.concatenate([[0], np.cumsum(sizes)])
+        keep[order[np.isin(group[order], large)]] = False
+        for g in large if k > 0 else []:
+            idx = order[starts[g]:starts[g + 1]]
+            part = score[idx]
+            kth = np.partition(part, k - 1)[k - 1]
+            better = idx[part < kth]
+            ties = idx[part == kth][:k - len(better)]
+            keep[better] = True
+            keep[ties] = True
+
+    rows = np.flatnonzero(keep)
+    rows = rows[np.lexsort((rows, score[rows], group[rows]))]
+    out = df.iloc[rows].reset_index(drop=True)
+    # 그룹 내 dense 순위: 정렬된 상태에서 값이 바뀔 때마다 1 증가
+    g, v = group[rows], score[rows]
+    new_group = np.ones(len(rows), dtype=bool)
+    new_group[1:] = g[1:] != g[:-1]
+    step = np.ones(len(rows), dtype=np.int64)
+    step[1:] = (v[1:] != v[:-1]).astype(np.int64)
+    step[new_group] = 1
+    csum = np.cumsum(step)
+    out[rank_col] = csum - np.maximum.accumulate(np.where(new_group, csum - 1, 0))
+    return out
+
+def _issue_bits(pattern: str, columns: str = 'both') -> int | None:
+    """키워드 패턴(예: '취소|반품')의 이슈 플래그 비트 (플래그로 표현할 수 없는 패턴이면 None)"""
+    words = pattern.split('|')
+    if not all(w in preprocess.ISSUE_KEYWORDS for w in words):
+        return None
+    bits = 0
+    for w in words:
+        bit = preprocess.ISSUE_KEYWORDS[w]
+        if columns in ('both', 'status'):
+            bits |= bit
+        if columns in ('both', 'claim'):
+            bits |= bit << preprocess.CLAIM_SHIFT
+    return bits
+
 def issue_rate(d: pd.DataFrame, keys: list[str], pattern: str) -> pd.DataFrame:
     """이슈율 계산 (취소/반품/클레임 등) - ops.py에서 이동"""
-    total = safe_group_size(d, keys, '총건수')
-    status = d.get('주문상태', pd.Series(dtype='string')).astype(str)
-    claim = d.get('클레임', pd.Series(dtype='string')).astype(str)
+    if isinstance(d, sql_backend.SqlView):
+        d = d.frame
     
-    # 주문상태와 클레임 컬럼 모두에서 패턴 검색
-    issue_mask = (status.str.contains(pattern, na=False) | 
-                  claim.str.contains(pattern, na=False))
-    issue_df = d[issue_mask].copy()
-    
-    issue_count = safe_group_size(issue_df, keys, '이슈건수')
-    on_keys = [k for k in keys if (k in total.columns and k in issue_count.columns)]
-    g = total.merge(issue_count, on=on_keys, how='left')
-    g['이슈건수'] = g['이슈건수'].fillna(0)
+    # 주문상태와 클레임 컬럼 모두에서 패턴 검색 (적재 시 계산한 이슈 플래그 우선)
+    bits = _issue_bits(pattern)
+    if bits is not None and preprocess.ISSUE_FLAG_COL in d.columns:
+        issue_mask = (d[preprocess.ISSUE_FLAG_COL].to_numpy() & bits) != 0
+    else:
+        status = d.get('주문상태', pd.Series(dtype='string')).astype(str)
+        claim = d.get('클레임', pd.Series(dtype='string')).astype(str)
+        issue_mask = (status.str.contains(pattern, na=False) | 
+                      claim.str.contains(pattern, na=False)).to_numpy()
+    
+    # 그룹별 총건수/이슈건수를 한 번의 groupby로 집계
+    on_keys = [k for k in keys if k in d.columns]
+    ids = surrogate.id_keys(d, on_keys)
+    rows = pd.DataFrame({k: d[k].array for k in ids or on_keys})
+    rows['이슈건수'] = issue_mask.astype(np.int64)
+    if not on_keys:
+        rows['_전체'] = '전체'
+        on_keys = ['_전체']
+    grouped = rows.groupby(ids or on_keys, dropna=False, observed=True)['이슈건수']
+    g = grouped.size().reset_index(name='총건수')
+    if ids:
+        g = surrogate.decode(d, g, on_keys, ids)
+    issue_count = grouped.sum().to_numpy()
+    # 기존 left merge 결과와 같은 타입 (이슈 없는 그룹이 있으면 실수)
+    g['이슈건수'] = issue_count.astype(float) if (issue_count == 0).any() else issue_count
     g['비율(%)'] = (g['이슈건수'] / g['총건수'].replace({0: pd.NA}) * 100).fillna(0).round(2)
-    return g
\ No newline at end of file
+    return g
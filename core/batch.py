@@ -0,0 +1,74 @@
+from __future__ import annotations
+import contextvars
+from contextlib import contextmanager
+import pandas as pd
+from . import registry
+from .types import MetricParams
+
+# 배치 실행 중 공유 중간 결과 (필터된 프레임, 공통 groupby, 하위 지표 결과)
+_SESSION: contextvars.ContextVar[dict | None] = contextvars.ContextVar('batch_session', default=None)
+
+def memo(key: tuple, build):
+    """배치 실행 중이면 같은 키의 중간 결과를 한 번만 계산 (배치 밖에서는 바로 계산)
+
+    DataFrame은 얕은 복사본을 돌려주어 호출 측의 컬럼 추가/교체가 공유 결과에 남지 않는다.
+    """
+    session = _SESSION.get()
+    if session is None:
+        return build()
+    if key not in session:
+        session[key] = build()
+    value = session[key]
+    return value.copy(deep=False) if isinstance(value, pd.DataFrame) else value
+
+@contextmanager
+def session():
+    """이 블록 안의 지표 실행은 중간 결과를 공유"""
+    token = _SESSION.set({})
+    try:
+        yield
+    finally:
+        _SESSION.reset(token)
+
+def metric_result(metric_id: str, df: pd.DataFrame, params: MetricParams):
+    """지표 결과 (배치 실행 중이면 같은 지표는 한 번만 계산)"""
+    return memo(('metric', metric_id, id(df)), lambda: registry.load_metric(metric_id)(df, params))
+
+def plan(metric_ids: list[str]) -> list[str]:
+    """실행 순서 (depends_on 하위 지표를 먼저, 중복 제거)"""
+    order: list[str] = []
+    visiting: set[str] = set()
+    def visit(mid: str):
+        if mid in order:
+            return
+        if mid in visiting:
+            raise ValueError(f"지표 의존 관계 순환: {mid}")
+        visiting.add(mid)
+        for dep in registry.get_metric_spec(mid).get('depends_on', []):
+            visit(dep)
+        visiting.discard(mid)
+        order.append(mid)
+    for mid in metric_ids:
+        visit(mid)
+    return order
+
+def run_batch(df: pd.DataFrame, params: MetricParams, metric_ids: list[str] | None = None,
+              area: int | None = None) -> tuple[dict[str, object], dict[str, Exception]]:
+    """여러 지표를 한 번에 실행 (필터/이전 기간 행/공통 집계/하위 지표 결과 공유)
+
+    metric_ids가 없으면 area의 전체 지표 (area도 없으면 전체 레지스트리).
+    반환: (지표 ID → 결과, 지표 ID → 예외), 결과는 요청 순서.
+    """
+    if metric_ids is None:
+        metric_ids = [m['id'] for m in registry.list_metrics(area)]
+    results: dict[str, object] = {}
+    errors: dict[str, Exception] = {}
+    with session():
+        for mid in plan(metric_ids):
+            try:
+                results[mid] = metric_result(mid, df, params)
+            except Exception as e:
+                errors[mid] = e
+    requested = dict.fromkeys(metric_ids)
+    return ({m: results[m] for m in requested if m in results},
+            {m: errors[m] for m in requested if m in errors})
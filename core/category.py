@@ -0,0 +1,122 @@
+from __future__ import annotations
+import os
+import threading
+import numpy as np
+import pandas as pd
+import config
+
+# Depth별 코드 자릿수 (2: 중분류 5자리, 3: 소분류 9자리)
+DEPTH_WIDTH = {2: 5, 3: 9}
+
+_LOCK = threading.Lock()
+_INDEXES: dict[tuple[str, int], 'CategoryIndex'] = {}
+
+class CategoryIndex:
+    """카테고리 코드 사전 (CSV에서 한 번 구축, 이후 읽기 전용으로 세션 간 공유)"""
+
+    def __init__(self, frame: pd.DataFrame):
+        frame = frame[['Depth', 'Code', 'Name']].copy()
+        frame['Code'] = frame['Code'].astype(str)
+        self.frame = frame
+        self.rows = len(frame)
+        self._tables = {}
+        for depth, width in DEPTH_WIDTH.items():
+            part = frame[frame['Depth'] == depth]
+            # 원본 코드 그대로 일치 → 자릿수 보정(zfill) 일치 순으로 조회 (기존 순차 탐색과 같은 우선순위)
+            exact = dict(zip(part['Code'], part['Name']))
+            padded = {}
+            for code, name in exact.items():
+                padded.setdefault(code.zfill(width), name)
+            self._tables[depth] = (
+                pd.Index(list(exact), dtype=object), np.array(list(exact.values()), dtype=object),
+                pd.Index(list(padded), dtype=object), np.array(list(padded.values()), dtype=object),
+            )
+
+    def lookup(self, codes: np.ndarray, depth: int) -> np.ndarray:
+        """코드 배열 → 이름 배열 (없는 코드는 None)"""
+        exact_idx, exact_names, padded_idx, padded_names = self._tables[depth]
+        out = np.full(len(codes), None, dtype=object)
+        if len(codes) == 0:
+            return out
+        pos = exact_idx.get_indexer(codes)
+        hit = pos >= 0
+        out[hit] = exact_names[pos[hit]]
+        miss = np.flatnonzero(~hit)
+        if len(miss):
+            padded = pd.Index(codes[miss], dtype=object).str.zfill(DEPTH_WIDTH[depth])
+            pos = padded_idx.get_indexer(padded)
+            found = pos >= 0
+            out[miss[found]] = padded_names[pos[found]]
+        return out
+
+    def middle_names(self, codes: pd.Series) -> pd.Series:
+        """중분류코드 컬럼 → 중분류명 (미등록 코드는 '미분류_코드')"""
+        return self._map(codes, self._middle_names)
+
+    def sub_names(self, codes: pd.Series) -> pd.Series:
+        """소분류코드 컬럼 → 소분류명 (미등록 시 중분류 '(세부미분류)', 그래도 없으면 '미분류_코드')"""
+        return self._map(codes, self._sub_names)
+
+    def _middle_names(self, uniques: np.ndarray) -> np.ndarray:
+        names = self.lookup(uniques, 2)
+        missing = pd.isna(names)
+        names[missing] = ['미분류_' + c for c in uniques[missing]]
+        return names
+
+    def _sub_names(self, uniques: np.ndarray) -> np.ndarray:
+        names = self.lookup(uniques, 3)
+        missing = np.flatnonzero(pd.isna(names))
+        if len(missing):
+            # 중분류 폴백은 원본 코드 그대로 일치만 허용 (기존 동작 유지)
+            exact_idx, exact_names, _, _ = self._tables[2]
+            middle = pd.Index(uniques[missing], dtype=object).str[:5]
+            pos = exact_idx.get_indexer(middle)
+            names[missing] = [
+                f"{exact_names[p]} (세부미분류)" if p >= 0 else f'미분류_{c}'
+                for p, c in zip(pos, uniques[missing])
+            ]
+        return names
+
+    @staticmethod
+    def _map(codes: pd.Series, resolve) -> pd.Series:
+        # 고유 코드 단위로 조회 후 코드 위치로 재배치
+        keys, uniques = pd.factorize(codes)
+        uniques = np.asarray(uniques, dtype=object).astype(str)
+        blank = uniques == ''
+        values = np.full(len(uniques) + 1, '기타', dtype=object)
+        if (~blank).any():
+            values[:-1][~blank] = resolve(uniques[~blank])
+        return pd.Series(values[keys], index=codes.index, dtype=object)
+
+def normalize_codes(s: pd.Series) -> pd.Series:
+    """카테고리 값 → 숫자만 남긴 코드 문자열 (엑셀 실수 표기 '.0' 제거, 결측은 빈 문자열)"""
+    keys, uniques = pd.factorize(s)
+    text = pd.Series(uniques, dtype=object).astype(str)
+    digits = text.str.replace(r'\.0$', '', regex=True).str.replace(r'\D', '', regex=True)
+    values = np.append(digits.to_numpy(dtype=object), '')
+    return pd.Series(values[keys], index=s.index, dtype=object)
+
+def middle_codes(codes: pd.Series) -> pd.Series:
+    """정규 코드 → 중분류코드 (앞 5자리)"""
+    return codes.str[:5]
+
+def sub_codes(codes: pd.Series) -> pd.Series:
+    """정규 코드 → 소분류코드 (9자리 이상이면 앞 9자리, 아니면 앞 5자리)"""
+    return codes.str[:9].where(codes.str.len() >= 9, codes.str[:5])
+
+def get_index(path: str | None = None) -> CategoryIndex:
+    """카테고리 사전 조회 (파일 경로+수정시각 단위로 한 번만 구축, 실패 시 예외)"""
+    path = os.path.abspath(path or config.CATEGORY_FILE_PATH)
+    key = (path, os.stat(path).st_mtime_ns)
+    index = _INDEXES.get(key)
+    if index is not None:
+        return index
+    with _LOCK:
+        index = _INDEXES.get(key)
+        if index is None:
+            index = CategoryIndex(pd.read_csv(path))
+            # 파일이 갱신되면 이전 사전은 버림
+            for old in [k for k in _INDEXES if k[0] == path]:
+                del _INDEXES[old]
+            _INDEXES[key] = index
+    return index
@@ -0,0 +1,107 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from . import dataset, filters
+import config
+
+# 일 단위 집계 큐브 (주문일 × 채널 × 업체 × 카테고리 × 중분류 × 취소 여부)
+CUBE_DIMS = ['주문일', '채널명', '업체명', '카테고리', '중분류코드']
+CUBE_MEASURES = ['상품별 총 주문금액', '정산금액', '수량']
+COUNT_COL = '_행수'
+CANCEL_COL = '_취소'
+
+class DailyCube:
+    """일 단위 사전 집계 큐브 (데이터셋 버전당 한 번 구축)
+
+    합계/건수만 필요한 지표는 원본 행 대신 큐브 셀을 다시 묶어 계산한다.
+    셀은 주문일 순으로 정렬되어 기간 조건을 이진 탐색으로 셀 위치 구간으로 바꾼다.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.dims = [c for c in CUBE_DIMS if c in df.columns]
+        self.measures = [c for c in CUBE_MEASURES if c in df.columns]
+        if '주문상태' in df.columns:
+            cancel = (df['주문상태'].astype(str) == filters.CANCEL_STATUS).to_numpy()
+        else:
+            cancel = np.zeros(len(df), dtype=bool)
+        rows = df[[*self.dims, *self.measures]].assign(**{CANCEL_COL: cancel, COUNT_COL: 1})
+        self.cells = (
+            rows.groupby([*self.dims, CANCEL_COL], dropna=False, observed=True)[[*self.measures, COUNT_COL]]
+            .sum().reset_index()
+        )
+        # 초 단위 시각만 있으면 '종료일 23:59:59' 조건도 하루 전체와 같음
+        self.whole_seconds = True
+        if '주문일시' in df.columns:
+            ts = df['주문일시'].dropna().to_numpy(dtype='datetime64[ns]').view('int64')
+            self.whole_seconds = bool((ts % 10 ** 9 == 0).all())
+        self.has_day = '주문일' in self.dims
+        if self.has_day:
+            # 결측 주문일(NaT)은 groupby 결과 맨 뒤 → 앞쪽 구간만 정렬 상태
+            days = self.cells['주문일'].to_numpy(dtype='datetime64[ns]')
+            self.valid_days = int((~np.isnat(days)).sum())
+            self.days = days[:self.valid_days].view('int64')
+        self.codes = {}
+        for col, _ in filters.DIM_FILTERS:
+            if col in self.dims:
+                codes, uniques = pd.factorize(self.cells[col])
+                self.codes[col] = (codes, pd.Index(uniques))
+
+    def covers(self, keys: list[str], values: list[str]) -> bool:
+        """큐브 차원/측정값만으로 계산 가능한지"""
+        return bool(keys) and set(keys) <= set(self.dims) and set(values) <= set(self.measures)
+
+    def day_aligned(self, params: dict) -> bool:
+        """기간 조건이 일 단위 경계와 일치하는지 (시작 00:00:00, 종료 23:59:59 이후)"""
+        date_from, date_to = params.get('date_from'), params.get('date_to')
+        if (date_from is not None or date_to is not None) and not self.has_day:
+            return False
+        if date_from is not None:
+            start = pd.Timestamp(date_from)
+            if start != start.normalize():
+                return False
+        if date_to is not None:
+            end = pd.Timestamp(date_to)
+            gap = end.normalize() + pd.Timedelta(days=1) - end
+            if gap > pd.Timedelta(seconds=1) or (gap > pd.Timedelta(0) and not self.whole_seconds):
+                return False
+        return True
+
+    def select(self, params: dict) -> pd.DataFrame:
+        """조건에 맞는 큐브 셀 (apply_params_filter와 같은 조건)"""
+        mask = np.ones(len(self.cells), dtype=bool)
+        date_from, date_to = params.get('date_from'), params.get('date_to')
+        if date_from is not None or date_to is not None:
+            lo = 0 if date_from is None else np.searchsorted(self.days, pd.Timestamp(date_from).value, 'left')
+            hi = self.valid_days if date_to is None else np.searchsorted(
+                self.days, pd.Timestamp(date_to).normalize().value, 'right')
+            mask[:lo] = False
+            mask[hi:] = False
+
+        if not params.get('include_canceled', False):
+            mask &= ~self.cells[CANCEL_COL].to_numpy()
+
+        for col, key in filters.DIM_FILTERS:
+            vals = params.get(key, [])
+            if vals and col in self.codes:
+                codes, uniques = self.codes[col]
+                table = np.append(uniques.isin(vals), any(pd.isna(v) for v in vals))
+                mask &= table[codes]
+        return self.cells if mask.all() else self.cells[mask]
+
+def get_cube(df: pd.DataFrame) -> DailyCube | None:
+    """등록된 데이터셋의 일 단위 큐브 (미등록 프레임이거나 비활성화 시 None)"""
+    if not config.CUBE_ENABLED:
+        return None
+    return dataset.derived(df, 'daily_cube', DailyCube)
+
+def select(df: pd.DataFrame, params: dict, keys: list[str], values: list[str]) -> pd.DataFrame | None:
+    """큐브로 답할 수 있으면 조건에 맞는 셀, 아니면 None (원본 행으로 계산)
+
+    추가 필터식이 있거나 기간이 일 경계와 맞지 않거나 큐브에 없는 컬럼이 필요하면 None.
+    """
+    if (params.get('extra_filter_expr') or '').strip():
+        return None
+    cube = get_cube(df)
+    if cube is None or not cube.covers(keys, values) or not cube.day_aligned(params):
+        return None
+    return cube.select(params)
@@ -0,0 +1,74 @@
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from . import base_metrics, dataset, filters, sql_backend, surrogate
+import config
+
+CUSTOMER_KEY = '고유구매자'
+# LTV 산정 시 가정하는 고객 생애 기간
+EXPECTED_LIFETIME_DAYS = 365 * 2
+
+_LOCK = threading.Lock()
+_SUMMARIES: OrderedDict[tuple, pd.DataFrame] = OrderedDict()
+
+def summarize(d: pd.DataFrame) -> pd.DataFrame:
+    """고객별 요약 (고유구매자 순 정렬, 한 번의 groupby로 집계)
+
+    구매횟수(행 수), 총/평균구매금액, 구매상품수(상품명 고유값), 첫/최근구매일(주문일시),
+    구매기간(일), 구매주기(일) 컬럼
+    """
+    if isinstance(d, sql_backend.SqlView):
+        d = d.frame
+    if CUSTOMER_KEY not in d.columns:
+        d = base_metrics.create_unique_buyer(d)
+    # 고객/상품 키는 정수 ID로 묶고 세어 고객 라벨만 마지막에 복원
+    grouped = d.groupby(surrogate.id_key(d, CUSTOMER_KEY), observed=True)
+    amount = grouped['상품별 총 주문금액']
+    out = pd.DataFrame({
+        '구매횟수': grouped.size(),
+        '총구매금액': amount.sum(),
+        '평균구매금액': amount.mean(),
+        '구매상품수': grouped[surrogate.id_key(d, '상품명')].nunique() if '상품명' in d.columns else 0,
+        '첫구매일': grouped['주문일시'].min(),
+        '최근구매일': grouped['주문일시'].max(),
+    })
+    out['구매기간(일)'] = (out['최근구매일'] - out['첫구매일']).dt.days
+    # 구매주기: 구매 간 평균 간격 (1회 구매 고객은 0)
+    count = out['구매횟수'].to_numpy()
+    cycle = out['구매기간(일)'] / np.where(count > 1, count - 1, 1)
+    out['구매주기(일)'] = cycle.where(count > 1, 0).round(1)
+    out.index = surrogate.decode_index(d, out.index, CUSTOMER_KEY)
+    return out.reset_index()
+
+def expected_ltv(summary: pd.DataFrame, lifetime_days: int = EXPECTED_LIFETIME_DAYS) -> pd.Series:
+    """예상 LTV (평균구매금액 × 생애기간/구매주기, 재구매 이력이 없으면 총구매금액)"""
+    cycle = summary['구매주기(일)']
+    predicted = summary['평균구매금액'] * (lifetime_days / cycle.where(cycle > 0))
+    return predicted.where(cycle > 0, summary['총구매금액']).round(0)
+
+def _cached(key: tuple, build) -> pd.DataFrame:
+    with _LOCK:
+        if key in _SUMMARIES:
+            _SUMMARIES.move_to_end(key)
+            return _SUMMARIES[key]
+    summary = build()
+    with _LOCK:
+        _SUMMARIES[key] = summary
+        while len(_SUMMARIES) > config.CUSTOMER_CACHE_ENTRIES:
+            _SUMMARIES.popitem(last=False)
+    return summary
+
+def customer_summary(df: pd.DataFrame, params: dict | None = None) -> pd.DataFrame:
+    """필터 조건의 고객 요약 (params가 None이면 전체 데이터 기준)
+
+    등록된 데이터셋은 데이터셋 버전 + 정규화 필터 키 단위로 캐시한다.
+    """
+    def build():
+        return summarize(df if params is None else base_metrics.apply_params_filter(df, params))
+    version = dataset.dataset_version(df)
+    if version is None:
+        return build()
+    key = (version, None if params is None else filters.params_key(params))
+    return _cached(key, build)
@@ -0,0 +1,49 @@
+from __future__ import annotations
+import threading
+import weakref
+import pandas as pd
+
+# 데이터셋 버전 (원본 상태 키) 을 담는 DataFrame.attrs 키
+VERSION_ATTR = 'dataset_version'
+# 파생 구조를 유지할 최근 버전 수
+MAX_VERSIONS = 2
+
+_LOCK = threading.Lock()
+_VERSIONS: dict[int, str] = {}
+_DERIVED: dict[str, dict[str, object]] = {}
+
+def _forget(obj_id: int) -> None:
+    _VERSIONS.pop(obj_id, None)
+
+def register_dataset(df: pd.DataFrame, version: str | None = None) -> str | None:
+    """전체 데이터 프레임에 버전 등록 (등록된 프레임만 필터 인덱스 등 파생 구조를 사용)"""
+    version = version or df.attrs.get(VERSION_ATTR)
+    if not version:
+        return None
+    with _LOCK:
+        if _VERSIONS.get(id(df)) != version:
+            _VERSIONS[id(df)] = version
+            # 프레임이 사라지면 같은 id가 다른 객체에 재사용되지 않도록 등록 해제
+            weakref.finalize(df, _forget, id(df))
+    return version
+
+def dataset_version(df) -> str | None:
+    """등록된 데이터셋 버전 (부분집합/복사본 등 미등록 프레임은 None)"""
+    return _VERSIONS.get(id(df))
+
+def derived(df: pd.DataFrame, name: str, build):
+    """데이터셋 버전 단위로 한 번만 만드는 파생 구조 (미등록 프레임이면 None)"""
+    version = dataset_version(df)
+    if version is None:
+        return None
+    cache = _DERIVED.get(version)
+    if cache is not None and name in cache:
+        return cache[name]
+    with _LOCK:
+        cache = _DERIVED.setdefault(version, {})
+        if name not in cache:
+            cache[name] = build(df)
+        # 오래된 버전의 파생 구조 정리 (dict는 삽입 순서 유지)
+        while len(_DERIVED) > MAX_VERSIONS:
+            del _DERIVED[next(iter(_DERIVED))]
+        return cache[name]
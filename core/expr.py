@@ -0,0 +1,164 @@
+from __future__ import annotations
+import ast
+import functools
+import operator
+import io
+import re
+import tokenize
+import numpy as np
+import pandas as pd
+
+# df.query 문법 중 필터에 쓰는 부분만 허용 (비교/포함/논리/산술/일부 메서드)
+_COMPARE = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne,
+    ast.Lt: operator.lt, ast.LtE: operator.le,
+    ast.Gt: operator.gt, ast.GtE: operator.ge,
+}
+_BINARY = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod,
+}
+# df.query처럼 &, |는 and, or로 바꿔 비교보다 나중에 결합
+_BOOL_TOKENS = {'&': 'and', '|': 'or'}
+_METHODS = {'isna', 'notna', 'isnull', 'notnull', 'isin', 'between'}
+_STR_METHODS = {'contains', 'startswith', 'endswith', 'len', 'lower', 'upper', 'strip'}
+_BACKTICK = re.compile(r'`([^`]+)`')
+
+class CompiledExpr:
+    """컴파일된 필터식 (컬럼 목록 + 벡터화 마스크 평가 함수)"""
+
+    def __init__(self, text: str, fn, columns: set[str]):
+        self.text = text
+        self.columns = sorted(columns)
+        self._fn = fn
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        """행별 조건 결과 (결측 비교는 거짓)"""
+        missing = [c for c in self.columns if c not in df.columns]
+        if missing:
+            raise KeyError(f"필터식에 없는 컬럼이 있습니다: {', '.join(missing)}")
+        value = self._fn(df)
+        if np.ndim(value) == 0:
+            return np.full(len(df), bool(value))
+        value = pd.Series(value) if not isinstance(value, pd.Series) else value
+        if value.dtype == 'boolean':
+            return value.to_numpy(dtype=bool, na_value=False)
+        if value.dtype != bool:
+            raise ValueError(f"필터식 결과가 참/거짓이 아닙니다: {self.text}")
+        return value.to_numpy(dtype=bool)
+
+def _literal(node: ast.AST):
+    """상수/상수 목록 노드 값"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, (str, int, float, bool, type(None))):
+        return node.value
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        return -_literal(node.operand)
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        return [_literal(e) for e in node.elts]
+    raise ValueError("상수 또는 상수 목록만 사용할 수 있습니다")
+
+def _as_bool(value, na: bool):
+    """nullable 비교 결과를 df.query처럼 일반 참/거짓으로 (결측 행은 na)"""
+    if isinstance(value, pd.Series) and value.dtype == 'boolean':
+        return value.fillna(na).astype(bool)
+    return value
+
+def _rewrite_booleans(source: str) -> str:
+    """&, | 연산자를 and, or로 치환 (문자열 상수 안의 기호는 유지)"""
+    try:
+        tokens = [(tokenize.NAME, _BOOL_TOKENS[t.string]) if t.type == tokenize.OP and t.string in _BOOL_TOKENS
+                  else (t.type, t.string)
+                  for t in tokenize.generate_tokens(io.StringIO(source).readline)]
+    except (tokenize.TokenError, SyntaxError) as e:
+        raise ValueError(f"필터식 문법 오류: {e}") from None
+    return tokenize.untokenize(tokens)
+
+def _compile(node: ast.AST, names: dict[str, str], columns: set[str]):
+    """AST 노드 → (df → 값) 함수"""
+    if isinstance(node, ast.Expression):
+        return _compile(node.body, names, columns)
+
+    if isinstance(node, ast.Name):
+        col = names.get(node.id, node.id)
+        columns.add(col)
+        return lambda df: df[col]
+
+    if isinstance(node, (ast.Constant, ast.List, ast.Tuple, ast.Set)):
+        value = _literal(node)
+        return lambda df: value
+
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile(v, names, columns) for v in node.values]
+        op = operator.and_ if isinstance(node.op, ast.And) else operator.or_
+        return lambda df: functools.reduce(op, (p(df) for p in parts))
+
+    if isinstance(node, ast.UnaryOp):
+        inner = _compile(node.operand, names, columns)
+        if isinstance(node.op, (ast.Not, ast.Invert)):
+            return lambda df: ~inner(df)
+        if isinstance(node.op, ast.USub):
+            return lambda df: -inner(df)
+        raise ValueError("지원하지 않는 단항 연산입니다")
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+        op = _BINARY[type(node.op)]
+        left, right = _compile(node.left, names, columns), _compile(node.right, names, columns)
+        return lambda df: op(left(df), right(df))
+
+    if isinstance(node, ast.Compare):
+        # a < b < c → (a < b) & (b < c)
+        operands = [_compile(n, names, columns) for n in [node.left, *node.comparators]]
+        steps = []
+        for i, op in enumerate(node.ops):
+            lhs, rhs = operands[i], operands[i + 1]
+            if isinstance(op, (ast.In, ast.NotIn)):
+                values = _literal(node.comparators[i])
+                values = values if isinstance(values, list) else [values]
+                negate = isinstance(op, ast.NotIn)
+                steps.append(lambda df, lhs=lhs, values=values, negate=negate:
+                             ~lhs(df).isin(values) if negate else lhs(df).isin(values))
+            elif type(op) in _COMPARE:
+                # 결측 비교는 != 만 참 (df.query와 같은 결과)
+                fn, na = _COMPARE[type(op)], isinstance(op, ast.NotEq)
+                steps.append(lambda df, lhs=lhs, rhs=rhs, fn=fn, na=na: _as_bool(fn(lhs(df), rhs(df)), na))
+            else:
+                raise ValueError("지원하지 않는 비교 연산입니다")
+        return lambda df: functools.reduce(operator.and_, (s(df) for s in steps))
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and not node.keywords:
+        method = node.func.attr
+        args = [_literal(a) for a in node.args]
+        target = node.func.value
+        if isinstance(target, ast.Attribute) and target.attr == 'str' and method in _STR_METHODS:
+            obj = _compile(target.value, names, columns)
+            return lambda df: _as_bool(getattr(obj(df).astype('string').str, method)(*args), False)
+        if method in _METHODS:
+            obj = _compile(target, names, columns)
+            return lambda df: getattr(obj(df), method)(*args)
+
+    raise ValueError(f"필터식에 사용할 수 없는 구문입니다: {ast.dump(node)[:60]}")
+
+@functools.lru_cache(maxsize=256)
+def compile_expr(text: str) -> CompiledExpr:
+    """필터식 컴파일 (식 문자열 단위 캐시, 허용되지 않는 구문은 ValueError)
+
+    컬럼명은 그대로 쓰거나 공백이 있으면 `상품별 총 주문금액` 처럼 백틱으로 감싼다.
+    연산자 우선순위와 결측 비교 결과는 df.query와 같다 (&, |는 비교보다 나중에 결합).
+    """
+    names = {}
+    def _placeholder(m):
+        key = f"__col{len(names)}__"
+        names[key] = m.group(1)
+        return key
+    source = _rewrite_booleans(_BACKTICK.sub(_placeholder, text.strip()))
+    try:
+        tree = ast.parse(source, mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"필터식 문법 오류: {e.msg}") from None
+    columns: set[str] = set()
+    fn = _compile(tree, names, columns)
+    return CompiledExpr(text.strip(), fn, columns)
+
+def expr_mask(df: pd.DataFrame, text: str) -> np.ndarray:
+    """필터식 행 마스크"""
+    return compile_expr(text.strip()).mask(df)
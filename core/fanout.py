@@ -0,0 +1,278 @@
+from __future__ import annotations
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from . import base_metrics, batch, snapshot, sql_backend, surrogate, trend
+from .types import MetricParams
+import config
+
+SELLER = '업체명'
+MANIFEST = 'manifest.json'
+_AMOUNT = '상품별 총 주문금액'
+_ROWS = '_행수'
+_WEEKDAYS = ['월', '화', '수', '목', '금', '토', '일']
+
+def _root(root: str | None = None) -> Path:
+    return Path(root or config.FANOUT_DIR)
+
+def _seller_share(g: pd.DataFrame, col: str) -> pd.Series:
+    """업체 내 점유율(%)"""
+    total = g.groupby(SELLER, observed=True)[col].transform('sum')
+    return (g[col] / total * 100).round(2)
+
+def _pattern_strength(g: pd.DataFrame, col: str) -> pd.Series:
+    """업체별 변동계수(%) (평균이 0 이하이면 0)"""
+    grouped = g.groupby(SELLER, observed=True)[col]
+    mean, std = grouped.transform('mean'), grouped.transform('std')
+    return (std / mean * 100).round(2).where(mean > 0, 0)
+
+def _issue_section(keys: list[str], pattern: str):
+    def build(df: pd.DataFrame, params: MetricParams) -> pd.DataFrame:
+        d = base_metrics.apply_params_filter(df, params)
+        g = base_metrics.issue_rate(d, [SELLER, *keys], pattern)
+        # 이슈 없는 그룹이 하나라도 있으면 전체가 실수가 되므로 업체와 무관하게 정수로 고정
+        g['이슈건수'] = g['이슈건수'].astype(np.int64)
+        return g
+    return build
+
+def _product_rank_section(keys: list[str], top_n: int):
+    def build(df: pd.DataFrame, params: MetricParams) -> pd.DataFrame:
+        d = base_metrics.apply_params_filter(df, params)
+        g = base_metrics.safe_group_sum(d, [SELLER, *keys, '상품명'], _AMOUNT, '총매출액')
+        # 업체(+ 분류)마다 상위 top_n 상품
+        g = base_metrics.top_k(g, '총매출액', params.get('top_n', top_n), by=[SELLER, *keys])
+        return g[[SELLER, *keys, '상품명', '총매출액', '순위']]
+    return build
+
+def _measures_section(key: str):
+    def build(df: pd.DataFrame, params: MetricParams) -> pd.DataFrame:
+        keys = [SELLER, key]
+        g = base_metrics.params_group_sum(df, params, keys, _AMOUNT, '총매출액')
+        n = base_metrics.params_group_size(df, params, keys, '주문건수')
+        g = g.merge(n, on=keys, how='left')
+        return g.sort_values([SELLER, '총매출액'], ascending=[True, False])
+    return build
+
+def _average_section(key: str):
+    def build(df: pd.DataFrame, params: MetricParams) -> pd.DataFrame:
+        # 평균주문금액 지표처럼 분류 결측 행은 제외
+        g = base_metrics.params_grouped_measures(df, params, [SELLER, key], ['총매출액', '총건수'])
+        g['평균주문금액'] = (g['총매출액'] / g['총건수']).round(0)
+        return g[[SELLER, key, '평균주문금액']].sort_values([SELLER, '평균주문금액'], ascending=[True, False])
+    return build
+
+def _channel_revenue_share(df: pd.DataFrame, params: MetricParams) -> pd.DataFrame:
+    """A1_001 채널별매출비중"""
+    g = base_metrics.params_group_sum(df, params, [SELLER, '채널명'], _AMOUNT, _AMOUNT, dropna=True)
+    g['점유율(%)'] = _seller_share(g, _AMOUNT)
+    return g.sort_values([SELLER, '점유율(%)'], ascending=[True, False])
+
+def _channel_order_share(df: pd.DataFrame, params: MetricParams) -> pd.DataFrame:
+    """A1_002 채널별주문수비중"""
+    g = base_metrics.params_group_size(df, params, [SELLER, '채널명'], '주문건수', dropna=True)
+    g['점유율(%)'] = _seller_share(g, '주문건수')
+    return g.sort_values([SELLER, '점유율(%)'], ascending=[True, False])
+
+def _channel_repurchase(df: pd.DataFrame, params: MetricParams) -> pd.DataFrame:
+    """A1_015 채널별재구매율"""
+    d = base_metrics.apply_params_filter(df, params)
+    g = base_metrics.repurchase_table(d, [SELLER, '채널명'])
+    return g.sort_values([SELLER, '재구매율(%)'], ascending=[True, False])
+
+def _scope_sellers(df: pd.DataFrame, params: MetricParams) -> list:
+    """기간 필터와 무관하게 보고서 대상이 되는 업체 (params['sellers']가 있으면 그 안에서)"""
+    sellers = pd.unique(df[SELLER].dropna().to_numpy()).tolist()
+    if params.get('sellers'):
+        wanted = set(params['sellers'])
+        sellers = [s for s in sellers if s in wanted]
+    return sorted(sellers)
+
+def _customer_summary(df: pd.DataFrame, params: MetricParams) -> pd.DataFrame:
+    """A3_001/002/005/008 총고객수, 재구매율, 고객당평균구매상품수, 재구매고객매출비중
+
+    기간 안에 주문이 없는 업체도 개별 지표처럼 0 행(평균 구매상품수는 결측)을 둔다.
+    """
+    d = base_metrics.apply_params_filter(df, params)
+    if isinstance(d, sql_backend.SqlView):
+        d = d.frame
+    if '고유구매자' not in d.columns:
+        d = base_metrics.create_unique_buyer(d)
+    # (업체, 고객)별 구매횟수/구매금액/구매상품수를 한 번의 groupby로 집계
+    buyer, product = surrogate.id_key(d, '고유구매자'), surrogate.id_key(d, '상품명')
+    grouped = d.groupby([SELLER, buyer], observed=True)
+    per = pd.DataFrame({
+        '구매횟수': grouped.size(),
+        '총구매금액': grouped[_AMOUNT].sum(),
+        '구매상품수': grouped[product].nunique(),
+    })
+    repeat = per['구매횟수'] >= 2
+    by_seller = per.groupby(level=SELLER, observed=True)
+    out = pd.DataFrame({
+        '총고객수': by_seller.size(),
+        '재구매고객수': repeat.groupby(level=SELLER, observed=True).sum(),
+        '고객당평균구매상품수': by_seller['구매상품수'].mean().round(2),
+        '재구매고객매출액': per['총구매금액'].where(repeat, 0).groupby(level=SELLER, observed=True).sum(),
+        '전체매출액': by_seller['총구매금액'].sum(),
+    })
+    dtypes = out.dtypes
+    out = out.reindex(pd.Index(_scope_sellers(df, params), dtype=out.index.dtype, name=SELLER))
+    for col in ['총고객수', '재구매고객수', '재구매고객매출액', '전체매출액']:
+        out[col] = out[col].fillna(0).astype(dtypes[col])
+    out['전체고객수'] = out['총고객수']
+    customers = out['총고객수']
+    out['재구매율(%)'] = (out['재구매고객수'] / customers.where(customers > 0) * 100).round(2).fillna(0)
+    revenue = out['전체매출액']
+    out['재구매고객매출비중(%)'] = (out['재구매고객매출액'] / revenue.where(revenue > 0) * 100).round(2).fillna(0)
+    return out.reset_index()
+
+def _daily_trend(df: pd.DataFrame, params: MetricParams) -> pd.DataFrame:
+    """A6_001/002 일자별 매출/주문수 추이"""
+    keys = [SELLER, '주문일']
+    g = base_metrics.params_group_sum(df, params, keys, _AMOUNT, '매출액')
+    n = base_metrics.params_group_size(df, params, keys, '주문수')
+    return g.merge(n, on=keys, how='left').sort_values(keys)
+
+def _weekly_trend(df: pd.DataFrame, params: MetricParams) -> pd.DataFrame:
+    """A6_003 주차별 매출 추이 (업체마다 첫 주~마지막 주 사이의 빈 주는 0)"""
+    d = trend.source_rows(df, params, _AMOUNT, by=SELLER)
+    periods, sellers, table = trend.series_table(d, _AMOUNT, 'W', by=SELLER)
+    _, _, counts = trend.series_table(d.assign(**{_ROWS: 1}), _ROWS, 'W', by=SELLER)
+    # 공통 달력에서 업체별 첫/마지막 행이 있는 구간 사이만 남김 (개별 호출의 달력 범위와 같게)
+    present = counts > 0
+    inside = (np.maximum.accumulate(present, axis=1)
+              & np.maximum.accumulate(present[:, ::-1], axis=1)[:, ::-1])
+    seller_idx, period_idx = np.nonzero(inside)
+    labels = np.asarray(trend.period_labels(periods, 'W'), dtype=object)
+    return pd.DataFrame({
+        SELLER: sellers.take(seller_idx).array,
+        '주차': labels[period_idx],
+        '매출액': table[inside],
+    })
+
+def _hourly_pattern(df: pd.DataFrame, params: MetricParams) -> pd.DataFrame:
+    """A6_005 시간대별 매출 패턴"""
+    d = base_metrics.apply_params_filter(df, params)
+    g = base_metrics.safe_group_sum(d, [SELLER, '시간대'], _AMOUNT, '매출액')
+    g['패턴강도'] = _pattern_strength(g, '매출액')
+    return g.sort_values([SELLER, '시간대'])
+
+def _weekday_pattern(df: pd.DataFrame, params: MetricParams) -> pd.DataFrame:
+    """A6_008 요일별 매출 패턴"""
+    d = base_metrics.apply_params_filter(df, params)
+    g = base_metrics.safe_group_sum(d, [SELLER, '요일'], _AMOUNT, '매출액')
+    g['요일'] = pd.Categorical(g['요일'], categories=_WEEKDAYS, ordered=True)
+    g['패턴강도'] = _pattern_strength(g, '매출액')
+    return g.sort_values([SELLER, '요일'])
+
+# 섹션 이름 → (대응 지표 ID, 업체명을 바깥 그룹 키로 붙여 전체 업체를 한 번에 계산하는 함수)
+SECTIONS = {
+    'A1_001': (('A1_001',), _channel_revenue_share),
+    'A1_002': (('A1_002',), _channel_order_share),
+    'A1_010': (('A1_010',), _product_rank_section(['채널명'], 50)),
+    'A1_011': (('A1_011',), _issue_section(['채널명'], r"취소")),
+    'A1_012': (('A1_012',), _issue_section(['채널명'], r"반품")),
+    'A1_013': (('A1_013',), _issue_section(['채널명'], r"취소|반품|교환|클레임")),
+    'A1_015': (('A1_015',), _channel_repurchase),
+    'A2_001': (('A2_001',), _product_rank_section([], 30)),
+    'A2_004': (('A2_004',), _issue_section(['상품명'], r"취소")),
+    'A2_005': (('A2_005',), _issue_section(['상품명'], r"반품")),
+    'A2_009': (('A2_009',), _issue_section(['상품명'], r"취소|반품|교환|클레임")),
+    'A3_001': (('A3_001', 'A3_002', 'A3_005', 'A3_008'), _customer_summary),
+    'A5_001': (('A5_001', 'A5_005'), _measures_section('중분류코드')),
+    'A5_003': (('A5_003',), _product_rank_section(['중분류코드'], 50)),
+    'A5_006': (('A5_006',), _average_section('중분류코드')),
+    'A5_012': (('A5_012', 'A5_016'), _measures_section('카테고리')),
+    'A5_014': (('A5_014',), _product_rank_section(['카테고리'], 50)),
+    'A5_017': (('A5_017',), _average_section('카테고리')),
+    'A6_001': (('A6_001', 'A6_002'), _daily_trend),
+    'A6_003': (('A6_003',), _weekly_trend),
+    'A6_005': (('A6_005',), _hourly_pattern),
+    'A6_008': (('A6_008',), _weekday_pattern),
+}
+
+def seller_views(df: pd.DataFrame, params: MetricParams,
+                 sections: list[str] | None = None) -> dict[str, pd.DataFrame]:
+    """전체 업체의 업체별 지표 (섹션마다 업체명을 바깥 키로 붙인 한 번의 집계, 업체명 결측 행 제외)
+
+    각 섹션의 업체 하나 분량을 대응 지표의 컬럼으로 자르면 params['sellers']=[업체]로 그 지표를
+    호출한 결과와 행 순서를 빼고 같다 (이슈건수는 지표와 달리 항상 정수).
+    """
+    out = {}
+    # 섹션끼리는 필터된 프레임과 공통 집계를 공유
+    with batch.session():
+        for name in sections or SECTIONS:
+            g = SECTIONS[name][1](df, params)
+            out[name] = g[g[SELLER].notna()].reset_index(drop=True)
+    return out
+
+def export_sellers(df: pd.DataFrame, params: MetricParams, root: str | None = None,
+                   sections: list[str] | None = None) -> dict:
+    """업체별 지표를 섹션별 parquet으로 저장 (행은 업체 순으로 모여 있어 업체 단위로 읽음)
+
+    반환: 업체 수, 섹션 수, 행 수, 계산/저장 시간(초), 처리량(업체/초).
+    """
+    if not snapshot.HAS_ARROW:
+        raise RuntimeError("업체별 보고서 저장에는 pyarrow가 필요합니다")
+    t0 = time.perf_counter()
+    views = seller_views(df, params, sections)
+    compute_sec = time.perf_counter() - t0
+    sellers = set()
+    for g in views.values():
+        sellers.update(g[SELLER].unique().tolist())
+
+    t0 = time.perf_counter()
+    root = _root(root)
+    staging = root.with_name(root.name + '.staging')
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    for name, g in views.items():
+        if not snapshot.write_frame(g, staging / f"{name}.parquet"):
+            shutil.rmtree(staging, ignore_errors=True)
+            raise OSError(f"업체별 보고서 저장 실패: {name}")
+    manifest = {
+        'schema_version': snapshot.schema_tag(),
+        'sellers': len(sellers),
+        'sections': {name: {'metrics': list(SECTIONS[name][0]), 'rows': len(g)} for name, g in views.items()},
+    }
+    (staging / MANIFEST).write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding='utf-8')
+
+    # 완성된 결과로 한 번에 교체 (읽는 쪽이 반쯤 쓰인 섹션을 보지 않도록)
+    trash = root.with_name(root.name + '.old')
+    shutil.rmtree(trash, ignore_errors=True)
+    if root.exists():
+        os.replace(root, trash)
+    os.replace(staging, root)
+    shutil.rmtree(trash, ignore_errors=True)
+    write_sec = time.perf_counter() - t0
+
+    total = compute_sec + write_sec
+    return {
+        'sellers': len(sellers),
+        'sections': len(views),
+        'rows': sum(len(g) for g in views.values()),
+        'compute_sec': round(compute_sec, 4),
+        'write_sec': round(write_sec, 4),
+        'sellers_per_sec': round(len(sellers) / total, 1) if total > 0 else 0.0,
+    }
+
+def read_seller(seller: str, root: str | None = None,
+                sections: list[str] | None = None) -> dict[str, pd.DataFrame]:
+    """저장된 업체별 보고서에서 한 업체 분량 로드 (섹션 이름 → 결과)"""
+    root = _root(root)
+    if sections is None:
+        try:
+            manifest = json.loads((root / MANIFEST).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            raise FileNotFoundError(f"업체별 보고서가 없습니다: {root}") from None
+        sections = list(manifest['sections'])
+    out = {}
+    for name in sections:
+        g = snapshot.read_frame(root / f"{name}.parquet", filters=[(SELLER, '==', seller)])
+        if g is None:
+            raise FileNotFoundError(f"업체별 보고서가 없습니다: {root / name}")
+        out[name] = g.reset_index(drop=True)
+    return out
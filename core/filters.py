@@ -0,0 +1,184 @@
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from . import dataset, expr
+import config
+
+# 값 목록 필터 대상 (컬럼, 파라미터 키)
+DIM_FILTERS = [('채널명', 'channels'), ('업체명', 'sellers'), ('카테고리', 'categories')]
+CANCEL_STATUS = '결제취소'
+
+class FilterIndex:
+    """apply_params_filter용 인덱스 (데이터셋 버전당 한 번 구축)
+
+    - 주문일시 정렬 순서: 기간 조건을 이진 탐색으로 행 위치 구간으로 변환
+    - 채널/업체/카테고리 코드: 선택 값 목록을 코드별 조회표로 바꿔 한 번에 마스크 생성
+    - 결제취소 마스크: 주문상태 문자열 비교를 미리 계산
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.n = len(df)
+        self.has_date = '주문일시' in df.columns
+        if self.has_date:
+            ts = df['주문일시'].to_numpy(dtype='datetime64[ns]').view('int64')
+            valid = ~df['주문일시'].isna().to_numpy()
+            # 결측(NaT)은 어떤 기간 조건에도 포함되지 않으므로 정렬 대상에서 제외
+            valid_pos = np.flatnonzero(valid)
+            order = np.argsort(ts[valid_pos], kind='stable')
+            self.date_order = valid_pos[order]
+            self.date_sorted = ts[self.date_order]
+        self.cancel = None
+        if '주문상태' in df.columns:
+            self.cancel = (df['주문상태'].astype(str) == CANCEL_STATUS).to_numpy()
+        self.dims = {}
+        for col, _ in DIM_FILTERS:
+            if col in df.columns:
+                codes, uniques = pd.factorize(df[col])
+                self.dims[col] = (codes, pd.Index(uniques))
+
+    def mask(self, params: dict) -> np.ndarray | None:
+        """조건에 맞는 행 마스크 (조건이 없으면 None = 전체)"""
+        mask = None
+        date_from, date_to = params.get('date_from'), params.get('date_to')
+        if self.has_date and (date_from is not None or date_to is not None):
+            lo = 0 if date_from is None else np.searchsorted(self.date_sorted, pd.Timestamp(date_from).value, 'left')
+            hi = len(self.date_sorted) if date_to is None else np.searchsorted(self.date_sorted, pd.Timestamp(date_to).value, 'right')
+            mask = np.zeros(self.n, dtype=bool)
+            mask[self.date_order[lo:hi]] = True
+
+        if not params.get('include_canceled', False) and self.cancel is not None:
+            mask = ~self.cancel if mask is None else mask & ~self.cancel
+
+        for col, key in DIM_FILTERS:
+            vals = params.get(key, [])
+            if vals and col in self.dims:
+                codes, uniques = self.dims[col]
+                # 코드별 포함 여부 조회표 (마지막 칸 = 결측 코드 -1)
+                table = np.append(uniques.isin(vals), any(pd.isna(v) for v in vals))
+                hit = table[codes]
+                mask = hit if mask is None else mask & hit
+        return mask
+
+    def positions(self, params: dict) -> np.ndarray | None:
+        """조건에 맞는 행 위치 (원래 순서, 전체면 None)"""
+        mask = self.mask(params)
+        if mask is None or mask.all():
+            return None
+        return np.flatnonzero(mask)
+
+def params_key(params: dict) -> tuple:
+    """필터에 영향을 주는 파라미터만 정규화한 캐시 키 (목록은 정렬, 날짜는 ns 정수)"""
+    def ts(v):
+        return None if v is None else pd.Timestamp(v).value
+    return (
+        ts(params.get('date_from')),
+        ts(params.get('date_to')),
+        bool(params.get('include_canceled', False)),
+        *(tuple(sorted(set(params.get(key) or []), key=str)) for _, key in DIM_FILTERS),
+        (params.get('extra_filter_expr') or '').strip(),
+    )
+
+class SelectionCache:
+    """행 선택(위치 배열) LRU 캐시 (데이터셋 버전 + 정규화 파라미터 키, 메모리 상한 기준 제거)"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self._items: OrderedDict[tuple, np.ndarray | None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _size(pos: np.ndarray | None) -> int:
+        return 0 if pos is None else pos.nbytes
+
+    def get(self, key: tuple):
+        """(적중 여부, 행 위치)"""
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return True, self._items[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: tuple, pos: np.ndarray | None) -> None:
+        size = self._size(pos)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                self.bytes -= self._size(self._items.pop(key))
+            self._items[key] = pos
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, old = self._items.popitem(last=False)
+                self.bytes -= self._size(old)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        """적중/미적중/제거 횟수와 현재 사용량"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+            'hit_rate': round(self.hits / total * 100, 1) if total else 0.0,
+            'entries': len(self._items), 'mb': round(self.bytes / 1024 ** 2, 2),
+        }
+
+SELECTION_CACHE = SelectionCache(config.FILTER_CACHE_MAX_MB * 1024 ** 2)
+
+def cache_stats() -> dict:
+    """필터 캐시 통계"""
+    return SELECTION_CACHE.stats()
+
+def get_index(df: pd.DataFrame) -> FilterIndex | None:
+    """등록된 데이터셋의 필터 인덱스 (미등록 프레임이면 None)"""
+    return dataset.derived(df, 'filter_index', FilterIndex)
+
+def _apply_expr(df: pd.DataFrame, pos: np.ndarray | None, text: str) -> np.ndarray | None:
+    """선택된 행에만 추가 필터식 적용 (식에 쓰인 컬럼만 모아 평가)"""
+    compiled = expr.compile_expr(text)
+    if pos is None:
+        mask = compiled.mask(df)
+        return None if mask.all() else np.flatnonzero(mask)
+    rows = pd.DataFrame(
+        {c: df[c].array.take(pos) for c in compiled.columns if c in df.columns},
+        index=pd.RangeIndex(len(pos)),
+    )
+    return pos[compiled.mask(rows)]
+
+def _cached_positions(df: pd.DataFrame, params: dict, version: str) -> np.ndarray | None:
+    key = (version, params_key(params))
+    hit, pos = SELECTION_CACHE.get(key)
+    if not hit:
+        pos = get_index(df).positions(params)
+        text = (params.get('extra_filter_expr') or '').strip()
+        if text:
+            pos = _apply_expr(df, pos, text)
+        if pos is not None and len(pos) and pos[-1] < np.iinfo(np.int32).max:
+            pos = pos.astype(np.int32)
+        SELECTION_CACHE.put(key, pos)
+    return pos
+
+def positions(df: pd.DataFrame, params: dict) -> np.ndarray | None:
+    """등록된 데이터셋에서 조건에 맞는 행 위치 (미등록 프레임이면 None)"""
+    version = dataset.dataset_version(df)
+    if version is None:
+        return None
+    pos = _cached_positions(df, params, version)
+    return np.arange(len(df)) if pos is None else pos
+
+def select(df: pd.DataFrame, params: dict) -> pd.DataFrame | None:
+    """인덱스로 행 선택 (캐시 우선, 전체 선택이면 원본 프레임 그대로, 미등록 프레임이면 None)"""
+    version = dataset.dataset_version(df)
+    if version is None:
+        return None
+    pos = _cached_positions(df, params, version)
+    return df if pos is None else df.take(pos)
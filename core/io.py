@@ -1,13 +1,24 @@
 from __future__ import annotations
+import json
+import os
+import re
+from pathlib import Path
+import numpy as np
 import pandas as pd
 import streamlit as st
-import re
-from . import preprocess
+from pandas.api.types import infer_dtype
+from pandas.io.parsers import TextParser
+from . import dataset, preprocess, snapshot, sql_backend, store
 import config
 
-def load_orders_raw() -> pd.DataFrame:
+# 폴더 적재 시 행마다 기록하는 원본 파일명 (파일 재적재 시 해당 파일 행만 교체)
+SOURCE_COL = '원본파일'
+# 파일명의 추출 시각 (order_list_YYYYMMDDhhmmss_*)
+_EXPORT_STAMP = re.compile(r'(\d{14})')
+
+def load_orders_raw(path: str | None = None) -> pd.DataFrame:
     """원본 Excel 파일 로드"""
-    return pd.read_excel(config.DATA_XLSX_PATH, sheet_name=config.SHEET_NAME, engine="openpyxl")
+    return pd.read_excel(path or config.DATA_XLSX_PATH, sheet_name=config.SHEET_NAME, engine="openpyxl")
 
 def apply_column_mapping(df: pd.DataFrame) -> pd.DataFrame:
     """컬럼명 표준화 매핑"""
@@ -22,26 +33,15 @@ def create_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
     
     # 1. 고유구매자 생성
-    def extract_phone_last4(phone_str):
-        if pd.isna(phone_str):
-            return 'XXXX'
-        phone_digits = re.sub(r'[^0-9]', '', str(phone_str))
-        return phone_digits[-4:] if len(phone_digits) >= 4 else (phone_digits if phone_digits else 'XXXX')
-    
     if '구매자명' not in df.columns: 
         df['구매자명'] = '미상'
     if '구매자연락처' not in df.columns: 
         df['구매자연락처'] = '0000'
     
-    df['고유구매자'] = df['구매자명'].fillna('미상').astype(str) + '_' + df['구매자연락처'].apply(extract_phone_last4)
+    df['고유구매자'] = preprocess.unique_buyer_key(df['구매자명'], df['구매자연락처'])
     
     # 2. 카테고리 파생 컬럼
-    def midcode(x):
-        x = '' if pd.isna(x) else str(x)
-        digits = re.sub(r'[^0-9]', '', x)
-        return digits[:5] if digits else '00000'
-    
-    df['중분류코드'] = df.get('카테고리', '').astype(str).map(midcode)
+    df['중분류코드'] = preprocess.mid_code(df['카테고리']) if '카테고리' in df.columns else '00000'
     
     # 3. 시간 파생 컬럼 (전역 제공)
     if '주문일시' in df.columns:
@@ -80,22 +80,224 @@ def apply_data_types(df: pd.DataFrame) -> pd.DataFrame:
     
     return df
 
-@st.cache_data(ttl=config.CACHE_TTL_SEC, show_spinner=False)
-def get_orders() -> pd.DataFrame:
-    """전체 데이터 로딩 및 전처리 파이프라인"""
-    # 1. 원본 데이터 로드
-    raw = load_orders_raw()
+def build_orders(path: str | None = None) -> pd.DataFrame:
+    """원본 파일 파싱 및 전처리 파이프라인"""
+    if config.INGEST_MODE == 'stream':
+        # 청크 단위 로드 + 컬럼명 표준화 + 타입 정리
+        typed = load_orders_stream(path)
+        return preprocess.derive(typed)
+    
+    # 원본 로드 후 단일 패스 전처리 (표준화 → 타입 정리 → 파생 컬럼)
+    raw = load_orders_raw(path)
+    return preprocess.prepare_orders(raw, config.COLMAP)
+
+def load_orders(path: str | None = None) -> pd.DataFrame:
+    """스냅샷 우선 로딩 (원본이 바뀌지 않았으면 엑셀 파싱 생략)"""
+    path = path or config.DATA_XLSX_PATH
+    key = snapshot.source_key(path)
+    cached = snapshot.read_snapshot(key)
+    if cached is not None:
+        return cached
     
-    # 2. 컬럼명 표준화
-    std = apply_column_mapping(raw)
+    final = build_orders(path)
+    if config.COMPACT_SCHEMA:
+        final = preprocess.compact_dtypes(final)
+    snapshot.write_snapshot(final, key)
+    return final
+
+def _header_names(header: tuple) -> list[str]:
+    """엑셀 헤더 정리 (빈 헤더/중복 헤더는 read_excel과 같은 규칙으로 이름 부여)"""
+    names, seen = [], {}
+    for i, h in enumerate(header):
+        name = f"Unnamed: {i}" if h is None else str(h)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+def _as_text(v) -> str:
+    """숫자로 해석된 셀 값을 원래 문자열 표기로 복원"""
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
+def _typed_chunk(rows: list[tuple], columns: list[str]) -> pd.DataFrame:
+    """행 묶음을 표준 컬럼명/타입의 DataFrame으로 변환"""
+    # read_excel과 같은 파서로 값 추론 (숫자형 문자열/빈 셀 처리 일치)
+    chunk = TextParser([list(r) for r in rows], names=columns, header=None).read()
+    return preprocess.standardize(chunk, config.COLMAP)
+
+def iter_orders_chunks(path: str | None = None, chunk_rows: int | None = None):
+    """openpyxl read_only 모드로 원본을 청크 단위로 읽어 타입 정리된 DataFrame을 순회"""
+    from openpyxl import load_workbook
+    
+    chunk_rows = chunk_rows or config.STREAM_CHUNK_ROWS
+    wb = load_workbook(path or config.DATA_XLSX_PATH, read_only=True, data_only=True)
+    try:
+        rows = wb[config.SHEET_NAME].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = _header_names(header)
+        
+        buf = []
+        for row in rows:
+            # 서식만 남은 빈 행은 건너뜀 (read_excel과 동일)
+            if all(v is None for v in row):
+                continue
+            buf.append(row[:len(columns)])
+            if len(buf) >= chunk_rows:
+                yield _typed_chunk(buf, columns)
+                buf = []
+        if buf:
+            yield _typed_chunk(buf, columns)
+    finally:
+        wb.close()
+
+def load_orders_stream(path: str | None = None, chunk_rows: int | None = None) -> pd.DataFrame:
+    """청크 단위 스트리밍 로드 (컬럼명 표준화/타입 정리 포함)"""
+    chunks = list(iter_orders_chunks(path, chunk_rows))
+    if not chunks:
+        return preprocess.standardize(pd.DataFrame(columns=list(config.COLMAP.values())), config.COLMAP)
+    out = pd.concat(chunks, ignore_index=True)
+    
+    # 청크별 추론 결과가 갈린 컬럼(일부 청크만 숫자로 해석)은 전체 로드와 같이 문자열로 통일
+    for col in out.columns[out.dtypes == object]:
+        if infer_dtype(out[col], skipna=True) in ('mixed', 'mixed-integer'):
+            out[col] = out[col].map(_as_text, na_action='ignore')
+    return out
+
+def export_time(path: Path) -> str:
+    """파일 추출 시각 (파일명의 YYYYMMDDhhmmss, 없으면 수정 시각을 같은 형식으로)"""
+    m = _EXPORT_STAMP.search(path.name)
+    if m:
+        return m.group(1)
+    return pd.Timestamp(path.stat().st_mtime_ns).strftime('%Y%m%d%H%M%S')
+
+def _file_state(path: Path) -> dict:
+    st_ = path.stat()
+    return {'size': st_.st_size, 'mtime_ns': st_.st_mtime_ns, 'exported': export_time(path)}
+
+def _read_manifest(path: Path) -> dict:
+    """적재 이력 로드 (스키마가 바뀌었으면 빈 이력)"""
+    try:
+        manifest = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {'schema_version': snapshot.schema_tag(), 'files': {}}
+    if manifest.get('schema_version') != snapshot.schema_tag():
+        return {'schema_version': snapshot.schema_tag(), 'files': {}}
+    return manifest
+
+def _write_manifest(manifest: dict, path: Path) -> None:
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding='utf-8')
+    os.replace(tmp, path)
+
+def merge_orders(base: pd.DataFrame | None, delta: pd.DataFrame, key: str = '상품주문번호',
+                 export_times: dict[str, str] | None = None) -> pd.DataFrame:
+    """신규 주문을 누적 데이터에 병합 (같은 상품주문번호는 원본 파일 추출 시각이 늦은 행 우선)
+
+    export_times: 원본파일 → 추출 시각. 없거나 시각이 같으면 나중 행(신규 배치, 같은 파일 안에서는 뒤 행)이 우선.
+    상품주문번호가 없는 행은 모두 유지한다.
+    """
+    frames = [f for f in (base, delta) if f is not None and not f.empty]
+    combined = pd.concat(frames, ignore_index=True) if len(frames) > 1 else (frames or [delta])[0].reset_index(drop=True)
+    has_key = combined[key].notna().to_numpy()
+    # 빈 셀이 있는 파일은 번호가 실수로 읽혀 '123.0'으로 표기되므로 비교용으로만 정규화
+    keyed = combined.loc[has_key, key].astype('string').str.replace(r'\.0$', '', regex=True).to_frame()
+    if export_times and SOURCE_COL in combined.columns:
+        stamps = combined.loc[has_key, SOURCE_COL].astype(object).map(export_times).fillna('')
+        stamp = pd.factorize(stamps, sort=True)[0]
+    else:
+        stamp = np.zeros(len(keyed), dtype=np.int64)
+    # 추출 시각 → 행 위치 순으로 정렬한 뒤 키별 마지막 행만 남김 (해시 기반, 누적 데이터 재파싱 없음)
+    order = np.lexsort((np.arange(len(keyed)), stamp))
+    winners = keyed.iloc[order].drop_duplicates(key, keep='last').index
+    keep = ~has_key
+    keep[winners] = True
+    return combined[keep].reset_index(drop=True)
+
+def ingest_directory(data_dir: str | None = None) -> pd.DataFrame:
+    """폴더의 주문 파일 중 신규/변경 파일만 파싱하여 누적 데이터셋에 병합"""
+    data_dir = Path(data_dir or config.DATA_DIR)
+    store_dir = Path(config.DATASET_DIR)
+    dataset_path = store_dir / 'orders.parquet'
+    manifest_path = store_dir / 'manifest.json'
     
-    # 3. 데이터 타입 정리
-    typed = apply_data_types(std)
+    manifest = _read_manifest(manifest_path)
+    base = snapshot.read_frame(dataset_path) if manifest['files'] else None
+    if base is None or SOURCE_COL not in base.columns:
+        # 원본 파일 기록이 없는 이전 누적 데이터는 처음부터 다시 적재
+        base = None
+        manifest['files'] = {}
     
-    # 4. 파생 컬럼 생성
-    derived = create_derived_columns(typed)
+    # 파일명(order_list_YYYYMMDDhhmmss_*) 순서 = 추출 시각 순서
+    files = sorted(data_dir.glob(config.DATA_FILE_GLOB))
+    pending = [f for f in files if manifest['files'].get(f.name) != _file_state(f)]
+    if not pending:
+        if base is None:
+            raise FileNotFoundError(f"주문 파일이 없습니다: {data_dir / config.DATA_FILE_GLOB}")
+        return base
     
-    # 5. 최종 전처리
-    final = preprocess.finalize(derived)
+    # 변경된 파일의 이전 적재 행은 (상품주문번호 유무와 관계없이) 새로 읽은 행으로 교체
+    if base is not None:
+        base = base[~base[SOURCE_COL].astype(object).isin([f.name for f in pending])]
+    delta = pd.concat([build_orders(str(f)).assign(**{SOURCE_COL: f.name}) for f in pending], ignore_index=True)
+    for f in pending:
+        manifest['files'][f.name] = _file_state(f)
+    exported = {name: state.get('exported', '') for name, state in manifest['files'].items()}
+    merged = merge_orders(base, delta, export_times=exported)
+    merged[SOURCE_COL] = merged[SOURCE_COL].astype(object).astype('category')
+    # 파일별로 부여된 대리키 ID를 누적 데이터 기준으로 다시 부여
+    preprocess.add_surrogate_ids(merged)
+    if config.COMPACT_SCHEMA:
+        # 범주가 다른 프레임끼리 병합하면 object로 풀리므로 병합 후 다시 압축
+        merged = preprocess.compact_dtypes(merged)
     
-    return final
\ No newline at end of file
+    if snapshot.write_frame(merged, dataset_path):
+        _write_manifest(manifest, manifest_path)
+    return merged
+
+def load_all() -> pd.DataFrame:
+    """설정된 원본(폴더 또는 단일 파일) 전체 로드"""
+    if config.DATA_DIR:
+        return ingest_directory()
+    return load_orders()
+
+def current_source_key() -> str:
+    """설정된 원본의 현재 상태 키"""
+    if config.DATA_DIR:
+        return snapshot.dir_key(config.DATA_DIR, Path(config.DATA_DIR).glob(config.DATA_FILE_GLOB))
+    return snapshot.source_key(config.DATA_XLSX_PATH)
+
+def sync_store(df: pd.DataFrame | None = None) -> str:
+    """파티션 저장소가 현재 원본과 다르면 다시 저장"""
+    key = current_source_key()
+    if store.current_key() != key:
+        store.write_store(load_all() if df is None else df, key)
+    return key
+
+@st.cache_data(ttl=config.CACHE_TTL_SEC, show_spinner=False)
+def get_orders() -> pd.DataFrame:
+    """전체 데이터 로딩 및 전처리 파이프라인"""
+    version = current_source_key()
+    df = load_all()
+    if config.STORE_ENABLED:
+        sync_store(df)
+    # 캐시 복사본에도 남도록 버전을 attrs에 기록 (dataset.register_dataset에서 사용)
+    df.attrs[dataset.VERSION_ATTR] = version
+    return df
+
+@st.cache_data(ttl=config.CACHE_TTL_SEC, show_spinner=False)
+def get_orders_range(date_from=None, date_to=None, columns: tuple[str, ...] | None = None) -> pd.DataFrame:
+    """기간/컬럼 한정 로딩 (주문일 파티션 저장소에서 겹치는 파티션만 읽음)"""
+    sync_store()
+    return store.load_range(date_from, date_to, list(columns) if columns is not None else None)
+
+@st.cache_resource(ttl=config.CACHE_TTL_SEC, show_spinner=False)
+def get_sql_orders() -> sql_backend.SqlOrders:
+    """SQL 백엔드용 주문 데이터 (내장 DB 적재는 세션 간 공유)"""
+    return sql_backend.SqlOrders(get_orders(), config.SQL_DB_PATH)
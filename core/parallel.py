@@ -0,0 +1,202 @@
+from __future__ import annotations
+import multiprocessing as mp
+import os
+import time
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+import numpy as np
+import pandas as pd
+from . import batch, dataset, registry
+from .types import MetricParams
+import config
+
+# 공유 메모리에 그대로 올리는 numpy dtype 종류 (bool/정수/실수/복소수/datetime/timedelta)
+_RAW_KINDS = 'biufcmM'
+
+class SharedFrame:
+    """프로세스 간 읽기 전용 주문 데이터 (컬럼 버퍼를 공유 메모리에 한 번만 복사)
+
+    숫자/일시 컬럼은 값 버퍼를, 그 밖의 컬럼(문자열/범주형/확장 타입)은 factorize 정수 코드를
+    공유하고 고유값 목록만 워커에 넘긴다. 워커는 데이터셋 전체를 pickle로 받지 않는다.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self._blocks: list[shared_memory.SharedMemory] = []
+        self.layout = {
+            'columns': [self._column(name, df[name]) for name in df.columns],
+            'index': self._column(None, df.index.to_series()) if not isinstance(df.index, pd.RangeIndex) else None,
+            'range': (df.index.start, df.index.stop, df.index.step) if isinstance(df.index, pd.RangeIndex) else None,
+            'attrs': dict(df.attrs),
+            'version': dataset.dataset_version(df),
+        }
+
+    def _share(self, values: np.ndarray) -> tuple[str, str, tuple]:
+        block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        self._blocks.append(block)
+        np.ndarray(values.shape, values.dtype, buffer=block.buf)[...] = values
+        return block.name, values.dtype.str, values.shape
+
+    def _column(self, name, s: pd.Series) -> dict:
+        if isinstance(s.dtype, np.dtype) and s.dtype.kind in _RAW_KINDS:
+            return {'name': name, 'raw': self._share(s.to_numpy())}
+        codes, uniques = pd.factorize(s, use_na_sentinel=True)
+        uniques = uniques.array
+        if s.dtype == object:
+            # object 컬럼은 결측 표현(None/nan)을 그대로 유지하도록 코드 -1 자리에 원래 결측값을 둠
+            na = s[s.isna()].iloc[0] if (codes < 0).any() else None
+            uniques = np.append(np.asarray(uniques, dtype=object), np.array([na], dtype=object))
+        return {'name': name, 'codes': self._share(codes.astype(np.int32)), 'uniques': uniques}
+
+    def close(self) -> None:
+        """공유 메모리 해제"""
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+def _attach(ref: tuple[str, str, tuple], handles: list) -> np.ndarray:
+    name, dtype, shape = ref
+    # 해제(unlink)는 만든 쪽(부모)이 담당, 워커는 연결만 유지
+    block = shared_memory.SharedMemory(name=name)
+    handles.append(block)
+    values = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+    values.flags.writeable = False
+    return values
+
+def _restore(spec: dict, handles: list):
+    if 'raw' in spec:
+        return _attach(spec['raw'], handles)
+    codes = _attach(spec['codes'], handles)
+    uniques = spec['uniques']
+    if isinstance(uniques, pd.Categorical):
+        # 범주형은 공유 코드 위에 그대로 재구성 (고유값 순서 → 범주 코드로 변환)
+        lookup = np.append(uniques.codes, -1).astype(np.int32)
+        return pd.Categorical.from_codes(lookup[codes], dtype=uniques.dtype)
+    if isinstance(uniques, np.ndarray):
+        return uniques[codes]
+    return uniques.take(codes, allow_fill=True)
+
+def attach_frame(layout: dict) -> tuple[pd.DataFrame, list]:
+    """워커 측: 공유 버퍼로 DataFrame 재구성 (반환한 핸들은 프레임을 쓰는 동안 유지)"""
+    handles: list = []
+    data = {spec['name']: _restore(spec, handles) for spec in layout['columns']}
+    if layout['range'] is not None:
+        index = pd.RangeIndex(*layout['range'])
+    else:
+        index = pd.Index(_restore(layout['index'], handles))
+    df = pd.DataFrame(data, index=index, copy=False)
+    df.attrs.update(layout['attrs'])
+    if layout['version']:
+        dataset.register_dataset(df, layout['version'])
+    return df, handles
+
+def _worker_main(conn, layout: dict) -> None:
+    """워커 루프: (순번, 지표 ID, 파라미터)를 받아 (순번, 성공 여부, 결과/예외)를 돌려줌"""
+    df, _handles = attach_frame(layout)
+    conn.send((0, True, None))  # 준비 완료 (제한 시간은 준비된 뒤부터 계산)
+    # 같은 실행의 지표끼리는 필터/공통 집계/하위 지표 결과를 공유
+    with batch.session():
+        while True:
+            msg = conn.recv()
+            if msg is None:
+                break
+            seq, metric_id, params = msg
+            try:
+                out = (seq, True, batch.metric_result(metric_id, df, params))
+            except Exception as e:
+                out = (seq, False, e)
+            try:
+                conn.send(out)
+            except Exception as e:
+                # 결과/예외를 pickle할 수 없으면 메시지만 전달
+                conn.send((seq, False, RuntimeError(f"{type(e).__name__}: {e}")))
+
+class _Worker:
+    def __init__(self, ctx, layout: dict):
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_worker_main, args=(child, layout), daemon=True)
+        self.proc.start()
+        child.close()
+        self.ready = False
+        self.task: tuple[int, str] | None = None
+        self.started = 0.0
+
+    def submit(self, seq: int, metric_id: str, params: MetricParams) -> None:
+        self.conn.send((seq, metric_id, params))
+        self.task = (seq, metric_id)
+        self.started = time.monotonic()
+
+    def stop(self, kill: bool = False) -> None:
+        if not kill:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.proc.join(timeout=5)
+        if self.proc.is_alive():
+            self.proc.terminate()
+            self.proc.join()
+        self.conn.close()
+
+def run_parallel(df: pd.DataFrame, params: MetricParams, metric_ids: list[str] | None = None,
+                 area: int | None = None, workers: int | None = None,
+                 timeout: float | None = None) -> tuple[dict[str, object], dict[str, Exception]]:
+    """여러 지표를 워커 프로세스에 나눠 실행 (데이터는 공유 메모리로 한 번만 공유)
+
+    지표별 제한 시간을 넘기거나 워커가 비정상 종료되면 해당 지표만 오류로 기록하고
+    워커를 새로 띄운다. 반환: (지표 ID → 결과, 지표 ID → 예외), 결과는 레지스트리 순서.
+    """
+    if metric_ids is None:
+        metric_ids = [m['id'] for m in registry.list_metrics(area)]
+    order = {m['id']: i for i, m in enumerate(registry.list_metrics())}
+    metric_ids = sorted(dict.fromkeys(metric_ids), key=lambda m: order.get(m, len(order)))
+    workers = min(workers or config.PARALLEL_WORKERS or os.cpu_count() or 1, len(metric_ids)) or 1
+    timeout = config.PARALLEL_METRIC_TIMEOUT if timeout is None else timeout
+
+    results: dict[str, object] = {}
+    errors: dict[str, Exception] = {}
+    ctx = mp.get_context(config.PARALLEL_START_METHOD)
+    shared = SharedFrame(df)
+    pool: list[_Worker] = []
+    try:
+        pool = [_Worker(ctx, shared.layout) for _ in range(workers)]
+        pending = list(reversed(metric_ids))
+        seq = 0
+        while pending or any(w.task for w in pool):
+            for w in pool:
+                if w.ready and w.task is None and pending:
+                    seq += 1
+                    w.submit(seq, pending.pop(), params)
+            waiting = {w.conn: w for w in pool if w.task or not w.ready}
+            for conn in wait(list(waiting), timeout=0.1):
+                w = waiting[conn]
+                try:
+                    done, ok, payload = conn.recv()
+                except (EOFError, OSError):
+                    continue  # 워커 종료는 아래에서 처리
+                if done == 0:
+                    w.ready = True
+                elif w.task and done == w.task[0]:
+                    (results if ok else errors)[w.task[1]] = payload
+                    w.task = None
+            if any(not w.ready and not w.proc.is_alive() for w in pool):
+                raise RuntimeError("병렬 워커 시작 실패 (공유 데이터 연결 중 종료)")
+            now = time.monotonic()
+            for w in [w for w in pool if w.task]:
+                if timeout and now - w.started > timeout:
+                    errors[w.task[1]] = TimeoutError(f"{w.task[1]}: {timeout}초 초과")
+                elif not w.proc.is_alive():
+                    errors[w.task[1]] = RuntimeError(f"{w.task[1]}: 워커 비정상 종료 (exit {w.proc.exitcode})")
+                else:
+                    continue
+                # 멈춘/죽은 워커는 버리고 남은 지표가 있으면 새 워커로 교체
+                pool.remove(w)
+                w.stop(kill=True)
+                if pending:
+                    pool.append(_Worker(ctx, shared.layout))
+    finally:
+        for w in pool:
+            w.stop()
+        shared.close()
+    return ({m: results[m] for m in metric_ids if m in results},
+            {m: errors[m] for m in metric_ids if m in errors})
@@ -0,0 +1,91 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from . import base_metrics, batch, filters, surrogate
+from .preprocess import SURROGATE_KEYS
+
+# 비교 기준: 직전 동일 길이 기간 / 전주 / 전월 / 전년 같은 기간
+COMPARE_MODES = {'period': '직전 기간', 'wow': '전주 대비', 'mom': '전월 대비', 'yoy': '전년 대비'}
+_SHIFTS = {'wow': pd.DateOffset(weeks=1), 'mom': pd.DateOffset(months=1), 'yoy': pd.DateOffset(years=1)}
+
+PERIOD_COL = '_기간'
+CURRENT, PREVIOUS = 0, 1
+SUFFIXES = ('_현재', '_이전')
+
+def previous_params(params: dict, mode: str | None = None) -> dict:
+    """비교 기간 파라미터 (기간 미지정 시 현재 기간과 동일)"""
+    mode = mode or params.get('compare_mode') or 'period'
+    date_from, date_to = params.get('date_from'), params.get('date_to')
+    if date_from is None or date_to is None:
+        return params
+    if mode == 'period':
+        period = date_to - date_from
+        return {**params, 'date_from': date_from - period, 'date_to': date_from - pd.Timedelta(seconds=1)}
+    if mode not in _SHIFTS:
+        raise ValueError(f"지원하지 않는 비교 기준: {mode}")
+    shift = _SHIFTS[mode]
+    return {**params, 'date_from': date_from - shift, 'date_to': date_to - shift}
+
+def _tagged_rows(df: pd.DataFrame, params: dict, prev: dict, columns: list[str]) -> pd.DataFrame:
+    """현재/이전 기간 행을 필요한 컬럼만 모아 기간 태그와 함께 반환"""
+    cur_pos = filters.positions(df, params)
+    if cur_pos is not None:
+        # 등록된 데이터셋: 캐시된 행 위치를 이어 붙여 컬럼별로 한 번만 take
+        prev_pos = filters.positions(df, prev)
+        pos = np.concatenate([cur_pos, prev_pos])
+        rows = pd.DataFrame({c: df[c].array.take(pos) for c in columns})
+        tags = np.repeat(np.array([CURRENT, PREVIOUS], dtype=np.int8), [len(cur_pos), len(prev_pos)])
+    else:
+        cur = base_metrics.apply_params_filter(df, params)[columns]
+        old = base_metrics.apply_params_filter(df, prev)[columns]
+        rows = pd.concat([cur, old], ignore_index=True)
+        tags = np.repeat(np.array([CURRENT, PREVIOUS], dtype=np.int8), [len(cur), len(old)])
+    rows[PERIOD_COL] = tags
+    return rows
+
+def compare_periods(df: pd.DataFrame, params: dict, group_by, measures: dict[str, str | None],
+                    mode: str | None = None, restrict: dict[str, list] | None = None) -> pd.DataFrame:
+    """현재/이전 기간 그룹별 집계를 한 번의 groupby로 계산
+
+    measures: {결과 이름: 합계 컬럼 (None이면 행 수)} → '<이름>_현재', '<이름>_이전' 컬럼
+    restrict: 두 기간 모두에 적용할 추가 값 목록 조건 {컬럼: 값 목록}
+    """
+    keys = [group_by] if isinstance(group_by, str) else list(group_by)
+    value_cols = [c for c in measures.values() if c is not None]
+    id_cols = [SURROGATE_KEYS[k] for k in keys if SURROGATE_KEYS.get(k) in df.columns]
+    columns = list(dict.fromkeys([*keys, *id_cols, *value_cols, *(restrict or {})]))
+    prev = previous_params(params, mode)
+    # 배치 실행 중에는 같은 두 기간/컬럼의 행을 지표 간에 공유
+    rows = batch.memo(
+        ('periods', id(df), filters.params_key(params), filters.params_key(prev), tuple(columns)),
+        lambda: _tagged_rows(df, params, prev, columns),
+    )
+    for col, vals in (restrict or {}).items():
+        rows = rows[rows[col].isin(vals)]
+
+    # 상품명/고유구매자 키는 정수 ID로 묶은 뒤 라벨로 복원
+    ids = surrogate.id_keys(rows, keys)
+    grouped = rows.groupby([*(ids or keys), PERIOD_COL], observed=True)
+    table = pd.DataFrame({
+        name: (grouped[col].sum() if col is not None else grouped.size())
+        for name, col in measures.items()
+    })
+    # 기간별로 나눠 전체 그룹 목록에 맞춤 (한쪽 기간에만 있는 그룹은 0, 컬럼 타입은 기간별로 결정)
+    groups = table.index.droplevel(PERIOD_COL).unique().sort_values()
+    tags = table.index.get_level_values(PERIOD_COL)
+    out = groups.to_frame(index=False)
+    if ids:
+        out = surrogate.decode(rows, out, keys, ids)
+    for tag, suffix in zip((CURRENT, PREVIOUS), SUFFIXES):
+        part = table[tags == tag].droplevel(PERIOD_COL).reindex(groups)
+        for name in measures:
+            out[name + suffix] = part[name].to_numpy()
+    fill = {name + suffix: 0 for name in measures for suffix in SUFFIXES}
+    return out.fillna(fill)
+
+def add_growth(frame: pd.DataFrame, name: str, rate_col: str = '변동률(%)', diff_col: str = '변동량') -> pd.DataFrame:
+    """'<이름>_현재'/'<이름>_이전' 컬럼으로 변동률(%)·변동량 추가"""
+    cur, prev = frame[name + SUFFIXES[0]], frame[name + SUFFIXES[1]]
+    frame[rate_col] = base_metrics.growth_rate(cur, prev)
+    frame[diff_col] = (cur - prev).round(2)
+    return frame
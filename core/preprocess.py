@@ -1,10 +1,27 @@
 from __future__ import annotations
 import re
+import numpy as np
 import pandas as pd
 from pandas.api.types import is_datetime64_any_dtype as is_dt
+from pandas.api.types import is_numeric_dtype as is_numeric
+from pandas.api.types import infer_dtype
 
 DAYMAP = {0: "월", 1: "화", 2: "수", 3: "목", 4: "금", 5: "토", 6: "일"}
 
+# 최종 스키마 컬럼 타입
+DATETIME_COLS = ['주문일시', '출고예정일', '발송처리일', '배송완료일', '구매확정일']
+NUMERIC_COLS = ['상품별 총 주문금액', '정산금액', '수량', '상품가격', '옵션가격']
+# 압축 스키마: 저카디널리티 차원 컬럼은 범주형(정수 코드 + 사전)으로 저장
+DIMENSION_COLS = ['채널명', '업체명', '카테고리', '구매자명', '주문상태', '상품명', '클레임', '중분류코드', '요일']
+COMPACT_MAX_UNIQUE_RATIO = 0.5
+STRING_COLS = ['채널명', '업체명', '카테고리', '구매자명', '구매자연락처', '주문상태', '상품명', '상품주문번호', '클레임']
+# 이슈 플래그: 주문상태/클레임 값의 키워드 포함 여부 비트 (하위 4비트 주문상태, 상위 4비트 클레임)
+ISSUE_FLAG_COL = '이슈플래그'
+ISSUE_KEYWORDS = {'취소': 1, '반품': 2, '교환': 4, '클레임': 8}
+CLAIM_SHIFT = 4
+# 대리키: 긴 문자열 그룹 키를 라벨 정렬 순서의 조밀한 int32 ID로 (결측 -1)
+SURROGATE_KEYS = {'고유구매자': '구매자ID', '상품명': '상품ID'}
+
 def coerce_dtypes(df: pd.DataFrame) -> pd.DataFrame:
     """데이터 타입 강제 변환"""
     out = df.copy()
@@ -41,6 +58,63 @@ def _last4(s: str) -> str:
     digits = re.sub(r'[^0-9]', '', s)
     return digits[-4:] if len(digits)>=4 else (digits if digits else 'XXXX')
 
+def _midcode(x) -> str:
+    """카테고리 코드 앞 5자리(중분류) 추출"""
+    x = '' if pd.isna(x) else str(x)
+    digits = re.sub(r'[^0-9]', '', x)
+    return digits[:5] if digits else '00000'
+
+def _digits(uniques) -> pd.Series:
+    """고유값 배열의 숫자만 남긴 문자열 (str() 표기 기준)"""
+    return pd.Series(uniques, dtype=object).astype(str).str.replace(r'[^0-9]', '', regex=True)
+
+def phone_last4(s: pd.Series, missing: str = 'XXXX') -> pd.Series:
+    """연락처 뒷자리 4자리 (벡터화, _last4와 동일 규칙: 결측/숫자없음 → missing, 4자리 미만 → 전체)"""
+    # 연락처는 중복이 많으므로 고유값 단위로 계산 후 코드로 재배치
+    codes, uniques = pd.factorize(s)
+    digits = _digits(uniques)
+    last4 = digits.str[-4:].where(digits != '', missing)
+    values = np.append(last4.to_numpy(dtype=object), missing)
+    return pd.Series(values[codes], index=s.index, dtype=object)
+
+def mid_code(s: pd.Series) -> pd.Series:
+    """카테고리 중분류코드 (벡터화, _midcode와 동일 규칙: 숫자 앞 5자리, 숫자없음/결측 → '00000')"""
+    codes, uniques = pd.factorize(s)
+    digits = _digits(uniques)
+    mid = digits.str[:5].where(digits != '', '00000')
+    values = np.append(mid.to_numpy(dtype=object), '00000')
+    return pd.Series(values[codes], index=s.index, dtype=object)
+
+def _keyword_bits(s: pd.Series) -> np.ndarray:
+    """값별 이슈 키워드 비트 (고유값 단위로 검사, astype(str) 표기 기준, 결측 → 0)"""
+    codes, uniques = pd.factorize(s)
+    text = pd.Series(uniques, dtype=object).astype(str)
+    bits = np.zeros(len(uniques) + 1, dtype=np.uint8)
+    for word, bit in ISSUE_KEYWORDS.items():
+        bits[:-1] |= np.where(text.str.contains(word, regex=False), bit, 0).astype(np.uint8)
+    return bits[codes]
+
+def issue_flags(df: pd.DataFrame) -> pd.Series:
+    """이슈 플래그 (취소/반품/교환/클레임 키워드를 주문상태·클레임 컬럼별 비트로 묶음)"""
+    flags = np.zeros(len(df), dtype=np.uint8)
+    if '주문상태' in df.columns:
+        flags |= _keyword_bits(df['주문상태'])
+    if '클레임' in df.columns:
+        flags |= _keyword_bits(df['클레임']) << CLAIM_SHIFT
+    return pd.Series(flags, index=df.index)
+
+def add_surrogate_ids(df: pd.DataFrame) -> pd.DataFrame:
+    """대리키 ID 컬럼 추가 (제자리, 전체 데이터 기준으로 부여해야 ID가 일관됨)"""
+    for label, id_col in SURROGATE_KEYS.items():
+        if label in df.columns:
+            codes, _ = pd.factorize(df[label], sort=True)
+            df[id_col] = codes.astype(np.int32)
+    return df
+
+def unique_buyer_key(names: pd.Series, phones: pd.Series) -> pd.Series:
+    """고유구매자 키 (구매자명_연락처뒷4자리)"""
+    return names.fillna('미상').astype(str) + '_' + phone_last4(phones)
+
 def finalize(df: pd.DataFrame) -> pd.DataFrame:
     """최종 전처리 파이프라인"""
     out = df.copy()
@@ -52,15 +126,16 @@ def finalize(df: pd.DataFrame) -> pd.DataFrame:
             out['구매자명'] = '미상'
         if '구매자연락처' not in out.columns: 
             out['구매자연락처'] = '0000'
-        out['고유구매자'] = out['구매자명'].fillna('미상').astype(str) + '_' + out['구매자연락처'].apply(_last4)
+        out['고유구매자'] = unique_buyer_key(out['구매자명'], out['구매자연락처'])
 
     # 카테고리 파생 (중분류코드) - 이미 생성되었지만 재확인
     if '중분류코드' not in out.columns:
-        def midcode(x):
-            x = '' if pd.isna(x) else str(x)
-            digits = re.sub(r'[^0-9]', '', x)
-            return digits[:5] if digits else '00000'
-        out['중분류코드'] = out.get('카테고리','').astype(str).map(midcode)
+        out['중분류코드'] = mid_code(out['카테고리']) if '카테고리' in out.columns else '00000'
+
+    # 이슈 플래그 / 대리키 파생
+    if ISSUE_FLAG_COL not in out.columns:
+        out[ISSUE_FLAG_COL] = issue_flags(out)
+    add_surrogate_ids(out)
 
     # 시간 파생 (전역 제공) - 이미 생성되었지만 재확인
     if '주문일시' in out.columns:
@@ -77,4 +152,105 @@ def finalize(df: pd.DataFrame) -> pd.DataFrame:
         if '시간대' not in out.columns:
             out['시간대'] = pd.NA
     
-    return out
\ No newline at end of file
+    return out
+
+def standardize(df: pd.DataFrame, colmap: dict[str, str] | None = None) -> pd.DataFrame:
+    """컬럼명 표준화 + 타입 정리 (입력 프레임을 제자리 변환)"""
+    out = df
+    
+    # 1. 컬럼명 표준화
+    if colmap:
+        rename = {raw: std for std, raw in colmap.items() if raw in out.columns and raw != std}
+        if rename:
+            out.rename(columns=rename, inplace=True)
+    if '구매자명' not in out.columns:
+        out['구매자명'] = '미상'
+    if '구매자연락처' not in out.columns:
+        out['구매자연락처'] = '0000'
+    
+    # 2. 타입 정리 (이미 맞는 타입이면 건너뜀)
+    for col in DATETIME_COLS:
+        if col in out.columns and not is_dt(out[col]):
+            out[col] = pd.to_datetime(out[col], errors='coerce')
+    for col in NUMERIC_COLS:
+        if col in out.columns and not is_numeric(out[col]):
+            out[col] = pd.to_numeric(out[col], errors='coerce')
+    if '상품주문번호' in out.columns and out['상품주문번호'].dtype != 'string':
+        # 기존 파이프라인과 같은 표기 (숫자 변환 후 문자열)
+        out['상품주문번호'] = pd.to_numeric(out['상품주문번호'], errors='coerce')
+    for col in STRING_COLS:
+        if col in out.columns and out[col].dtype != 'string':
+            out[col] = out[col].astype('string')
+    
+    return out
+
+def derive(df: pd.DataFrame) -> pd.DataFrame:
+    """파생 컬럼 생성 (입력 프레임에 제자리 추가)"""
+    out = df
+    out['고유구매자'] = unique_buyer_key(out['구매자명'], out['구매자연락처'])
+    if '카테고리' in out.columns:
+        out['중분류코드'] = mid_code(out['카테고리'])
+    else:
+        out['중분류코드'] = '00000'
+    out[ISSUE_FLAG_COL] = issue_flags(out)
+    add_surrogate_ids(out)
+    
+    if '주문일시' in out.columns:
+        dt = out['주문일시']
+        out['주문일'] = dt.dt.floor('D')
+        out['요일'] = dt.dt.dayofweek.map(DAYMAP)
+        out['시간대'] = dt.dt.hour
+    else:
+        out['주문일'] = pd.NaT
+        out['요일'] = pd.NA
+        out['시간대'] = pd.NA
+    
+    return out
+
+def prepare_orders(df: pd.DataFrame, colmap: dict[str, str] | None = None) -> pd.DataFrame:
+    """원본 → 최종 스키마 단일 패스 전처리 (중간 복사/재변환 없음)"""
+    return derive(standardize(df, colmap))
+
+def _to_category(s: pd.Series) -> pd.Series:
+    # 범주 사전은 object로 통일 (parquet 왕복 후와 같은 dtype)
+    return s.astype(object).astype('category')
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """압축 스키마 변환: 차원 컬럼 범주형, 정수 컬럼 다운캐스트 (제자리 변환)"""
+    out = df
+    for col in DIMENSION_COLS:
+        if col in out.columns and not isinstance(out[col].dtype, pd.CategoricalDtype):
+            out[col] = _to_category(out[col])
+    
+    # 그 밖의 문자열 컬럼도 값 반복이 많으면 범주형 (혼합 타입 컬럼은 parquet 저장을 위해 제외)
+    for col in out.columns:
+        s = out[col]
+        if col in DIMENSION_COLS or not (s.dtype == object or s.dtype == 'string'):
+            continue
+        if infer_dtype(s, skipna=True) == 'string' and s.nunique() <= len(s) * COMPACT_MAX_UNIQUE_RATIO:
+            out[col] = _to_category(s)
+    
+    # 정수 다운캐스트는 라벨 컬럼만 (groupby sum은 입력 dtype을 유지하므로 금액/수량은 int64 유지)
+    if '시간대' in out.columns and pd.api.types.is_integer_dtype(out['시간대']):
+        out['시간대'] = out['시간대'].astype('int8')
+    return out
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """컬럼별 메모리 사용량: 기본 스키마 vs 압축 스키마 (MB)"""
+    compact = compact_dtypes(df.copy())
+    before = df.memory_usage(deep=True, index=False)
+    after = compact.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        '컬럼': before.index,
+        '기본타입': [str(df[c].dtype) for c in before.index],
+        '압축타입': [str(compact[c].dtype) for c in before.index],
+        '기본(MB)': (before / 1024 ** 2).round(2).values,
+        '압축(MB)': (after / 1024 ** 2).round(2).values,
+    })
+    report = report[report['기본타입'] != report['압축타입']]
+    total = pd.DataFrame({
+        '컬럼': ['(전체)'], '기본타입': [''], '압축타입': [''],
+        '기본(MB)': [round(before.sum() / 1024 ** 2, 2)],
+        '압축(MB)': [round(after.sum() / 1024 ** 2, 2)],
+    })
+    return pd.concat([report, total], ignore_index=True)
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import importlib
 from .types import MetricSpec
 import config  # 절대 임포트
 
@@ -9,7 +10,7 @@ REGISTRY={
     'A2_004': {'id':'A2_004','name':'상품별취소율','area':2,'description':'자동생성','func_fqn':'metrics.area2_product.mA2_004','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A2_005': {'id':'A2_005','name':'상품별반품율','area':2,'description':'자동생성','func_fqn':'metrics.area2_product.mA2_005','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A2_006': {'id':'A2_006','name':'상품매출성장률','area':2,'description':'자동생성','func_fqn':'metrics.area2_product.mA2_006','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
-    'A2_007': {'id':'A2_007','name':'상품매출순위변동','area':2,'description':'자동생성','func_fqn':'metrics.area2_product.mA2_007','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
+    'A2_007': {'id':'A2_007','name':'상품매출순위변동','area':2,'description':'자동생성','func_fqn':'metrics.area2_product.mA2_007','depends_on':['A2_001'],'input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A2_008': {'id':'A2_008','name':'상품가격대별매출분포','area':2,'description':'자동생성','func_fqn':'metrics.area2_product.mA2_008','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A2_009': {'id':'A2_009','name':'상품별클레임율','area':2,'description':'자동생성','func_fqn':'metrics.area2_product.mA2_009','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A2_010': {'id':'A2_010','name':'상품별재구매기여도','area':2,'description':'자동생성','func_fqn':'metrics.area2_product.mA2_010','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
@@ -20,14 +21,15 @@ REGISTRY={
     'A4_005': {'id':'A4_005','name':'업체별총수량','area':4,'description':'자동생성','func_fqn':'metrics.area4_order_status.mA4_005','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A4_006': {'id':'A4_006','name':'업체별매출순위','area':4,'description':'자동생성','func_fqn':'metrics.area4_order_status.mA4_006','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A4_007': {'id':'A4_007','name':'업체별매출성장률(전기대비)','area':4,'description':'자동생성','func_fqn':'metrics.area4_order_status.mA4_007','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
-    'A4_008': {'id':'A4_008','name':'업체매출성장률','area':4,'description':'자동생성','func_fqn':'metrics.area4_order_status.mA4_008','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
-    'A4_009': {'id':'A4_009','name':'업체별매출순위변동','area':4,'description':'자동생성','func_fqn':'metrics.area4_order_status.mA4_009','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
+    'A4_008': {'id':'A4_008','name':'업체매출성장률','area':4,'description':'자동생성','func_fqn':'metrics.area4_order_status.mA4_008','depends_on':['A4_007'],'input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
+    'A4_009': {'id':'A4_009','name':'업체별매출순위변동','area':4,'description':'자동생성','func_fqn':'metrics.area4_order_status.mA4_009','depends_on':['A4_006'],'input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A4_010': {'id':'A4_010','name':'업체별평균마진율','area':4,'description':'자동생성','func_fqn':'metrics.area4_order_status.mA4_010','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
-    'A4_011': {'id':'A4_011','name':'업체별마진순위','area':4,'description':'자동생성','func_fqn':'metrics.area4_order_status.mA4_011','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
+    'A4_011': {'id':'A4_011','name':'업체별마진순위','area':4,'description':'자동생성','func_fqn':'metrics.area4_order_status.mA4_011','depends_on':['A4_010'],'input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A4_012': {'id':'A4_012','name':'업체별취소율','area':4,'description':'자동생성','func_fqn':'metrics.area4_order_status.mA4_012','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A4_013': {'id':'A4_013','name':'업체별반품율','area':4,'description':'자동생성','func_fqn':'metrics.area4_order_status.mA4_013','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A4_014': {'id':'A4_014','name':'업체별교환율','area':4,'description':'자동생성','func_fqn':'metrics.area4_order_status.mA4_014','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A4_015': {'id':'A4_015','name':'업체별클레임율','area':4,'description':'자동생성','func_fqn':'metrics.area4_order_status.mA4_015','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
+    'A4_016': {'id':'A4_016','name':'업체별재구매율','area':4,'description':'자동생성','func_fqn':'metrics.area4_order_status.mA4_016','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A3_001': {'id':'A3_001','name':'총고객수','area':3,'description':'자동생성','func_fqn':'metrics.area3_customer.mA3_001','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A3_002': {'id':'A3_002','name':'재구매율','area':3,'description':'자동생성','func_fqn':'metrics.area3_customer.mA3_002','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A3_003': {'id':'A3_003','name':'상위10퍼고객매출비중','area':3,'description':'자동생성','func_fqn':'metrics.area3_customer.mA3_003','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
@@ -46,12 +48,13 @@ REGISTRY={
     'A1_006': {'id':'A1_006','name':'채널주문수성장률','area':1,'description':'자동생성','func_fqn':'metrics.area1_channel.mA1_006','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A1_007': {'id':'A1_007','name':'채널점유율추세','area':1,'description':'자동생성','func_fqn':'metrics.area1_channel.mA1_007','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A1_008': {'id':'A1_008','name':'채널별매출순위변동','area':1,'description':'자동생성','func_fqn':'metrics.area1_channel.mA1_008','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
-    'A1_009': {'id':'A1_009','name':'채널내업체매출순위변동','area':1,'description':'자동생성','func_fqn':'metrics.area1_channel.mA1_009','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
+    'A1_009': {'id':'A1_009','name':'채널내업체매출순위변동','area':1,'description':'자동생성','func_fqn':'metrics.area1_channel.mA1_009','depends_on':['A1_003'],'input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A1_010': {'id':'A1_010','name':'채널내상품매출순위','area':1,'description':'자동생성','func_fqn':'metrics.area1_channel.mA1_010','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A1_011': {'id':'A1_011','name':'채널별취소율','area':1,'description':'자동생성','func_fqn':'metrics.area1_channel.mA1_011','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A1_012': {'id':'A1_012','name':'채널별반품율','area':1,'description':'자동생성','func_fqn':'metrics.area1_channel.mA1_012','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A1_013': {'id':'A1_013','name':'채널별클레임율','area':1,'description':'자동생성','func_fqn':'metrics.area1_channel.mA1_013','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A1_014': {'id':'A1_014','name':'채널딜기여도','area':1,'description':'자동생성','func_fqn':'metrics.area1_channel.mA1_014','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
+    'A1_015': {'id':'A1_015','name':'채널별재구매율','area':1,'description':'자동생성','func_fqn':'metrics.area1_channel.mA1_015','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A5_001': {'id':'A5_001','name':'카테고리중분류별매출','area':5,'description':'자동생성','func_fqn':'metrics.area5_category.mA5_001','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A5_002': {'id':'A5_002','name':'카테고리중분류별업체매출순위','area':5,'description':'자동생성','func_fqn':'metrics.area5_category.mA5_002','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A5_003': {'id':'A5_003','name':'카테고리중분류별상품매출순위','area':5,'description':'자동생성','func_fqn':'metrics.area5_category.mA5_003','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
@@ -62,7 +65,7 @@ REGISTRY={
     'A5_008': {'id':'A5_008','name':'카테고리중분류별점유율','area':5,'description':'자동생성','func_fqn':'metrics.area5_category.mA5_008','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A5_009': {'id':'A5_009','name':'카테고리중분류별점유율추세','area':5,'description':'자동생성','func_fqn':'metrics.area5_category.mA5_009','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A5_010': {'id':'A5_010','name':'카테고리중분류Top5','area':5,'description':'자동생성','func_fqn':'metrics.area5_category.mA5_010','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
-    'A5_011': {'id':'A5_011','name':'카테고리중분류Top5성장률','area':5,'description':'자동생성','func_fqn':'metrics.area5_category.mA5_011','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
+    'A5_011': {'id':'A5_011','name':'카테고리중분류Top5성장률','area':5,'description':'자동생성','func_fqn':'metrics.area5_category.mA5_011','depends_on':['A5_010'],'input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A5_012': {'id':'A5_012','name':'카테고리소분류별매출','area':5,'description':'자동생성','func_fqn':'metrics.area5_category.mA5_012','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A5_013': {'id':'A5_013','name':'카테고리소분류별업체매출순위','area':5,'description':'자동생성','func_fqn':'metrics.area5_category.mA5_013','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A5_014': {'id':'A5_014','name':'카테고리소분류별상품매출순위','area':5,'description':'자동생성','func_fqn':'metrics.area5_category.mA5_014','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
@@ -73,21 +76,25 @@ REGISTRY={
     'A5_019': {'id':'A5_019','name':'카테고리소분류별점유율','area':5,'description':'자동생성','func_fqn':'metrics.area5_category.mA5_019','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A5_020': {'id':'A5_020','name':'카테고리소분류별점유율추세','area':5,'description':'자동생성','func_fqn':'metrics.area5_category.mA5_020','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A5_021': {'id':'A5_021','name':'카테고리소분류Top5','area':5,'description':'자동생성','func_fqn':'metrics.area5_category.mA5_021','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
-    'A5_022': {'id':'A5_022','name':'카테고리소분류Top5성장률','area':5,'description':'자동생성','func_fqn':'metrics.area5_category.mA5_022','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
+    'A5_022': {'id':'A5_022','name':'카테고리소분류Top5성장률','area':5,'description':'자동생성','func_fqn':'metrics.area5_category.mA5_022','depends_on':['A5_021'],'input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A6_001': {'id':'A6_001','name':'트렌드일자별매출추이','area':6,'description':'자동생성','func_fqn':'metrics.area6_trend.mA6_001','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A6_002': {'id':'A6_002','name':'트렌드일자별주문수추이','area':6,'description':'자동생성','func_fqn':'metrics.area6_trend.mA6_002','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A6_003': {'id':'A6_003','name':'트렌드주차별매출추이','area':6,'description':'자동생성','func_fqn':'metrics.area6_trend.mA6_003','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A6_004': {'id':'A6_004','name':'트렌드매출성장률2주','area':6,'description':'자동생성','func_fqn':'metrics.area6_trend.mA6_004','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A6_005': {'id':'A6_005','name':'트렌드시간대별매출패턴','area':6,'description':'자동생성','func_fqn':'metrics.area6_trend.mA6_005','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A6_006': {'id':'A6_006','name':'트렌드시간대별주문수패턴','area':6,'description':'자동생성','func_fqn':'metrics.area6_trend.mA6_006','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
-    'A6_007': {'id':'A6_007','name':'트렌드피크시간대Top3','area':6,'description':'자동생성','func_fqn':'metrics.area6_trend.mA6_007','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
+    'A6_007': {'id':'A6_007','name':'트렌드피크시간대Top3','area':6,'description':'자동생성','func_fqn':'metrics.area6_trend.mA6_007','depends_on':['A6_005'],'input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A6_008': {'id':'A6_008','name':'트렌드요일별매출패턴','area':6,'description':'자동생성','func_fqn':'metrics.area6_trend.mA6_008','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
-    'A6_009': {'id':'A6_009','name':'트렌드요일패턴스코어','area':6,'description':'자동생성','func_fqn':'metrics.area6_trend.mA6_009','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
+    'A6_009': {'id':'A6_009','name':'트렌드요일패턴스코어','area':6,'description':'자동생성','func_fqn':'metrics.area6_trend.mA6_009','depends_on':['A6_008'],'input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A6_010': {'id':'A6_010','name':'트렌드채널별매출추이','area':6,'description':'자동생성','func_fqn':'metrics.area6_trend.mA6_010','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
     'A6_011': {'id':'A6_011','name':'트렌드중분류별매출추이Top5','area':6,'description':'자동생성','func_fqn':'metrics.area6_trend.mA6_011','input_contract':{},'output_schema':[],'default_params':config.DEFAULT_PARAMS},
 }
 def build_registry(): return REGISTRY
 def get_metric_spec(metric_id: str) -> MetricSpec: return REGISTRY[metric_id]
+def load_metric(metric_id: str):
+    """지표 함수 동적 임포트"""
+    mod_name, func_name = REGISTRY[metric_id]['func_fqn'].rsplit('.', 1)
+    return getattr(importlib.import_module(mod_name), func_name)
 def list_metrics(area: int | None=None, q: str | None=None):
     items = list(REGISTRY.values())
     if area is not None: items = [x for x in items if x['area']==area]
@@ -0,0 +1,173 @@
+from __future__ import annotations
+import datetime as dt
+import functools
+import hashlib
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+import pandas as pd
+from . import batch, dataset, registry, snapshot
+import config
+
+_CORE_DIR = Path(__file__).resolve().parent
+
+def _sha(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+def _canonical(v):
+    if isinstance(v, (pd.Timestamp, dt.date, dt.datetime)):
+        return pd.Timestamp(v).isoformat()
+    if isinstance(v, (list, tuple, set)):
+        return sorted((_canonical(x) for x in v), key=str)
+    if isinstance(v, dict):
+        return {str(k): _canonical(x) for k, x in v.items()}
+    return v
+
+def params_digest(params: dict) -> str:
+    """파라미터 정규화 해시 (키 정렬, 목록은 순서 무관, 날짜는 ISO 문자열)"""
+    return _sha(json.dumps(_canonical(dict(params)), sort_keys=True, ensure_ascii=False, default=str))
+
+@functools.lru_cache(maxsize=64)
+def _file_digest(path: str, mtime_ns: int, size: int) -> str:
+    return hashlib.sha1(Path(path).read_bytes()).hexdigest()
+
+def _path_digest(path: Path) -> str:
+    st = path.stat()
+    return _file_digest(str(path), st.st_mtime_ns, st.st_size)
+
+def _core_digest() -> str:
+    """core 패키지 소스 해시 (공통 집계/필터 코드가 바뀌면 모든 지표 결과 무효화)"""
+    parts = []
+    for path in sorted(_CORE_DIR.glob('*.py')):
+        parts.append(f"{path.name}:{_path_digest(path)}")
+    return _sha('|'.join(parts))
+
+def _config_digest() -> str:
+    """설정 해시 (config.py 소스 + 실행 중 바뀐 설정값)"""
+    values = {k: repr(v) for k, v in vars(config).items() if k.isupper()}
+    return _sha(_path_digest(Path(config.__file__)) + json.dumps(values, sort_keys=True, ensure_ascii=False))
+
+def code_digest(metric_id: str) -> str:
+    """지표 모듈(+ 결과를 가져다 쓰는 하위 지표 모듈), core 소스와 설정의 해시"""
+    paths = dict.fromkeys(Path(inspect.getsourcefile(registry.load_metric(mid))) for mid in batch.plan([metric_id]))
+    parts = [_path_digest(path) for path in paths]
+    parts.append(_core_digest())
+    parts.append(_config_digest())
+    return _sha('|'.join(parts))
+
+def dataset_fingerprint(df) -> str | None:
+    """데이터셋 식별자 (등록된 전체 프레임의 버전, 부분집합/복사본 등 미등록 프레임이면 None)
+
+    attrs의 버전은 부분집합/복사본에도 그대로 따라오므로 쓰지 않는다.
+    """
+    return dataset.dataset_version(getattr(df, 'frame', df))
+
+class ResultCache:
+    """지표 결과 캐시 (메모리 LRU + 재시작 후에도 남는 디스크 parquet)
+
+    키: (지표 ID, 지표 코드/설정 해시, 파라미터 해시, 데이터셋 버전). 원본 데이터나 코드/설정이 바뀌면
+    키가 달라져 이전 결과는 더 이상 조회되지 않고, 디스크 파일은 개수 상한으로 정리된다.
+    """
+
+    def __init__(self, max_entries: int, disk_dir: str | None, disk_entries: int):
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_entries = disk_entries
+        self.memory_hits = self.disk_hits = self.misses = self.bypass = 0
+        self.hit_sec = self.compute_sec = 0.0
+        self._items: OrderedDict[str, object] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, key: str, value) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Path | None:
+        return None if self.disk_dir is None else self.disk_dir / f"{key}.parquet"
+
+    def _prune_disk(self) -> None:
+        files = sorted(self.disk_dir.glob('*.parquet'), key=lambda p: p.stat().st_mtime_ns)
+        for old in files[:max(len(files) - self.disk_entries, 0)]:
+            old.unlink(missing_ok=True)
+
+    def get_or_compute(self, metric_id: str, df, params: dict, compute):
+        """캐시된 결과 또는 compute() 결과 (데이터셋 버전이 없으면 캐시하지 않음)"""
+        version = dataset_fingerprint(df)
+        if version is None:
+            self.bypass += 1
+            return compute()
+        t0 = time.perf_counter()
+        key = _sha(f"{metric_id}|{code_digest(metric_id)}|{params_digest(params)}|{version}")
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.memory_hits += 1
+                self.hit_sec += time.perf_counter() - t0
+                return self._copy(self._items[key])
+        path = self._disk_path(key)
+        if path is not None:
+            cached = snapshot.read_frame(path)
+            if cached is not None:
+                self._remember(key, cached)
+                self.disk_hits += 1
+                self.hit_sec += time.perf_counter() - t0
+                return self._copy(cached)
+
+        self.misses += 1
+        t0 = time.perf_counter()
+        result = compute()
+        self.compute_sec += time.perf_counter() - t0
+        self._remember(key, result)
+        # 디스크에는 표 형태 결과만 저장
+        if path is not None and isinstance(result, pd.DataFrame) and snapshot.write_frame(result, path):
+            self._prune_disk()
+        return self._copy(result)
+
+    @staticmethod
+    def _copy(value):
+        # 호출 측의 컬럼 추가/교체가 캐시된 결과에 남지 않도록 얕은 복사
+        return value.copy(deep=False) if isinstance(value, pd.DataFrame) else value
+
+    def clear(self, disk: bool = False) -> None:
+        with self._lock:
+            self._items.clear()
+        if disk and self.disk_dir is not None:
+            for path in self.disk_dir.glob('*.parquet'):
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        """메모리/디스크 적중, 미적중 횟수와 평균 조회/계산 시간(ms)"""
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {
+            'memory_hits': self.memory_hits, 'disk_hits': self.disk_hits,
+            'misses': self.misses, 'bypass': self.bypass,
+            'hit_rate': round(hits / total * 100, 1) if total else 0.0,
+            'hit_ms': round(self.hit_sec / hits * 1000, 2) if hits else 0.0,
+            'compute_ms': round(self.compute_sec / self.misses * 1000, 2) if self.misses else 0.0,
+            'entries': len(self._items),
+        }
+
+RESULT_CACHE = ResultCache(
+    config.RESULT_CACHE_ENTRIES,
+    config.RESULT_CACHE_DIR if snapshot.HAS_ARROW else None,
+    config.RESULT_CACHE_DISK_ENTRIES,
+)
+
+def metric_result(metric_id: str, df, params: dict):
+    """지표 결과 (결과 캐시가 켜져 있으면 캐시 우선)"""
+    def compute():
+        return registry.load_metric(metric_id)(df, params)
+    if not config.RESULT_CACHE_ENABLED:
+        return compute()
+    return RESULT_CACHE.get_or_compute(metric_id, df, params, compute)
+
+def cache_stats() -> dict:
+    """결과 캐시 통계"""
+    return RESULT_CACHE.stats()
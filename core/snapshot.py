@@ -0,0 +1,94 @@
+from __future__ import annotations
+import hashlib
+import os
+from pathlib import Path
+import pandas as pd
+import config
+
+try:
+    import pyarrow  # noqa: F401  (parquet 엔진)
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
+
+# 전처리 결과 스키마가 바뀌면 올려서 기존 스냅샷을 무효화
+SCHEMA_VERSION = 3
+
+def schema_tag() -> str:
+    """스냅샷 스키마 식별자 (전처리 버전 + 압축 스키마 여부)"""
+    return f"{SCHEMA_VERSION}{'c' if config.COMPACT_SCHEMA else ''}"
+
+def _digest(text: str, n: int = 16) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:n]
+
+def source_key(path: str) -> str:
+    """원본 파일 경로/크기/수정시각 기반 스냅샷 키"""
+    st = os.stat(path)
+    path_part = _digest(os.path.abspath(path), 8)
+    state_part = _digest(f"{st.st_size}|{st.st_mtime_ns}|{schema_tag()}")
+    return f"{path_part}_{state_part}"
+
+def dir_key(data_dir, paths) -> str:
+    """폴더 경로 + 소속 원본 파일들의 크기/수정시각 기반 키"""
+    states = '|'.join(f"{Path(p).name}:{os.stat(p).st_size}:{os.stat(p).st_mtime_ns}" for p in sorted(paths))
+    return f"{_digest(os.path.abspath(data_dir), 8)}_{_digest(f'{states}|{schema_tag()}')}"
+
+def snapshot_path(key: str) -> Path:
+    """스냅샷 파일 경로"""
+    return Path(config.SNAPSHOT_DIR) / f"orders_{key}.parquet"
+
+def _arrow_safe(df: pd.DataFrame) -> pd.DataFrame:
+    """혼합 타입 object 컬럼을 문자열로 정리 (parquet 저장용)"""
+    out = df.copy()
+    for col in out.columns:
+        if out[col].dtype == object:
+            out[col] = out[col].astype('string')
+    return out
+
+def write_frame(df: pd.DataFrame, path: Path) -> bool:
+    """DataFrame을 parquet으로 원자적 저장 (실패 시 False)"""
+    if not HAS_ARROW:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    try:
+        try:
+            df.to_parquet(tmp, engine='pyarrow')
+        except (TypeError, ValueError):
+            # 엑셀 원본의 혼합 타입 컬럼(숫자+문자)은 pyarrow가 거부하므로 문자열로 저장
+            _arrow_safe(df).to_parquet(tmp, engine='pyarrow')
+        os.replace(tmp, path)
+        return True
+    except Exception:
+        if tmp.exists():
+            tmp.unlink()
+        return False
+
+def read_frame(path: Path, columns: list[str] | None = None,
+               filters: list[tuple] | None = None) -> pd.DataFrame | None:
+    """parquet 파일 로드 (filters: pyarrow 행 조건, 없거나 손상 시 None)"""
+    if not HAS_ARROW or not path.exists():
+        return None
+    try:
+        return pd.read_parquet(path, engine='pyarrow', columns=columns, filters=filters)
+    except Exception:
+        return None
+
+def read_snapshot(key: str) -> pd.DataFrame | None:
+    """스냅샷 로드"""
+    if not config.SNAPSHOT_ENABLED:
+        return None
+    return read_frame(snapshot_path(key))
+
+def write_snapshot(df: pd.DataFrame, key: str) -> bool:
+    """스냅샷 저장 후 같은 원본의 이전 스냅샷 정리"""
+    if not config.SNAPSHOT_ENABLED:
+        return False
+    path = snapshot_path(key)
+    if not write_frame(df, path):
+        return False
+    path_part = key.split('_', 1)[0]
+    for old in path.parent.glob(f"orders_{path_part}_*.parquet"):
+        if old != path:
+            old.unlink(missing_ok=True)
+    return True
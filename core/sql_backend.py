@@ -0,0 +1,187 @@
+from __future__ import annotations
+import sqlite3
+import threading
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype as is_dt
+
+TABLE = 'orders'
+ROW_COL = '_row'
+INDEX_COLS = ['주문일시', '채널명', '업체명', '카테고리']
+
+def _q(name: str) -> str:
+    """SQL 식별자 인용 (한글/공백 컬럼명)"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+class SqlOrders:
+    """전처리된 주문 데이터를 내장 sqlite에 적재하여 필터/집계를 SQL로 처리하는 백엔드
+
+    지표 함수에는 DataFrame 대신 전달하며, 그 밖의 pandas 연산은 원본 프레임으로 위임한다.
+    """
+
+    def __init__(self, df: pd.DataFrame, path: str = ':memory:'):
+        self.frame = df
+        self.dtypes = df.dtypes.to_dict()
+        self.columns = df.columns
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._load(df)
+
+    def _load(self, df: pd.DataFrame) -> None:
+        # 날짜는 정수(ns)로 저장하여 비교/그룹핑 시 정밀도 손실 없이 원래 값으로 복원
+        table = df.copy(deep=False)
+        for col in table.columns:
+            if is_dt(table[col]):
+                table[col] = pd.array(table[col].to_numpy('int64'), dtype='Int64')
+                table.loc[df[col].isna(), col] = pd.NA
+            elif isinstance(table[col].dtype, pd.CategoricalDtype):
+                table[col] = table[col].astype(object)
+        table.index = np.arange(len(table))
+        with self._lock:
+            self._conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+            table.to_sql(TABLE, self._conn, index=True, index_label=ROW_COL)
+            for col in INDEX_COLS:
+                if col in df.columns:
+                    self._conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS {_q('ix_' + col)} ON {TABLE} ({_q(col)})"
+                    )
+            self._conn.commit()
+
+    # ---- pandas 위임 ----
+    def __getattr__(self, name):
+        if name.startswith('__') or name == 'frame':
+            raise AttributeError(name)
+        return getattr(self.frame, name)
+
+    def __getitem__(self, key):
+        return self.frame[key]
+
+    def __len__(self):
+        return len(self.frame)
+
+    # ---- SQL ----
+    def sql(self, statement: str, args: list | tuple = ()) -> pd.DataFrame:
+        """SQL 실행 결과를 DataFrame으로 (query는 DataFrame.query로 위임되도록 이름을 비워 둠)"""
+        with self._lock:
+            cur = self._conn.execute(statement, args)
+            names = [c[0] for c in cur.description]
+            rows = cur.fetchall()
+        return pd.DataFrame.from_records(rows, columns=names)
+
+    def decode(self, out: pd.DataFrame) -> pd.DataFrame:
+        """SQL 결과 컬럼을 원본 타입으로 복원"""
+        for col in out.columns:
+            dtype = self.dtypes.get(col)
+            if dtype is None:
+                continue
+            if is_dt(dtype):
+                ns = pd.array(out[col], dtype='Int64').to_numpy('int64', na_value=np.iinfo('int64').min)
+                out[col] = pd.Series(ns.view('datetime64[ns]'), index=out.index).astype(dtype)
+            elif isinstance(dtype, pd.CategoricalDtype) or dtype == 'string':
+                out[col] = out[col].astype(dtype)
+            elif dtype != object:
+                try:
+                    out[col] = out[col].astype(dtype)
+                except (TypeError, ValueError):
+                    pass
+        return out
+
+    def filter(self, params: dict) -> 'SqlView':
+        """apply_params_filter와 같은 조건을 WHERE 절로 변환"""
+        where, args = [], []
+        if '주문일시' in self.columns:
+            if params.get('date_from') is not None:
+                where.append(f"{_q('주문일시')} >= ?")
+                args.append(pd.Timestamp(params['date_from']).value)
+            if params.get('date_to') is not None:
+                where.append(f"{_q('주문일시')} <= ?")
+                args.append(pd.Timestamp(params['date_to']).value)
+        if not params.get('include_canceled', False) and '주문상태' in self.columns:
+            where.append(f"({_q('주문상태')} IS NULL OR {_q('주문상태')} != ?)")
+            args.append('결제취소')
+        for col, key in [('채널명', 'channels'), ('업체명', 'sellers'), ('카테고리', 'categories')]:
+            vals = [v for v in params.get(key, []) or [] if not pd.isna(v)]
+            if params.get(key) and col in self.columns:
+                where.append(f"{_q(col)} IN ({', '.join('?' * len(vals))})" if vals else '0')
+                args.extend(vals)
+        return SqlView(self, where, args)
+
+class SqlView:
+    """필터 조건이 적용된 주문 데이터 (집계는 SQL, 그 밖의 연산은 필요할 때 DataFrame으로 읽음)"""
+
+    def __init__(self, source: SqlOrders, where: list[str], args: list):
+        self.source = source
+        self.where = where
+        self.args = args
+        self.columns = source.columns
+        self._frame = None
+
+    def _where_sql(self, extra: list[str] | None = None) -> str:
+        conds = self.where + (extra or [])
+        return f" WHERE {' AND '.join(conds)}" if conds else ''
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """조건에 맞는 행을 원래 순서/인덱스로 읽음"""
+        if self._frame is None:
+            rows = self.source.sql(f"SELECT {_q(ROW_COL)} FROM {TABLE}{self._where_sql()} ORDER BY {_q(ROW_COL)}", self.args)
+            # 행 값은 원본 프레임에서 가져와 타입/인덱스를 그대로 유지
+            self._frame = self.source.frame.take(rows[ROW_COL].to_numpy(dtype='int64'))
+        return self._frame
+
+    def __getattr__(self, name):
+        if name.startswith('__') or name in ('source', '_frame'):
+            raise AttributeError(name)
+        return getattr(self.frame, name)
+
+    def __getitem__(self, key):
+        return self.frame[key]
+
+    def __len__(self):
+        if self._frame is not None:
+            return len(self._frame)
+        return int(self.source.sql(f"SELECT COUNT(*) AS n FROM {TABLE}{self._where_sql()}", self.args)['n'].iloc[0])
+
+    def _group(self, keys: list[str], aggs: dict[str, str], dropna: bool) -> pd.DataFrame:
+        extra = [f"{_q(k)} IS NOT NULL" for k in keys] if dropna else None
+        cols = ', '.join(_q(k) for k in keys)
+        measures = ', '.join(f"{agg} AS {_q(out_col)}" for out_col, agg in aggs.items())
+        order = ', '.join(f"{_q(k)} IS NULL, {_q(k)}" for k in keys)
+        sql = (f"SELECT {cols}, {measures} FROM {TABLE}{self._where_sql(extra)} "
+               f"GROUP BY {cols} ORDER BY {order}")
+        out = self.source.sql(sql, self.args)
+        if out.empty:
+            # 빈 결과도 저장 타입(날짜 → 정수 ns)으로 만들어 decode를 그대로 거침
+            out = pd.DataFrame({k: pd.Series(dtype='Int64' if is_dt(self.source.dtypes[k]) else self.source.dtypes[k])
+                                for k in keys}
+                               | {out_col: pd.Series(dtype='int64') for out_col in aggs})
+        return self.source.decode(out)
+
+    def _sum_dtype(self, val: str) -> str:
+        # 합계 타입은 원본 컬럼 기준 (정수 → int64, 실수 → float64)
+        return 'int64' if pd.api.types.is_integer_dtype(self.source.dtypes[val]) else 'float64'
+
+    def group_sum(self, keys: list[str], val: str, out_col: str, dropna: bool = False) -> pd.DataFrame:
+        """그룹별 합계 (pandas groupby().sum()과 같은 키 정렬/결측 그룹 처리)"""
+        out = self._group(keys, {out_col: f"COALESCE(SUM({_q(val)}), 0)"}, dropna)
+        out[out_col] = out[out_col].astype(self._sum_dtype(val))
+        return out
+
+    def group_size(self, keys: list[str], out_col: str, dropna: bool = False) -> pd.DataFrame:
+        """그룹별 행 수"""
+        out = self._group(keys, {out_col: 'COUNT(*)'}, dropna)
+        out[out_col] = out[out_col].astype('int64')
+        return out
+
+    def group_measures(self, keys: list[str], sums: dict[str, str], count_col: str | None = None,
+                       dropna: bool = False) -> pd.DataFrame:
+        """그룹별 여러 합계/행 수를 한 번의 GROUP BY로 계산 (sums: {결과 컬럼: 합계 컬럼})"""
+        aggs = {out_col: f"COALESCE(SUM({_q(val)}), 0)" for out_col, val in sums.items()}
+        if count_col:
+            aggs[count_col] = 'COUNT(*)'
+        out = self._group(keys, aggs, dropna)
+        for out_col, val in sums.items():
+            out[out_col] = out[out_col].astype(self._sum_dtype(val))
+        if count_col:
+            out[count_col] = out[count_col].astype('int64')
+        return out
@@ -0,0 +1,117 @@
+from __future__ import annotations
+import json
+import os
+import shutil
+from pathlib import Path
+import pandas as pd
+from . import preprocess, snapshot
+import config
+
+# 주문일시가 없는 행의 파티션 이름
+NULL_PART = 'none'
+MANIFEST = 'manifest.json'
+_LABEL_FORMAT = {'M': '%Y-%m', 'D': '%Y-%m-%d'}
+
+def _root(root: str | None = None) -> Path:
+    return Path(root or config.STORE_DIR)
+
+def partition_label(ts, freq: str | None = None) -> str:
+    """시각 → 파티션 이름 (월: YYYY-MM, 일: YYYY-MM-DD)"""
+    return pd.Timestamp(ts).strftime(_LABEL_FORMAT[freq or config.STORE_PARTITION])
+
+def read_manifest(root: str | None = None) -> dict | None:
+    """저장소 메타정보 (원본 키, 파티션 단위, 파티션 목록)"""
+    try:
+        return json.loads((_root(root) / MANIFEST).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+def current_key(root: str | None = None) -> str | None:
+    """저장소를 만든 원본 키 (저장소가 없으면 None)"""
+    manifest = read_manifest(root)
+    if manifest is None or manifest.get('schema_version') != snapshot.schema_tag():
+        return None
+    return manifest.get('source_key')
+
+def write_store(df: pd.DataFrame, key: str, root: str | None = None, freq: str | None = None) -> bool:
+    """전처리 결과를 주문일 파티션별 parquet으로 저장 (전체 교체, 실패 시 False)"""
+    if not snapshot.HAS_ARROW:
+        return False
+    freq = freq or config.STORE_PARTITION
+    root = _root(root)
+    staging = root.with_name(root.name + '.staging')
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    labels = df['주문일시'].dt.strftime(_LABEL_FORMAT[freq]).fillna(NULL_PART)
+    parts = {}
+    for label, idx in labels.groupby(labels, sort=True).groups.items():
+        if not snapshot.write_frame(df.loc[idx], staging / f"part={label}.parquet"):
+            shutil.rmtree(staging, ignore_errors=True)
+            return False
+        parts[label] = len(idx)
+
+    manifest = {'schema_version': snapshot.schema_tag(), 'source_key': key, 'freq': freq, 'partitions': parts}
+    (staging / MANIFEST).write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding='utf-8')
+
+    # 완성된 저장소로 한 번에 교체 (읽는 쪽이 반쯤 쓰인 파티션을 보지 않도록)
+    trash = root.with_name(root.name + '.old')
+    shutil.rmtree(trash, ignore_errors=True)
+    if root.exists():
+        os.replace(root, trash)
+    os.replace(staging, root)
+    shutil.rmtree(trash, ignore_errors=True)
+    return True
+
+def select_partitions(manifest: dict, date_from=None, date_to=None) -> list[str]:
+    """기간과 겹치는 파티션 이름 (기간 조건이 있으면 주문일시 결측 파티션 제외)"""
+    labels = sorted(manifest['partitions'])
+    if date_from is None and date_to is None:
+        return labels
+    lo = partition_label(date_from, manifest['freq']) if date_from is not None else None
+    hi = partition_label(date_to, manifest['freq']) if date_to is not None else None
+    # 파티션 이름은 ISO 표기라 문자열 비교 = 시간 순서 비교
+    return [
+        label for label in labels
+        if label != NULL_PART and (lo is None or label >= lo) and (hi is None or label <= hi)
+    ]
+
+def load_range(date_from=None, date_to=None, columns: list[str] | None = None,
+               root: str | None = None) -> pd.DataFrame:
+    """기간과 겹치는 파티션의 필요한 컬럼만 읽어 주문일시 기준으로 잘라 반환 (행 순서는 파티션 순)"""
+    root = _root(root)
+    manifest = read_manifest(root)
+    if manifest is None:
+        raise FileNotFoundError(f"파티션 저장소가 없습니다: {root}")
+
+    read_cols = None
+    if columns is not None:
+        read_cols = list(dict.fromkeys([*columns, '주문일시']))
+
+    labels = select_partitions(manifest, date_from, date_to)
+    frames = [snapshot.read_frame(root / f"part={label}.parquet", read_cols) for label in labels]
+    if any(f is None for f in frames):
+        raise FileNotFoundError(f"파티션 파일을 읽을 수 없습니다: {root}")
+    if not frames:
+        if not manifest['partitions']:
+            return pd.DataFrame(columns=columns or [])
+        # 겹치는 파티션이 없으면 스키마만 유지한 빈 프레임
+        first = sorted(manifest['partitions'])[0]
+        frames = [snapshot.read_frame(root / f"part={first}.parquet", read_cols).iloc[0:0]]
+    out = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    # 경계 파티션은 기간 밖 행을 포함하므로 행 단위로 한 번 더 자름
+    mask = pd.Series(True, index=out.index)
+    if date_from is not None:
+        mask &= out['주문일시'] >= date_from
+    if date_to is not None:
+        mask &= out['주문일시'] <= date_to
+    if not mask.all():
+        out = out[mask].reset_index(drop=True)
+
+    if columns is not None:
+        out = out[columns]
+    if config.COMPACT_SCHEMA and len(frames) > 1:
+        # 파티션마다 범주 사전이 달라 병합 시 object로 풀린 컬럼을 다시 압축
+        out = preprocess.compact_dtypes(out)
+    return out
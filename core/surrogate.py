@@ -0,0 +1,52 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from .preprocess import SURROGATE_KEYS
+
+def id_keys(d: pd.DataFrame, keys: list[str]) -> list[str] | None:
+    """그룹 키 중 문자열 키를 정수 ID 컬럼으로 바꾼 목록
+
+    바꿀 키가 없거나, 빈 프레임이거나, 결측 라벨(ID -1)이 있으면 None (라벨 그대로 사용).
+    ID는 라벨 정렬 순서로 부여되어 ID로 묶어도 그룹 순서가 같다.
+    """
+    if len(d) == 0:
+        return None
+    out, changed = [], False
+    for k in keys:
+        id_col = SURROGATE_KEYS.get(k)
+        if id_col is not None and id_col in d.columns and k in d.columns:
+            if d[id_col].to_numpy().min() < 0:
+                return None
+            out.append(id_col)
+            changed = True
+        else:
+            out.append(k)
+    return out if changed else None
+
+def id_key(d: pd.DataFrame, key: str) -> str:
+    """단일 키의 그룹용 컬럼 (ID로 바꿀 수 있으면 ID 컬럼)"""
+    ids = id_keys(d, [key])
+    return key if ids is None else ids[0]
+
+def label_table(d: pd.DataFrame, key: str):
+    """ID → 라벨 조회표 (프레임에 있는 ID만 유효, 라벨 컬럼 dtype 유지)"""
+    ids = d[SURROGATE_KEYS[key]].to_numpy()
+    # 같은 ID의 라벨은 모두 같으므로 아무 행 위치나 사용
+    pos = np.zeros(int(ids.max()) + 1, dtype=np.intp)
+    pos[ids] = np.arange(len(ids))
+    return d[key].array.take(pos)
+
+def decode(d: pd.DataFrame, frame: pd.DataFrame, keys: list[str], ids: list[str]) -> pd.DataFrame:
+    """결과 프레임의 ID 컬럼을 라벨 컬럼으로 복원 (컬럼 위치 유지)"""
+    rename = {}
+    for key, id_col in zip(keys, ids):
+        if key != id_col:
+            frame[id_col] = label_table(d, key).take(frame[id_col].to_numpy())
+            rename[id_col] = key
+    return frame.rename(columns=rename)
+
+def decode_index(d: pd.DataFrame, index: pd.Index, key: str) -> pd.Index:
+    """ID 인덱스를 라벨 인덱스로 복원"""
+    if index.name == key:
+        return index
+    return pd.Index(label_table(d, key).take(index.to_numpy()), name=key)
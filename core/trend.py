@@ -0,0 +1,118 @@
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from . import base_metrics, sql_backend
+
+# 지원 집계 단위 (일/주/2주/월)
+FREQS = ('D', 'W', '2W', 'M')
+DAY_COL = '주문일'
+
+def source_rows(df: pd.DataFrame, params: dict, value: str, by: str | None = None) -> pd.DataFrame:
+    """추이 계산용 행 (큐브 셀 또는 필터된 원본 행, SQL 백엔드는 일자별 합계)"""
+    keys = [DAY_COL] if by is None else [DAY_COL, by]
+    d = base_metrics.params_sum_frame(df, params, keys, [value])
+    if isinstance(d, sql_backend.SqlView):
+        return d.group_sum(keys, value, value)
+    return d
+
+def _calendar(days: np.ndarray, freq: str) -> tuple[np.ndarray, np.ndarray]:
+    """일 번호(1970-01-01 기준) → (0부터 시작하는 구간 번호, 구간별 시작일 번호)"""
+    if freq == 'D':
+        units, span = days, 1
+    elif freq in ('W', '2W'):
+        # 1970-01-01은 목요일 → +3 하면 월요일 시작 주 번호
+        units, span = (days + 3) // 7, 1 if freq == 'W' else 2
+    elif freq == 'M':
+        units, span = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64), 1
+    else:
+        raise ValueError(f"지원하지 않는 집계 단위: {freq}")
+    first = units.min()
+    period = (units - first) // span
+    starts = first + np.arange(int(period.max()) + 1) * span
+    if freq in ('W', '2W'):
+        starts = starts * 7 - 3
+    elif freq == 'M':
+        starts = starts.astype('datetime64[M]').astype('datetime64[D]').astype(np.int64)
+    return period, starts
+
+def series_table(d: pd.DataFrame, value: str, freq: str = 'D',
+                 by: str | None = None) -> tuple[pd.DatetimeIndex, pd.Index | None, np.ndarray]:
+    """빈 구간을 0으로 채운 조밀 달력 위의 시계열 표 (한 번의 bincount 누적)
+
+    반환: (구간 시작일, 시리즈 라벨 또는 None, [시리즈 × 구간] 합계 배열).
+    주문일/시리즈 키가 결측인 행은 제외하며, 시리즈 라벨은 정렬 순서.
+    """
+    dates = d[DAY_COL].to_numpy(dtype='datetime64[D]')
+    valid = ~np.isnat(dates)
+    if by is None:
+        codes, labels = np.zeros(len(d), dtype=np.int64), None
+    else:
+        codes, labels = pd.factorize(d[by], sort=True)
+        labels = pd.Index(labels, name=by)
+        valid &= codes >= 0
+    values = d[value].to_numpy()
+    days = dates[valid].astype(np.int64)
+    n_series = 1 if labels is None else len(labels)
+    if len(days) == 0:
+        return pd.DatetimeIndex([]), labels, np.zeros((n_series, 0), dtype=values.dtype)
+
+    period, starts = _calendar(days, freq)
+    n_periods = len(starts)
+    flat = codes[valid] * n_periods + period
+    table = np.bincount(flat, weights=values[valid].astype(float),
+                        minlength=n_series * n_periods).reshape(n_series, n_periods)
+    if np.issubdtype(values.dtype, np.integer):
+        table = table.round().astype(np.int64)
+    periods = pd.DatetimeIndex(starts.astype('datetime64[D]').astype('datetime64[ns]'))
+    return periods, labels, table
+
+def period_labels(periods: pd.DatetimeIndex, freq: str, last_day=None) -> list[str]:
+    """구간 표시 이름 (주: Period('W') 문자열, 2주: '주~주', 월: YYYY-MM, 일: YYYY-MM-DD)
+
+    2주 구간의 두 번째 주가 last_day 이후면 첫 주 이름만 쓴다.
+    """
+    if freq == 'D':
+        return [f"{p:%Y-%m-%d}" for p in periods]
+    if freq == 'M':
+        return [f"{p:%Y-%m}" for p in periods]
+    week = pd.Timedelta(days=7)
+    def name(start):
+        return f"{start:%Y-%m-%d}/{start + week - pd.Timedelta(days=1):%Y-%m-%d}"
+    if freq == 'W':
+        return [name(p) for p in periods]
+    last = None if last_day is None else pd.Timestamp(last_day)
+    return [name(p) if last is not None and p + week > last else f"{name(p)}~{name(p + week)}"
+            for p in periods]
+
+def growth(table: np.ndarray) -> np.ndarray:
+    """직전 구간 대비 성장률(%) (첫 구간이나 직전 값이 0이면 0)"""
+    table = np.asarray(table, dtype=float)
+    prev = np.zeros_like(table)
+    prev[..., 1:] = table[..., :-1]
+    rate = np.divide(table - prev, prev, out=np.zeros_like(table), where=prev != 0) * 100
+    return np.round(rate, 2)
+
+def moving_average(table: np.ndarray, window: int) -> np.ndarray:
+    """후행 이동평균 (구간 수가 window보다 적은 앞부분은 있는 구간만 평균)"""
+    table = np.asarray(table, dtype=float)
+    csum = np.cumsum(table, axis=-1)
+    lagged = np.zeros_like(csum)
+    lagged[..., window:] = csum[..., :-window]
+    count = np.minimum(np.arange(1, table.shape[-1] + 1), window)
+    return (csum - lagged) / count
+
+def share(table: np.ndarray) -> np.ndarray:
+    """구간별 시리즈 점유율(%) (구간 합계가 0이면 0)"""
+    table = np.asarray(table, dtype=float)
+    total = table.sum(axis=0, keepdims=True)
+    return np.round(np.divide(table * 100, total, out=np.zeros_like(table), where=total != 0), 2)
+
+def to_frame(periods: pd.DatetimeIndex, labels: pd.Index | None, table: np.ndarray,
+             value_col: str, period_col: str = DAY_COL) -> pd.DataFrame:
+    """시계열 표를 긴 형식으로 (구간 순 → 시리즈 라벨 순)"""
+    n_series, n_periods = table.shape
+    out = pd.DataFrame({period_col: np.repeat(periods.to_numpy(), n_series)})
+    if labels is not None:
+        out[labels.name] = labels.take(np.tile(np.arange(n_series), n_periods)).array
+    out[value_col] = table.T.reshape(-1)
+    return out
@@ -10,6 +10,8 @@ class MetricParams(TypedDict, total=False):
     categories: List[str]
     top_n: int
     include_canceled: bool
+    compare_mode: str          # 성장률 비교 기준: period/wow/mom/yoy
+    extra_filter_expr: str     # 추가 필터식 (예: "수량 >= 2 and 채널명 in ['GS샵']")
 
 # 레지스트리에서 사용하는 메트릭 메타 스키마
 class MetricSpec(TypedDict, total=False):
@@ -25,3 +27,4 @@ class MetricSpec(TypedDict, total=False):
     params_schema: NotRequired[Dict[str, Any]]
     owner: NotRequired[str]
     version: NotRequired[str]
+    depends_on: NotRequired[List[str]]  # 결과를 직접 호출해 쓰는 하위 지표 ID (배치 실행 순서/재사용)
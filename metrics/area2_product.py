@@ -1,14 +1,14 @@
 from __future__ import annotations
 import pandas as pd
 from core.types import MetricParams
-from core import base_metrics
+from core import base_metrics, batch, periods, surrogate
 
 def mA2_001(df: pd.DataFrame, params: MetricParams):
     """상품별매출순위 - 상품별 매출액 순위"""
     d = base_metrics.apply_params_filter(df, params)
     g = base_metrics.safe_group_sum(d, ['상품명'], '상품별 총 주문금액', '총매출액')
-    g = base_metrics.add_rank(g, '총매출액', asc=False, rank_col='순위')
-    return g.head(params.get('top_n', 30))[['상품명', '총매출액', '순위']]
+    g = base_metrics.top_k(g, '총매출액', params.get('top_n', 30))
+    return g[['상품명', '총매출액', '순위']]
 
 def mA2_002(df: pd.DataFrame, params: MetricParams):
     """상품별주문수순위 - 상품별 주문건수 순위"""
@@ -37,27 +37,16 @@ def mA2_005(df: pd.DataFrame, params: MetricParams):
 
 def mA2_006(df: pd.DataFrame, params: MetricParams):
     """상품매출성장률 - 상품별 매출액 성장률"""
-    d = base_metrics.apply_params_filter(df, params)
-    
-    # 이전 기간 데이터 계산
-    date_from = params.get('date_from')
-    date_to = params.get('date_to')
-    if date_from is None or date_to is None:
-        prev = d.copy()
-    else:
-        period = date_to - date_from
-        prev_from = date_from - period
-        prev_to = date_from - pd.Timedelta(seconds=1)
-        prev = df[(df['주문일시']>=prev_from) & (df['주문일시']<=prev_to)].copy()
-        prev = base_metrics.apply_params_filter(prev, {**params, 'date_from': None, 'date_to': None})
-    
-    return base_metrics.change_analyzer(
-        d, prev, '상품별 총 주문금액', group_by='상품명'
+    # 현재/이전 기간을 한 번에 집계
+    g = periods.compare_periods(
+        df, params, '상품명', {'상품별 총 주문금액': '상품별 총 주문금액'}
     )
+    g = periods.add_growth(g, '상품별 총 주문금액')
+    return g.sort_values('변동률(%)', ascending=False)
 
 def mA2_007(df: pd.DataFrame, params: MetricParams):
     """상품매출순위변동 - 상품별 매출 순위 변동"""
-    return mA2_001(df, params)  # 현재 순위 표시
+    return batch.metric_result('A2_001', df, params)  # 현재 순위 표시
 
 def mA2_008(df: pd.DataFrame, params: MetricParams):
     """상품가격대별매출분포 - 상품 가격대별 매출 분포"""
@@ -93,12 +82,13 @@ def mA2_010(df: pd.DataFrame, params: MetricParams):
     if '고유구매자' not in d.columns:
         d = base_metrics.create_unique_buyer(d)
     
-    # 재구매 고객들의 상품별 구매 패턴 분석
-    customer_product_counts = d.groupby(['고유구매자', '상품명']).size().reset_index(name='구매횟수')
-    repeat_customers = customer_product_counts[customer_product_counts['구매횟수'] >= 2]['고유구매자'].unique()
+    # 재구매 고객들의 상품별 구매 패턴 분석 (정수 ID로 묶고 비교)
+    buyer, product = surrogate.id_key(d, '고유구매자'), surrogate.id_key(d, '상품명')
+    customer_product_counts = d.groupby([buyer, product], observed=True).size().reset_index(name='구매횟수')
+    repeat_customers = customer_product_counts[customer_product_counts['구매횟수'] >= 2][buyer].unique()
     
     # 재구매 고객들의 상품별 매출 기여도
-    repeat_customer_data = d[d['고유구매자'].isin(repeat_customers)]
+    repeat_customer_data = d[d[buyer].isin(repeat_customers)]
     
     if len(repeat_customer_data) == 0:
         return pd.DataFrame({'상품명': ['데이터없음'], '재구매매출액': [0], '기여도(%)': [0]})
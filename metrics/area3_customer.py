@@ -1,30 +1,27 @@
 from __future__ import annotations
 import pandas as pd
 from core.types import MetricParams
-from core import base_metrics
+from core import customers
 
 def mA3_001(df: pd.DataFrame, params: MetricParams):
     """총고객수 - 고유구매자 수"""
-    d = base_metrics.apply_params_filter(df, params)
-    total_customers = base_metrics.total_customers(d)
+    total_customers = len(customers.customer_summary(df, params))
     return pd.DataFrame({'총고객수': [total_customers]})
 
 def mA3_002(df: pd.DataFrame, params: MetricParams):
     """재구매율 - 2회 이상 구매 고객 비율"""
-    d = base_metrics.apply_params_filter(df, params)
-    repurchase_rate = base_metrics.repurchase_rate(d)
+    summary = customers.customer_summary(df, params)
+    total_customers = len(summary)
+    repeat_customers = int((summary['구매횟수'] >= 2).sum())
+    repurchase_rate = round(repeat_customers / total_customers * 100, 2) if total_customers > 0 else 0
     return pd.DataFrame({'재구매율(%)': [repurchase_rate]})
 
 def mA3_003(df: pd.DataFrame, params: MetricParams):
     """상위10퍼고객매출비중 - 상위 10% 고객의 매출 기여도"""
-    d = base_metrics.apply_params_filter(df, params)
+    summary = customers.customer_summary(df, params)
     
-    if '고유구매자' not in d.columns:
-        d = base_metrics.create_unique_buyer(d)
-    
-    # 고객별 매출액 계산
-    customer_revenue = d.groupby('고유구매자')['상품별 총 주문금액'].sum().reset_index()
-    customer_revenue.columns = ['고유구매자', '매출액']
+    # 고객별 매출액
+    customer_revenue = summary[['고유구매자', '총구매금액']].rename(columns={'총구매금액': '매출액'})
     customer_revenue = customer_revenue.sort_values('매출액', ascending=False)
     
     # 상위 10% 고객
@@ -47,18 +44,11 @@ def mA3_003(df: pd.DataFrame, params: MetricParams):
 
 def mA3_004(df: pd.DataFrame, params: MetricParams):
     """다중구매고객비율 - 여러 상품 구매 고객 비율"""
-    d = base_metrics.apply_params_filter(df, params)
-    
-    if '고유구매자' not in d.columns:
-        d = base_metrics.create_unique_buyer(d)
-    
-    # 고객별 구매 상품 수
-    customer_products = d.groupby('고유구매자')['상품명'].nunique().reset_index()
-    customer_products.columns = ['고유구매자', '구매상품수']
+    summary = customers.customer_summary(df, params)
     
     # 2개 이상 상품 구매 고객
-    multi_product_customers = len(customer_products[customer_products['구매상품수'] >= 2])
-    total_customers = len(customer_products)
+    multi_product_customers = int((summary['구매상품수'] >= 2).sum())
+    total_customers = len(summary)
     
     ratio = round(multi_product_customers / total_customers * 100, 2) if total_customers > 0 else 0
     
@@ -70,30 +60,18 @@ def mA3_004(df: pd.DataFrame, params: MetricParams):
 
 def mA3_005(df: pd.DataFrame, params: MetricParams):
     """고객당평균구매상품수 - 고객별 평균 구매 상품수"""
-    d = base_metrics.apply_params_filter(df, params)
-    
-    if '고유구매자' not in d.columns:
-        d = base_metrics.create_unique_buyer(d)
-    
-    customer_products = d.groupby('고유구매자')['상품명'].nunique().reset_index()
-    customer_products.columns = ['고유구매자', '구매상품수']
-    
-    avg_products = customer_products['구매상품수'].mean()
+    summary = customers.customer_summary(df, params)
+    avg_products = summary['구매상품수'].mean()
     
     return pd.DataFrame({
-        '전체고객수': [len(customer_products)],
+        '전체고객수': [len(summary)],
         '고객당평균구매상품수': [round(avg_products, 2)]
     })
 
 def mA3_006(df: pd.DataFrame, params: MetricParams):
     """신규고객비율 - 분석 기간 내 신규 고객 비율"""
-    d = base_metrics.apply_params_filter(df, params)
-    
-    if '고유구매자' not in d.columns:
-        d = base_metrics.create_unique_buyer(d)
-    
-    all_customers = df.groupby('고유구매자')['주문일시'].min().reset_index()
-    all_customers.columns = ['고유구매자', '첫구매일']
+    # 첫구매일은 전체 데이터 기준
+    all_customers = customers.customer_summary(df)
     
     analysis_start = params.get('date_from')
     if analysis_start:
@@ -102,7 +80,7 @@ def mA3_006(df: pd.DataFrame, params: MetricParams):
     else:
         new_customer_count = 0
     
-    period_customers = d['고유구매자'].nunique()
+    period_customers = len(customers.customer_summary(df, params))
     ratio = round(new_customer_count / period_customers * 100, 2) if period_customers > 0 else 0
     
     return pd.DataFrame({
@@ -113,18 +91,14 @@ def mA3_006(df: pd.DataFrame, params: MetricParams):
 
 def mA3_007(df: pd.DataFrame, params: MetricParams):
     """기존고객이탈률 - 일정 기간 구매 중단 고객 비율"""
-    d = base_metrics.apply_params_filter(df, params)
     churn_days = 90
     
-    if '고유구매자' not in d.columns:
-        d = base_metrics.create_unique_buyer(d)
-    
-    all_recent_purchase = df.groupby('고유구매자')['주문일시'].max().reset_index()
-    all_recent_purchase.columns = ['고유구매자', '최근구매일']
+    # 최근구매일은 전체 데이터 기준
+    all_recent_purchase = customers.customer_summary(df)
     
-    analysis_date = df['주문일시'].max()
-    all_recent_purchase['경과일수'] = (analysis_date - all_recent_purchase['최근구매일']).dt.days
-    churned_customers = all_recent_purchase[all_recent_purchase['경과일수'] > churn_days]
+    analysis_date = all_recent_purchase['최근구매일'].max()
+    elapsed_days = (analysis_date - all_recent_purchase['최근구매일']).dt.days
+    churned_customers = all_recent_purchase[elapsed_days > churn_days]
     
     churn_rate = round(len(churned_customers) / len(all_recent_purchase) * 100, 2)
     
@@ -137,22 +111,17 @@ def mA3_007(df: pd.DataFrame, params: MetricParams):
 
 def mA3_008(df: pd.DataFrame, params: MetricParams):
     """재구매고객매출비중 - 재구매 고객의 매출 기여도"""
-    d = base_metrics.apply_params_filter(df, params)
-    
-    if '고유구매자' not in d.columns:
-        d = base_metrics.create_unique_buyer(d)
-    
-    customer_orders = d.groupby('고유구매자').size().reset_index(name='구매횟수')
-    repeat_customers = customer_orders[customer_orders['구매횟수'] >= 2]['고유구매자'].tolist()
+    summary = customers.customer_summary(df, params)
+    repeat = summary['구매횟수'] >= 2
     
-    repeat_customer_revenue = d[d['고유구매자'].isin(repeat_customers)]['상품별 총 주문금액'].sum()
-    total_revenue = d['상품별 총 주문금액'].sum()
+    repeat_customer_revenue = summary.loc[repeat, '총구매금액'].sum()
+    total_revenue = summary['총구매금액'].sum()
     
     contribution = round(repeat_customer_revenue / total_revenue * 100, 2) if total_revenue > 0 else 0
     
     return pd.DataFrame({
-        '재구매고객수': [len(repeat_customers)],
-        '전체고객수': [len(customer_orders)],
+        '재구매고객수': [int(repeat.sum())],
+        '전체고객수': [len(summary)],
         '재구매고객매출액': [repeat_customer_revenue],
         '전체매출액': [total_revenue],
         '재구매고객매출비중(%)': [contribution]
@@ -160,12 +129,7 @@ def mA3_008(df: pd.DataFrame, params: MetricParams):
 
 def mA3_009(df: pd.DataFrame, params: MetricParams):
     """고객재구매횟수분포 - 고객별 재구매 횟수 분포"""
-    d = base_metrics.apply_params_filter(df, params)
-    
-    if '고유구매자' not in d.columns:
-        d = base_metrics.create_unique_buyer(d)
-    
-    customer_orders = d.groupby('고유구매자').size().reset_index(name='구매횟수')
+    customer_orders = customers.customer_summary(df, params)[['고유구매자', '구매횟수']].copy()
     
     bins = [0, 1, 2, 3, 4, float('inf')]
     labels = ['1회', '2회', '3회', '4회', '5회이상']
@@ -178,44 +142,17 @@ def mA3_009(df: pd.DataFrame, params: MetricParams):
 
 def mA3_010(df: pd.DataFrame, params: MetricParams):
     """고객평균LTV - 고객별 평균 생애가치"""
-    d = base_metrics.apply_params_filter(df, params)
-    
-    if '고유구매자' not in d.columns:
-        d = base_metrics.create_unique_buyer(d)
-    
-    customer_summary = d.groupby('고유구매자').agg({
-        '상품별 총 주문금액': ['sum', 'mean', 'count'],
-        '주문일시': ['min', 'max']
-    }).reset_index()
-    
-    customer_summary.columns = [
-        '고유구매자', '총구매금액', '평균구매금액', '구매횟수', '첫구매일', '최근구매일'
-    ]
+    summary = customers.customer_summary(df, params)
     
-    customer_summary['구매기간(일)'] = (customer_summary['최근구매일'] - customer_summary['첫구매일']).dt.days
-    
-    customer_summary['구매주기(일)'] = customer_summary.apply(
-        lambda row: row['구매기간(일)'] / (row['구매횟수'] - 1) if row['구매횟수'] > 1 else 0,
-        axis=1
-    ).round(1)
-    
-    expected_lifetime_days = 365 * 2
-    customer_summary['예상LTV'] = customer_summary.apply(
-        lambda row: row['평균구매금액'] * (expected_lifetime_days / row['구매주기(일)']) 
-        if row['구매주기(일)'] > 0 else row['총구매금액'],
-        axis=1
-    ).round(0)
-    
-    customer_summary['현재LTV'] = customer_summary['총구매금액']
-    
-    avg_current_ltv = customer_summary['현재LTV'].mean().round(0)
-    avg_predicted_ltv = customer_summary['예상LTV'].mean().round(0)
+    # 현재LTV = 총구매금액, 예상LTV = 구매주기 기반 (벡터화)
+    current_ltv = summary['총구매금액']
+    predicted_ltv = customers.expected_ltv(summary)
     
     return pd.DataFrame({
-        '전체고객수': [len(customer_summary)],
-        '평균현재LTV': [avg_current_ltv],
-        '평균예상LTV': [avg_predicted_ltv],
-        '중간값현재LTV': [customer_summary['현재LTV'].median().round(0)],
-        '최대현재LTV': [customer_summary['현재LTV'].max()],
-        '최대예상LTV': [customer_summary['예상LTV'].max()]
-    })
\ No newline at end of file
+        '전체고객수': [len(summary)],
+        '평균현재LTV': [current_ltv.mean().round(0)],
+        '평균예상LTV': [predicted_ltv.mean().round(0)],
+        '중간값현재LTV': [current_ltv.median().round(0)],
+        '최대현재LTV': [current_ltv.max()],
+        '최대예상LTV': [predicted_ltv.max()]
+    })
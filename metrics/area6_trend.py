@@ -1,70 +1,45 @@
 from __future__ import annotations
+import numpy as np
 import pandas as pd
 from core.types import MetricParams
-from core import base_metrics
+from core import base_metrics, batch, trend
 
 def mA6_001(df: pd.DataFrame, params: MetricParams):
     """트렌드일자별매출추이 - 일자별 매출액 시계열 추이"""
-    d = base_metrics.apply_params_filter(df, params)
-    g = base_metrics.safe_group_sum(d, ['주문일'], '상품별 총 주문금액', '매출액')
+    g = base_metrics.params_group_sum(df, params, ['주문일'], '상품별 총 주문금액', '매출액')
     return g.sort_values('주문일')[['주문일', '매출액']]
 
 def mA6_002(df: pd.DataFrame, params: MetricParams):
     """트렌드일자별주문수추이 - 일자별 주문수 시계열 추이"""
-    d = base_metrics.apply_params_filter(df, params)
-    g = base_metrics.safe_group_size(d, ['주문일'], '주문수')
+    g = base_metrics.params_group_size(df, params, ['주문일'], '주문수')
     return g.sort_values('주문일')[['주문일', '주문수']]
 
 def mA6_003(df: pd.DataFrame, params: MetricParams):
     """트렌드주차별매출추이 - 주차별 매출액 시계열 추이"""
-    d = base_metrics.filter_by_params(df, params)
-    
-    # 주차 파생
-    d = d.copy()
-    d['주차'] = pd.to_datetime(d['주문일']).dt.to_period('W').astype(str)
-    
-    g = d.groupby('주차')['상품별 총 주문금액'].sum().reset_index(name='매출액')
-    return g.sort_values('주차')[['주차', '매출액']]
+    # 월요일 시작 주 단위 조밀 달력 (매출 없는 주는 0)
+    d = trend.source_rows(df, params, '상품별 총 주문금액')
+    periods, _, table = trend.series_table(d, '상품별 총 주문금액', 'W')
+    return pd.DataFrame({'주차': trend.period_labels(periods, 'W'), '매출액': table[0]})
 
 def mA6_004(df: pd.DataFrame, params: MetricParams):
     """트렌드매출성장률2주 - 2주 단위 매출 성장률"""
-    # 주차별 매출 데이터 먼저 생성
-    weekly_data = mA6_003(df, params)
+    d = trend.source_rows(df, params, '상품별 총 주문금액')
+    weeks, _, _ = trend.series_table(d, '상품별 총 주문금액', 'W')
     
-    if len(weekly_data) < 2:
+    if len(weeks) < 2:
         return pd.DataFrame({'기간': ['데이터부족'], '매출액': [0], '성장률(%)': [0]})
     
-    # 2주씩 그룹핑
-    weekly_data = weekly_data.reset_index(drop=True)
-    biweekly_results = []
-    
-    for i in range(0, len(weekly_data), 2):
-        if i + 1 < len(weekly_data):
-            # 2주 합계
-            period_revenue = weekly_data.iloc[i:i+2]['매출액'].sum()
-            period_name = f"{weekly_data.iloc[i]['주차']}~{weekly_data.iloc[i+1]['주차']}"
-        else:
-            # 마지막 홀수 주
-            period_revenue = weekly_data.iloc[i]['매출액']
-            period_name = weekly_data.iloc[i]['주차']
-        
-        biweekly_results.append({'기간': period_name, '매출액': period_revenue})
-    
-    biweekly_df = pd.DataFrame(biweekly_results)
-    
-    # 성장률 계산
-    biweekly_df['이전기간매출'] = biweekly_df['매출액'].shift(1)
-    biweekly_df['성장률(%)'] = biweekly_df.apply(
-        lambda row: 0.0 if pd.isna(row['이전기간매출']) or row['이전기간매출'] == 0
-        else ((row['매출액'] - row['이전기간매출']) / row['이전기간매출'] * 100),
-        axis=1
-    ).round(2)
-    
-    return biweekly_df[['기간', '매출액', '성장률(%)']].dropna()
+    # 첫 주부터 2주씩 묶은 구간 (마지막 홀수 주는 한 주만)
+    periods, _, table = trend.series_table(d, '상품별 총 주문금액', '2W')
+    return pd.DataFrame({
+        '기간': trend.period_labels(periods, '2W', last_day=weeks[-1]),
+        '매출액': table[0],
+        '성장률(%)': trend.growth(table)[0],
+    })
 
 def mA6_005(df: pd.DataFrame, params: MetricParams):
     """트렌드시간대별매출패턴 - 시간대별 매출 패턴"""
-    d = base_metrics.filter_by_params(df, params)
+    d = base_metrics.apply_params_filter(df, params)
     g = base_metrics.safe_group_sum(d, ['시간대'], '상품별 총 주문금액', '매출액')
     
     # 패턴 강도 계산 (변동계수)
@@ -79,7 +54,7 @@ def mA6_005(df: pd.DataFrame, params: MetricParams):
 
 def mA6_006(df: pd.DataFrame, params: MetricParams):
     """트렌드시간대별주문수패턴 - 시간대별 주문수 패턴"""
-    d = base_metrics.filter_by_params(df, params)
+    d = base_metrics.apply_params_filter(df, params)
     g = base_metrics.safe_group_size(d, ['시간대'], '주문수')
     
     # 패턴 강도 계산
@@ -94,12 +69,12 @@ def mA6_006(df: pd.DataFrame, params: MetricParams):
 
 def mA6_007(df: pd.DataFrame, params: MetricParams):
     """트렌드피크시간대Top3 - 매출 피크 시간대 상위 3개"""
-    hourly_pattern = mA6_005(df, params)
+    hourly_pattern = batch.metric_result('A6_005', df, params)
     return hourly_pattern.nlargest(3, '매출액')[['시간대', '매출액']].reset_index(drop=True)
 
 def mA6_008(df: pd.DataFrame, params: MetricParams):
     """트렌드요일별매출패턴 - 요일별 매출 패턴"""
-    d = base_metrics.filter_by_params(df, params)
+    d = base_metrics.apply_params_filter(df, params)
     g = base_metrics.safe_group_sum(d, ['요일'], '상품별 총 주문금액', '매출액')
     
     # 요일 순서 정렬
@@ -117,7 +92,7 @@ def mA6_008(df: pd.DataFrame, params: MetricParams):
 
 def mA6_009(df: pd.DataFrame, params: MetricParams):
     """트렌드요일패턴스코어 - 요일별 매출 패턴 강도 스코어"""
-    weekday_pattern = mA6_008(df, params)
+    weekday_pattern = batch.metric_result('A6_008', df, params)
     
     if len(weekday_pattern) > 0:
         # 일관성 점수 (변동계수의 역수)
@@ -142,17 +117,17 @@ def mA6_009(df: pd.DataFrame, params: MetricParams):
 
 def mA6_010(df: pd.DataFrame, params: MetricParams):
     """트렌드채널별매출추이 - 채널별 매출 시계열 추이"""
-    d = base_metrics.filter_by_params(df, params)
-    g = base_metrics.safe_group_sum(d, ['주문일', '채널명'], '상품별 총 주문금액', '매출액')
+    d = trend.source_rows(df, params, '상품별 총 주문금액', by='채널명')
+    periods, channels, table = trend.series_table(d, '상품별 총 주문금액', 'D', by='채널명')
+    g = trend.to_frame(periods, channels, table, '매출액')
     return g.sort_values(['주문일', '매출액'], ascending=[True, False])[['주문일', '채널명', '매출액']]
 
 def mA6_011(df: pd.DataFrame, params: MetricParams):
     """트렌드중분류별매출추이Top5 - 상위 5개 중분류의 매출 추이"""
-    d = base_metrics.filter_by_params(df, params)
-    
-    # 상위 5개 중분류 선정
-    top_categories = d.groupby('중분류코드')['상품별 총 주문금액'].sum().nlargest(5).index.tolist()
-    d_top5 = d[d['중분류코드'].isin(top_categories)]
+    d = trend.source_rows(df, params, '상품별 총 주문금액', by='중분류코드')
+    periods, categories, table = trend.series_table(d, '상품별 총 주문금액', 'D', by='중분류코드')
     
-    g = base_metrics.safe_group_sum(d_top5, ['주문일', '중분류코드'], '상품별 총 주문금액', '매출액')
-    return g.sort_values(['주문일', '매출액'], ascending=[True, False])[['주문일', '중분류코드', '매출액']]
\ No newline at end of file
+    # 상위 5개 중분류 선정 (동률은 코드 순)
+    top = np.sort(np.argsort(-table.sum(axis=1), kind='stable')[:5])
+    g = trend.to_frame(periods, categories[top], table[top], '매출액')
+    return g.sort_values(['주문일', '매출액'], ascending=[True, False])[['주문일', '중분류코드', '매출액']]